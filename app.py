@@ -1,84 +1,130 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+import asyncio
+import atexit
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import time
 import traceback
-import re
 from markupsafe import Markup
 
 load_dotenv()
 
 from utils.config import Config
-from utils.agents import ModernResearchAgents
-from utils.search import TavilyRetrievalSystem
-from utils.report_generator import EnhancedReportGenerator
+from utils.registry import get_registry, load_research_modules
+from utils.cache import get_search_cache, normalize_query
+from utils.corpus import get_corpus
+from utils.scheduler import ResearchScheduler, QueueFullError, JobCancelled
+from utils.job_store import JobStore, FINISHED_STATUSES
+from utils.pipeline import PipelineExecutor, Stage, split_markdown_sections
+from utils.metrics import new_job_metrics, metrics_registry, NULL_JOB_METRICS
+from utils.markdown import markdown_to_html, markdown_chunk_to_html
+from utils.artifacts import ArtifactStore, iter_json
+from utils.render_service import PDFRenderService, RenderPending
+from utils.batch import BatchStore, dedupe_queries
+from utils.ratelimit import get_provider_limiter
+from utils.event_loop import EventLoopThread
+from utils.single_flight import SingleFlight
 
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'your-secret-key-here')
+if Config.TRUSTED_PROXY_HOPS:
+    # remote_addr becomes the address the outermost trusted proxy saw
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=Config.TRUSTED_PROXY_HOPS)
 
-# Global variable to store research progress
-research_progress = {}
+def preload_research_modules():
+    started = time.perf_counter()
+    load_research_modules()
+    print(f"Research modules loaded in {time.perf_counter() - started:.2f}s")
 
-def process_report_content(content):
-    """Process report content to properly format HTML with clean structure"""
-    if not content:
-        return ""
+def record_dropped_job(job):
+    """Mark a queued job that the scheduler dropped at shutdown as cancelled"""
+    if job.target is refresh_target:
+        # A dropped refresh leaves the previous report in place
+        job_store.update(job.job_id, refresh_outcome('Refresh was cancelled, showing the previous report'))
+    else:
+        publish_research(job.job_id, {
+            'status': 'cancelled',
+            'message': 'Research was cancelled because the server is shutting down',
+            'error': 'Research was cancelled because the server is shutting down'
+        }, final=True)
+
+# PDF workers started by `python app.py` re-run this file as __mp_main__;
+# they only render PDFs, so they skip the app's stores, pools and threads
+if __name__ != '__mp_main__':
+    # Research progress and results, with bounded retention of finished jobs
+    job_store = JobStore(
+        max_finished=Config.JOB_STORE_MAX_FINISHED,
+        max_result_bytes=Config.JOB_STORE_MAX_RESULT_BYTES,
+        finished_ttl=Config.JOB_STORE_TTL,
+        path=Config.JOB_STORE_PATH
+    )
     
-    # First, let's clean up the content and convert everything to a consistent format
-    html = content
+    # Rendered HTML pages and downloads, each produced once per research job
+    artifact_store = ArtifactStore(
+        max_bytes=Config.ARTIFACT_MAX_BYTES,
+        max_age=Config.ARTIFACT_MAX_AGE,
+        spill_bytes=Config.ARTIFACT_SPILL_BYTES,
+        directory=Config.ARTIFACT_DIR
+    )
+    atexit.register(artifact_store.close)
     
-    # Remove any existing HTML tags and convert to plain text first
-    html = re.sub(r'<[^>]+>', '', html)  # Strip all HTML tags
+    # Process pool for PDF layout, started as soon as a job completes
+    pdf_renderer = PDFRenderService(
+        max_workers=Config.PDF_RENDER_WORKERS,
+        max_queue=Config.PDF_RENDER_QUEUE,
+        start_method=Config.PDF_RENDER_START_METHOD
+    )
+    atexit.register(pdf_renderer.shutdown)
     
-    # Now process line by line for better structure
-    lines = html.split('\n')
-    processed_lines = []
+    # Requests for the same query share one running job
+    research_flights = SingleFlight()
     
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Process headings
-        if line.startswith('### '):
-            processed_lines.append(f'<h3 class="mt-4 mb-3 text-dark">{line[4:]}</h3>')
-        elif line.startswith('## '):
-            processed_lines.append(f'<h2 class="mt-4 mb-3 text-primary border-bottom pb-2">{line[3:]}</h2>')
-        elif line.startswith('# '):
-            processed_lines.append(f'<h1 class="mt-5 mb-4 text-primary border-bottom pb-2">{line[2:]}</h1>')
-        
-        # Process bullet points
-        elif line.startswith('- ') or line.startswith('* '):
-            bullet_text = line[2:].strip()
-            # Process bold and italic within bullet points
-            bullet_text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', bullet_text)
-            bullet_text = re.sub(r'(?<!\*)\*(.*?)\*(?!\*)', r'<em>\1</em>', bullet_text)
-            processed_lines.append(f'<li class="mb-2">{bullet_text}</li>')
-        
-        # Process regular paragraphs
-        else:
-            # Process bold and italic
-            line = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', line)
-            line = re.sub(r'(?<!\*)\*(.*?)\*(?!\*)', r'<em>\1</em>', line)
-            
-            # Process URLs
-            line = re.sub(r'(https?://[^\s<>"{}|\\^`[\]]+)', 
-                         r'<a href="\1" target="_blank" rel="noopener noreferrer" class="text-decoration-underline">\1</a>', 
-                         line)
-            
-            processed_lines.append(f'<p class="mb-3 lh-lg">{line}</p>')
+    # Research ID lists of submitted batches
+    batch_store = BatchStore(max_batches=Config.BATCH_MAX_STORED)
     
-    # Join all lines
-    html = '\n'.join(processed_lines)
+    # Bounded worker pool that runs research jobs; drained on shutdown. In
+    # async mode the jobs are tasks on one event loop thread instead.
+    research_loop = None
+    if Config.ASYNC_MODE:
+        research_loop = EventLoopThread(name='research-loop')
+        atexit.register(research_loop.stop)
     
-    # Wrap consecutive <li> elements in <ul>
-    html = re.sub(r'(<li[^>]*>.*?</li>(?:\s*<li[^>]*>.*?</li>)*)', 
-                  r'<ul class="mb-4 ps-4">\1</ul>', html, flags=re.DOTALL)
+    scheduler = ResearchScheduler(
+        max_workers=Config.MAX_CONCURRENT_RESEARCH_ASYNC if Config.ASYNC_MODE else Config.MAX_CONCURRENT_RESEARCH,
+        max_queue=Config.MAX_QUEUED_RESEARCH,
+        max_per_client=Config.MAX_RESEARCH_PER_CLIENT,
+        loop=research_loop.loop if research_loop is not None else None,
+        on_cancel=record_dropped_job
+    )
+    atexit.register(scheduler.shutdown, drain=True, timeout=Config.SCHEDULER_DRAIN_TIMEOUT)
+    
+    if Config.PRELOAD_RESEARCH_MODULES:
+        threading.Thread(target=preload_research_modules, name='preload-modules', daemon=True).start()
+
+def get_client_id():
+    """Identify the submitting client for per-client queue fairness"""
+    # Behind trusted proxies, ProxyFix already resolved X-Forwarded-For
+    return request.remote_addr or 'anonymous'
+
+def client_id_for(forwarded_for, remote_addr):
+    """``get_client_id`` outside Flask: X-Forwarded-For counts only up to TRUSTED_PROXY_HOPS from the right"""
+    hops = Config.TRUSTED_PROXY_HOPS
+    forwarded = [value.strip() for value in forwarded_for.split(',') if value.strip()]
+    if hops and len(forwarded) >= hops:
+        return forwarded[-hops]
+    return remote_addr or 'anonymous'
+
+def process_report_content(content):
+    """Process report content to properly format HTML with clean structure"""
+    if not content:
+        return ""
     
-    return Markup(html)
+    return Markup(markdown_to_html(content))
 
 # Make the function available in templates
 app.jinja_env.globals.update(process_report_content=process_report_content)
@@ -86,31 +132,45 @@ app.jinja_env.globals.update(process_report_content=process_report_content)
 @app.route('/')
 def index():
     """Home page"""
-    return render_template('index.html')
+    return render_template('index.html', profiles=list(Config.PIPELINE_PROFILES),
+                           default_profile=Config.DEFAULT_PIPELINE_PROFILE)
 
 @app.route('/start_research', methods=['POST'])
 def start_research():
     """Start the research process"""
     print("=== POST request received to /start_research ===")  # Debug log
+    # Check if request has JSON data
+    if not request.is_json:
+        print("ERROR: Request is not JSON")
+        return jsonify({'error': 'Request must be JSON'}), 400
+    
+    payload, status, headers = queue_research_request(request.get_data(), get_client_id())
+    return jsonify(payload), status, headers
+
+def queue_research_request(body, client_id):
+    """Validate a /start_research body and queue the job; returns (payload, status, headers).
+    
+    Shared by the Flask view and the ASGI front end.
+    """
     try:
-        # Check if request has JSON data
-        if not request.is_json:
-            print("ERROR: Request is not JSON")
-            return jsonify({'error': 'Request must be JSON'}), 400
-        
-        data = request.get_json()
+        data = json.loads(body or b'null')
         print(f"Request data: {data}")  # Debug log
         
         if not data:
             print("ERROR: No JSON data received")
-            return jsonify({'error': 'No data received'}), 400
+            return {'error': 'No data received'}, 400, {}
         
         query = data.get('query', '').strip()
         print(f"Query extracted: '{query}'")  # Debug log
         
         if not query:
             print("ERROR: Empty query")
-            return jsonify({'error': 'Please enter a research query'}), 400
+            return {'error': 'Please enter a research query'}, 400, {}
+        
+        profile = data.get('profile') or Config.DEFAULT_PIPELINE_PROFILE
+        if profile not in Config.PIPELINE_PROFILES:
+            print(f"ERROR: Unknown pipeline profile '{profile}'")
+            return {'error': f"Unknown pipeline profile '{profile}', choose one of {', '.join(Config.PIPELINE_PROFILES)}"}, 400, {}
         
         # Check API keys
         groq_key = os.getenv("GROQ_API_KEY")
@@ -120,242 +180,1436 @@ def start_research():
         
         if not groq_key or not tavily_key:
             print("ERROR: API keys missing")
-            return jsonify({'error': 'API keys not found. Please check your .env file'}), 500
+            return {'error': 'API keys not found. Please check your .env file'}, 500, {}
         
-        # Generate unique research ID
-        research_id = f"research_{int(time.time())}"
-        print(f"Generated research ID: {research_id}")  # Debug log
-        
-        # Initialize progress tracking
-        research_progress[research_id] = {
-            'status': 'initializing',
-            'progress': 0,
-            'message': 'Initializing AI Research Agents...',
-            'query': query,
-            'result': None,
-            'error': None
-        }
+        # Initialize progress tracking under a collision-free research ID
+        research_id = job_store.create(query, profile=profile, message='Waiting for an available research agent...')
+        print(f"Generated research ID: {research_id} ({profile} profile)")  # Debug log
         
-        # Start research in background thread
-        thread = threading.Thread(target=run_research, args=(research_id, query))
-        thread.daemon = True
-        thread.start()
-        print(f"Background thread started for {research_id}")  # Debug log
+        # Queue the research on the bounded worker pool, or attach to an identical running job
+        try:
+            job_id = enqueue_research(research_id, query, client_id, profile=profile)
+        except QueueFullError as e:
+            job_store.delete(research_id)
+            print(f"Research rejected: {str(e)} (queue depth {e.queue_depth})")
+            return {
+                'error': f'{str(e)}. Please try again shortly.',
+                'queue_depth': e.queue_depth,
+                'queue_position': e.queue_depth + 1
+            }, 429, {'Retry-After': '30'}
+        print(f"Research {research_id} queued")  # Debug log
         
-        response_data = {'research_id': research_id, 'status': 'started'}
+        response_data = {
+            'research_id': research_id,
+            'status': job_store.get(research_id)['status'],
+            'profile': profile,
+            **scheduler.job_info(job_id)
+        }
+        if job_id != research_id:
+            response_data['coalesced_with'] = job_id
         print(f"Sending response: {response_data}")
-        return jsonify(response_data)
+        return response_data, 200, {}
         
     except Exception as e:
         print(f"ERROR in start_research: {str(e)}")  # Debug log
         print(f"Traceback: {traceback.format_exc()}")  # Full traceback
-        return jsonify({'error': str(e)}), 500
+        return {'error': str(e)}, 500, {}
 
-def run_research(research_id, query):
-    """Run research in background thread"""
-    print(f"=== Starting research thread for {research_id} ===")
+def enqueue_research(research_id, query, client_id, client_limit=None, profile=None):
+    """Run ``research_id`` as a new job, or attach it to a queued or running job for the same query and profile.
+    
+    Returns the ID of the job that does the work. Raises QueueFullError when
+    a new job does not fit the queue.
+    """
+    profile = profile or Config.DEFAULT_PIPELINE_PROFILE
+    if not Config.RESEARCH_COALESCING:
+        scheduler.submit(research_id, research_target, research_id, query, profile,
+                         client_id=client_id, client_limit=client_limit)
+        return research_id
+    
+    def attach(job_id):
+        progress_data = job_store.get(job_id) or {}
+        job_store.update(research_id, {
+            **{key: progress_data[key] for key in ('status', 'progress', 'message', 'partial_result') if key in progress_data},
+            'coalesced_with': job_id
+        })
+    
+    # A fast and a thorough report of the same query are different results
+    job_id = research_flights.join(f"{profile}:{normalize_query(query)}", research_id, on_attach=attach)
+    if job_id is not None:
+        print(f"Research {research_id} attached to running job {job_id}")
+        return job_id
+    
     try:
-        # Initialize agents
-        print("Phase 1: Initializing agents...")
-        research_progress[research_id].update({
-            'status': 'initializing',
-            'progress': 10,
-            'message': 'Setting up AI agents...'
+        scheduler.submit(research_id, research_target, research_id, query, profile,
+                         client_id=client_id, client_limit=client_limit)
+    except QueueFullError as e:
+        # Requests that attached in the meantime fail with this one
+        with research_flights.members(research_id, final=True) as members:
+            for member_id in members:
+                if member_id != research_id:
+                    job_store.update(member_id, {
+                        'status': 'error',
+                        'progress': 0,
+                        'message': f'{str(e)}. Please try again shortly.',
+                        'error': str(e)
+                    })
+        raise
+    return research_id
+
+def withdraw_research(research_id):
+    """Stop waiting for a job's result; the job itself is cancelled once nobody else waits for it.
+    
+    Returns False when the research is not queued or running.
+    """
+    flight = research_flights.leave(research_id)
+    if flight is None:
+        # An owner that already detached still shares its ID with the job
+        # the remaining members wait for, which must keep running
+        if research_flights.has_left(research_id) or research_flights.member_count(research_id):
+            return False
+        return scheduler.cancel(research_id)
+    
+    # Detached requests receive no further updates from the job
+    job_store.update(research_id, {
+        'status': 'cancelled',
+        'message': 'Research was cancelled',
+        'error': 'Research was cancelled'
+    })
+    
+    job_id, remaining = flight
+    if remaining == 0:
+        print(f"Last request for job {job_id} withdrew, cancelling it")
+        scheduler.cancel(job_id)
+        job = scheduler.get_job(job_id)
+        if job is None or job.state != 'running':
+            # A queued job never publishes a final update
+            research_flights.finish(job_id)
+    else:
+        print(f"Research {research_id} detached from job {job_id}, {remaining} requests still waiting")
+    return True
+
+def publish_research(job_id, fields, final=False):
+    """Update a job's state and that of every request attached to it"""
+    with research_flights.members(job_id, final=final) as members:
+        for research_id in members:
+            job_store.update(research_id, fields)
+
+def start_batch(queries, client_id='anonymous', profile=None):
+    """Queue one research job per distinct query and return the batch record.
+    
+    Raises ValueError for an empty or oversized batch or an unknown pipeline
+    profile, and QueueFullError when the whole batch does not fit the queue;
+    nothing is queued then.
+    """
+    queries = [query.strip() for query in queries if isinstance(query, str) and query.strip()]
+    groups = dedupe_queries(queries)
+    if not groups:
+        raise ValueError('Please provide at least one research query')
+    if len(groups) > Config.BATCH_MAX_QUERIES:
+        raise ValueError(f'A batch can hold at most {Config.BATCH_MAX_QUERIES} distinct queries')
+    profile = profile or Config.DEFAULT_PIPELINE_PROFILE
+    if profile not in Config.PIPELINE_PROFILES:
+        raise ValueError(f"Unknown pipeline profile '{profile}', choose one of {', '.join(Config.PIPELINE_PROFILES)}")
+    
+    batch_id = BatchStore.new_id()
+    research_ids = {}
+    try:
+        for key, originals in groups.items():
+            research_id = job_store.create(originals[0], batch_id=batch_id, profile=profile,
+                                           message='Waiting for an available research agent...')
+            research_ids[key] = research_id
+            # A batch gets its own round-robin lane, so interactive jobs of
+            # other clients are still dispatched between its queries
+            enqueue_research(research_id, originals[0], f"batch:{client_id}",
+                             client_limit=Config.BATCH_MAX_QUERIES, profile=profile)
+    except QueueFullError:
+        for research_id in research_ids.values():
+            withdraw_research(research_id)
+            job_store.delete(research_id)
+        raise
+    
+    items = [{'query': query, 'research_id': research_ids[normalize_query(query)]} for query in queries]
+    batch_store.create(items, batch_id=batch_id)
+    print(f"Batch {batch_id} queued: {len(items)} queries, {len(research_ids)} distinct")
+    return batch_progress(batch_id)
+
+def batch_progress(batch_id):
+    """Per-query status of a batch plus overall counts, or None for an unknown batch"""
+    batch = batch_store.get(batch_id)
+    if batch is None:
+        return None
+    
+    counts = {}
+    progress = []
+    for item in batch['items']:
+        progress_data = job_store.get(item['research_id']) or {'status': 'expired', 'progress': 0}
+        item.update({
+            'status': progress_data['status'],
+            'progress': progress_data.get('progress', 0),
+            'message': progress_data.get('message', '')
         })
+        counts[item['status']] = counts.get(item['status'], 0) + 1
+        progress.append(item['progress'])
+    
+    finished = sum(counts.get(status, 0) for status in (*FINISHED_STATUSES, 'expired'))
+    return {
+        'batch_id': batch_id,
+        'status': 'completed' if finished == len(batch['items']) else 'running',
+        'progress': round(sum(progress) / len(progress)) if progress else 100,
+        'counts': counts,
+        'items': batch['items']
+    }
+
+def wait_for_batch(batch_id, timeout=None, poll_interval=1.0):
+    """Block until every query of a batch has finished; returns the final batch_progress"""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        progress = batch_progress(batch_id)
+        if progress is None or progress['status'] == 'completed':
+            return progress
+        if deadline is not None and time.monotonic() >= deadline:
+            return progress
+        time.sleep(poll_interval)
+
+@app.route('/batch_research', methods=['POST'])
+def batch_research():
+    """Start research for many queries at once"""
+    print("=== POST request received to /batch_research ===")
+    data = request.get_json(silent=True) or {}
+    queries = data.get('queries')
+    
+    if not isinstance(queries, list):
+        return jsonify({'error': 'Request must be JSON with a "queries" list'}), 400
+    
+    if not os.getenv("GROQ_API_KEY") or not os.getenv("TAVILY_API_KEY"):
+        return jsonify({'error': 'API keys not found. Please check your .env file'}), 500
+    
+    try:
+        return jsonify(start_batch(queries, client_id=get_client_id(), profile=data.get('profile')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFullError as e:
+        print(f"Batch rejected: {str(e)} (queue depth {e.queue_depth})")
+        response = jsonify({'error': f'{str(e)}. Please try again shortly.', 'queue_depth': e.queue_depth})
+        response.headers['Retry-After'] = '30'
+        return response, 429
+
+@app.route('/batch_progress/<batch_id>')
+def get_batch_progress(batch_id):
+    """Overall and per-query progress of a batch"""
+    progress = batch_progress(batch_id)
+    if progress is None:
+        return jsonify({'error': 'Batch ID not found'}), 404
+    return jsonify(progress)
+
+@app.route('/batch_export/<format>/<batch_id>')
+def batch_export(format, batch_id):
+    """Combined export of every finished report in a batch"""
+    progress = batch_progress(batch_id)
+    if progress is None:
+        return "Batch not found", 404
+    
+    def reports():
+        for item in progress['items']:
+            progress_data = job_store.get(item['research_id']) or {}
+            yield {
+                'query': item['query'],
+                'research_id': item['research_id'],
+                'status': item['status'],
+                'report': progress_data.get('result') if progress_data and report_available(progress_data) else None
+            }
+    
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if format == 'json':
+        body = iter_json({
+            'batch_id': batch_id,
+            'status': progress['status'],
+            'exported_at': datetime.now().isoformat(),
+            'reports': list(reports())
+        })
+        mimetype, filename = 'application/json', f"research_batch_{timestamp}.json"
+    elif format == 'markdown':
+        load_research_modules()
+        from utils.report_generator import EnhancedReportGenerator
+        
+        def generate():
+            for report in reports():
+                if report['report'] is None:
+                    yield f"# {report['query']}\n\n*Report not available ({report['status']}).*\n\n".encode('utf-8')
+                else:
+                    yield EnhancedReportGenerator.generate_markdown(report['report'], report['query']).encode('utf-8')
+                    yield b"\n\n"
+        body = generate()
+        mimetype, filename = 'text/markdown', f"research_batch_{timestamp}.md"
+    else:
+        return "Invalid format", 400
+    
+    response = Response(body, mimetype=mimetype)
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def critic_inputs(summary):
+    """(heading, prompt content) pairs to critique; one pair for the whole summary unless split by section"""
+    sections = split_markdown_sections(summary)
+    if not Config.PIPELINE_SECTION_CRITIQUE or len(sections) <= 1:
+        return [(None, summary)]
+    return [(heading, f"## {heading}\n{body}" if heading else body) for heading, body in sections]
+
+def join_critiques(inputs, critiques):
+    return "\n\n".join(
+        f"## {heading}\n{section_critique}" if heading else section_critique
+        for (heading, _), section_critique in zip(inputs, critiques)
+    )
+
+def critique_by_section(critic_agent, summary, metrics=NULL_JOB_METRICS):
+    """Critique each section of the summary in parallel and reassemble in order"""
+    def run_critic(content):
+        metrics.add_context('agent.critic', content)
+        return critic_agent.invoke({"summary_content": content}, config=metrics.llm_config('agent.critic'))
+    
+    inputs = critic_inputs(summary)
+    # One wall-clock time for the stage, not the sum of its concurrent sections
+    with metrics.timed('agent.critic'):
+        if len(inputs) == 1:
+            return run_critic(summary)
+        
+        with ThreadPoolExecutor(max_workers=Config.PIPELINE_MAX_CONCURRENCY) as executor:
+            critiques = list(executor.map(run_critic, [content for _, content in inputs]))
+    
+    return join_critiques(inputs, critiques)
+
+async def acritique_by_section(critic_agent, summary, metrics=NULL_JOB_METRICS):
+    """``critique_by_section`` with ainvoke, at most PIPELINE_MAX_CONCURRENCY critiques at a time"""
+    semaphore = asyncio.Semaphore(Config.PIPELINE_MAX_CONCURRENCY)
+    
+    async def run_critic(content):
+        metrics.add_context('agent.critic', content)
+        async with semaphore:
+            return await critic_agent.ainvoke(
+                {"summary_content": content}, config=metrics.llm_config('agent.critic')
+            )
+    
+    inputs = critic_inputs(summary)
+    with metrics.timed('agent.critic'):
+        if len(inputs) == 1:
+            return await run_critic(summary)
+        
+        critiques = await asyncio.gather(*[run_critic(content) for _, content in inputs])
+    return join_critiques(inputs, critiques)
+
+def retrieve_section_context(context_budgeter, query, responses, research_data):
+    """Top-k source and research passages per report section, for the writer prompt"""
+    from utils.agents import REPORT_SECTIONS
+    from utils.vector_index import index_passages
+    
+    sources = context_budgeter.unique_sources(responses)
+    sources.append({'title': 'Research agent findings', 'url': '', 'raw_content': research_data})
+    index = index_passages(context_budgeter, sources)
+    
+    parts = []
+    hits_by_section = index.search_sections(query, REPORT_SECTIONS, k=Config.RAG_TOP_K)
+    for section, hits in hits_by_section.items():
+        parts.append(f"### {section}")
+        for source_index, _, passage in hits:
+            source = sources[source_index]
+            citation = f" ({source['url']})" if source.get('url') else ""
+            parts.append(f"- {passage}{citation}")
+        parts.append("")
+    
+    return "\n".join(parts)
+
+def build_research_context(registry, query, primary_response):
+    """Search context for the research agent"""
+    retrieval = registry.retrieval
+    context_budgeter = registry.context_budgeter
+    
+    if not Config.CONTEXT_BUDGET_ENABLED:
+        return "\n\n" + "="*50 + retrieval.format_results([primary_response])
+    
+    if Config.RAG_ENABLED:
+        from utils.agents import RESEARCH_FOCUS_AREAS
+        from utils.vector_index import index_passages, interleave
+        
+        # Top-k passages for each thing the research prompt asks to extract
+        sources = context_budgeter.unique_sources([primary_response])
+        index = index_passages(context_budgeter, sources)
+        hits = index.search_sections(query, RESEARCH_FOCUS_AREAS, k=Config.RAG_TOP_K)
+        context = context_budgeter.pack([primary_response], sources, interleave(hits))
+    else:
+        context = context_budgeter.build(query, [primary_response])
+    print(f"Research context: {context['sources_used']}/{context['sources_in']} sources, ~{context['estimated_tokens']} tokens")
+    return context['text']
+
+def build_targeted_context(registry, query, primary_response, targeted_responses):
+    """Targeted search context appended to the summarizer input"""
+    if not Config.CONTEXT_BUDGET_ENABLED:
+        return registry.retrieval.format_results(targeted_responses)
+    
+    # Sources the research agent already saw are not repeated
+    context = registry.context_budgeter.build(
+        query,
+        targeted_responses,
+        exclude_responses=[primary_response],
+        token_budget=Config.CONTEXT_TARGETED_TOKEN_BUDGET
+    )
+    print(f"Targeted context: {context['sources_used']}/{context['sources_in']} sources, ~{context['estimated_tokens']} tokens")
+    return context['text']
+
+def summarizer_content(research, targeted_context):
+    # Targeted results arrive while the research agent works on the primary ones
+    if targeted_context:
+        return research + "\n\nADDITIONAL SEARCH RESULTS:\n" + targeted_context
+    return research
+
+def writer_research_data(registry, query, primary_response, targeted_responses, research):
+    if not Config.RAG_ENABLED:
+        return research
+    
+    # Only the passages relevant to each report section, not everything
+    return retrieve_section_context(
+        registry.context_budgeter, query, [primary_response] + targeted_responses, research
+    )
+
+def research_stages(stage_funcs, phase, skip_critic=False):
+    """The research DAG; ``stage_funcs`` maps each stage name to its (sync or async) function.
+    
+    With ``skip_critic`` there is no critique stage and the writer works
+    from the summary alone.
+    """
+    write_inputs = ['primary_search', 'targeted_search', 'research', 'summarize'] + ([] if skip_critic else ['critique'])
+    return [
+        Stage('primary_search', stage_funcs['primary_search'],
+              on_start=phase('searching', 25, 'Conducting advanced web search...')),
+        Stage('targeted_search', stage_funcs['targeted_search']),
+        Stage('research_context', stage_funcs['research_context'], depends_on=['primary_search']),
+        Stage('targeted_context', stage_funcs['targeted_context'], depends_on=['primary_search', 'targeted_search']),
+        Stage('research', stage_funcs['research'], depends_on=['research_context'],
+              on_start=phase('researching', 40, 'Analyzing search results...')),
+        Stage('summarize', stage_funcs['summarize'], depends_on=['research', 'targeted_context'],
+              on_start=phase('summarizing', 50, 'Processing and summarizing information...')),
+    ] + ([] if skip_critic else [
+        Stage('critique', stage_funcs['critique'], depends_on=['summarize'],
+              on_start=phase('critiquing', 75, 'Fact-checking and verification...')),
+    ]) + [
+        Stage('write', stage_funcs['write'], depends_on=write_inputs,
+              on_start=phase('writing', 90, 'Generating final report...')),
+    ]
+
+def research_phase(research_id, metrics):
+    """Factory for stage ``on_start`` callbacks that publish the job's phase"""
+    def phase(status, progress, message):
+        def on_start():
+            print(f"Pipeline stage started: {status}")
+            publish_research(research_id, {
+                'status': status,
+                'progress': progress,
+                'message': message,
+                'metrics': metrics.as_dict()
+            })
+        return on_start
+    return phase
+
+def begin_research(research_id, job, profile=None):
+    """Job metrics with the queue wait recorded, after publishing the initializing phase"""
+    metrics = new_job_metrics(profile or Config.DEFAULT_PIPELINE_PROFILE)
+    if job is not None:
+        metrics.record_time('queue.wait', job.wait_time)
+    
+    print("Phase 1: Initializing agents...")
+    publish_research(research_id, {
+        'status': 'initializing',
+        'progress': 10,
+        'message': 'Setting up AI agents...',
+        'wait_time': job.wait_time if job is not None else 0
+    })
+    return metrics
+
+def complete_research(research_id, query, results, pipeline_report, metrics):
+    from utils.refresh import response_urls
+    
+    final_report = results['write']
+    print("Writer agent completed")
+    metrics.finish()
+    
+    # Complete
+    publish_research(research_id, {
+        'status': 'completed',
+        'progress': 100,
+        'message': 'Research completed successfully!',
+        'result': final_report,
+        'partial_result': None,
+        'pipeline': pipeline_report,
+        'metrics': metrics.as_dict(),
+        # A refresh skips these and only looks at sources published since
+        'source_urls': response_urls([results['primary_search']] + results['targeted_search'])
+    }, final=True)
+    
+    print(f"=== Research {research_id} completed successfully ===")
+    
+    if Config.PDF_RENDER_EAGER:
+        pdf_renderer.submit(research_id, final_report, query)
+    
+    # Later jobs can answer overlapping sub-queries from what this one fetched
+    corpus = get_corpus()
+    if corpus is not None:
+        try:
+            indexed = corpus.add_responses([results['primary_search']] + results['targeted_search'])
+            print(f"Indexed {indexed} sources into the corpus")
+        except Exception as e:
+            print(f"Corpus update failed: {str(e)}")
+
+def fail_research(research_id, error, metrics):
+    """Record a cancelled or failed job"""
+    if isinstance(error, JobCancelled):
+        print(f"=== Research {research_id} cancelled ===")
+        publish_research(research_id, {
+            'status': 'cancelled',
+            'message': 'Research was cancelled',
+            'error': 'Research was cancelled',
+            'metrics': metrics.as_dict()
+        }, final=True)
+        return
+    
+    error_msg = f'Research failed: {str(error)}'
+    print(f"ERROR in run_research: {error_msg}")
+    print(f"Traceback: {traceback.format_exc()}")
+    
+    publish_research(research_id, {
+        'status': 'error',
+        'progress': 0,
+        'message': error_msg,
+        'error': str(error),
+        'metrics': metrics.as_dict()
+    }, final=True)
+
+def run_research(research_id, query, profile=None):
+    """Run research on a scheduler worker thread"""
+    print(f"=== Starting research thread for {research_id} ===")
+    job = scheduler.get_job(research_id)
+    metrics = NULL_JOB_METRICS
+    
+    def check_cancelled():
+        if job is not None:
+            job.check_cancelled()
+    
+    try:
+        metrics = begin_research(research_id, job, profile)
         
-        agents = ModernResearchAgents()
-        retrieval = TavilyRetrievalSystem(agents.tavily_api_key)
+        # Clients and chains are built once per process and shared across jobs
+        registry = get_registry()
+        retrieval = registry.retrieval
+        chains = registry.chains(profile)
+        print(f"Agents initialized successfully ({chains.name} profile)")
         
-        research_agent = agents.setup_research_agent()
-        summarizer_agent = agents.setup_summarizer_agent()
-        critic_agent = agents.setup_critic_agent()
-        writer_agent = agents.setup_writer_agent()
+        # Stage functions receive their dependencies' outputs by stage name
+        def primary_search(inputs):
+            response = retrieval.fetch_primary(query, metrics)
+            print(f"Primary search completed, {len(response.get('results') or [])} results")
+            return response
         
-        print("Agents initialized successfully")
+        def targeted_search(inputs):
+            responses = retrieval.fetch_targeted(query, metrics)
+            print(f"Targeted searches completed, {len(responses)} responses")
+            return responses
         
-        # Phase 1: Search
-        print("Phase 2: Starting search...")
-        research_progress[research_id].update({
-            'status': 'searching',
-            'progress': 25,
-            'message': 'Conducting advanced web search...'
-        })
+        def research_context(inputs):
+            return build_research_context(registry, query, inputs['primary_search'])
         
-        search_results = retrieval.advanced_search(query)
-        print(f"Search completed, results length: {len(search_results)}")
+        def targeted_context(inputs):
+            return build_targeted_context(registry, query, inputs['primary_search'], inputs['targeted_search'])
         
-        research_data = research_agent.invoke({
-            "query": query, 
-            "search_results": search_results
-        })
-        print("Research agent completed")
-        
-        # Phase 2: Summarize
-        print("Phase 3: Summarizing...")
-        research_progress[research_id].update({
-            'status': 'summarizing',
-            'progress': 50,
-            'message': 'Processing and summarizing information...'
-        })
+        def research(inputs):
+            metrics.add_context('agent.research', inputs['research_context'])
+            with metrics.timed('agent.research'):
+                return chains.research_agent.invoke({
+                    "query": query, 
+                    "search_results": inputs['research_context']
+                }, config=metrics.llm_config('agent.research'))
         
-        summary = summarizer_agent.invoke({"research_content": research_data})
-        print("Summarizer agent completed")
+        def summarize(inputs):
+            research_content = summarizer_content(inputs['research'], inputs['targeted_context'])
+            metrics.add_context('agent.summarizer', research_content)
+            with metrics.timed('agent.summarizer'):
+                return chains.summarizer_agent.invoke(
+                    {"research_content": research_content},
+                    config=metrics.llm_config('agent.summarizer')
+                )
         
-        # Phase 3: Critique
-        print("Phase 4: Critiquing...")
-        research_progress[research_id].update({
-            'status': 'critiquing',
-            'progress': 75,
-            'message': 'Fact-checking and verification...'
-        })
+        def critique(inputs):
+            return critique_by_section(chains.critic_agent, inputs['summarize'], metrics)
         
-        critique = critic_agent.invoke({"summary_content": summary})
-        print("Critic agent completed")
+        def write(inputs):
+            research_data = writer_research_data(
+                registry, query, inputs['primary_search'], inputs['targeted_search'], inputs['research']
+            )
+            metrics.add_context('agent.writer', research_data, inputs['summarize'], inputs.get('critique', ''))
+            
+            # Stream the report so listeners can render it while it is written
+            report_chunks = []
+            last_flush = time.monotonic()
+            with metrics.timed('agent.writer'):
+                for chunk in chains.writer_agent.stream({
+                    "research_data": research_data,
+                    "summary": inputs['summarize'],
+                    "critique": inputs.get('critique', '')
+                }, config=metrics.llm_config('agent.writer')):
+                    check_cancelled()
+                    report_chunks.append(chunk)
+                    
+                    if time.monotonic() - last_flush >= Config.REPORT_STREAM_FLUSH_INTERVAL:
+                        publish_research(research_id, {'partial_result': ''.join(report_chunks)})
+                        last_flush = time.monotonic()
+            
+            return ''.join(report_chunks)
         
-        # Phase 4: Write Report
-        print("Phase 5: Writing report...")
-        research_progress[research_id].update({
-            'status': 'writing',
-            'progress': 90,
-            'message': 'Generating final report...'
-        })
+        pipeline = PipelineExecutor(research_stages({
+            'primary_search': primary_search,
+            'targeted_search': targeted_search,
+            'research_context': research_context,
+            'targeted_context': targeted_context,
+            'research': research,
+            'summarize': summarize,
+            'critique': critique,
+            'write': write
+        }, research_phase(research_id, metrics), skip_critic=chains.skip_critic),
+            max_concurrency=Config.PIPELINE_MAX_CONCURRENCY, cancel_check=check_cancelled)
         
-        final_report = writer_agent.invoke({
-            "research_data": research_data,
-            "summary": summary,
-            "critique": critique
-        })
-        print("Writer agent completed")
-        
-        # Complete
-        research_progress[research_id].update({
-            'status': 'completed',
-            'progress': 100,
-            'message': 'Research completed successfully!',
-            'result': final_report
-        })
+        try:
+            results = pipeline.run()
+        finally:
+            pipeline_report = pipeline.report()
+            print(f"Pipeline timings: {pipeline_report}")
         
-        print(f"=== Research {research_id} completed successfully ===")
+        complete_research(research_id, query, results, pipeline_report, metrics)
         
     except Exception as e:
-        error_msg = f'Research failed: {str(e)}'
-        print(f"ERROR in run_research: {error_msg}")
-        print(f"Traceback: {traceback.format_exc()}")
+        fail_research(research_id, e, metrics)
+
+async def run_research_async(research_id, query, profile=None):
+    """Run research as a task on the scheduler's event loop.
+    
+    Same pipeline as ``run_research``, but Groq and Tavily calls are awaited
+    (ainvoke, astream, AsyncTavilyClient), so a waiting job holds no thread.
+    CPU-bound context building still runs in the loop's thread pool.
+    """
+    print(f"=== Starting research task for {research_id} ===")
+    job = scheduler.get_job(research_id)
+    metrics = NULL_JOB_METRICS
+    
+    def check_cancelled():
+        if job is not None:
+            job.check_cancelled()
+    
+    try:
+        metrics = begin_research(research_id, job, profile)
+        
+        # Building the registry the first time is blocking work
+        registry = await asyncio.to_thread(get_registry)
+        retrieval = registry.retrieval
+        chains = registry.chains(profile)
+        print(f"Agents initialized successfully ({chains.name} profile)")
+        
+        async def primary_search(inputs):
+            response = await retrieval.afetch_primary(query, metrics)
+            print(f"Primary search completed, {len(response.get('results') or [])} results")
+            return response
+        
+        async def targeted_search(inputs):
+            responses = await retrieval.afetch_targeted(query, metrics)
+            print(f"Targeted searches completed, {len(responses)} responses")
+            return responses
+        
+        def research_context(inputs):
+            return build_research_context(registry, query, inputs['primary_search'])
+        
+        def targeted_context(inputs):
+            return build_targeted_context(registry, query, inputs['primary_search'], inputs['targeted_search'])
+        
+        async def research(inputs):
+            metrics.add_context('agent.research', inputs['research_context'])
+            with metrics.timed('agent.research'):
+                return await chains.research_agent.ainvoke({
+                    "query": query,
+                    "search_results": inputs['research_context']
+                }, config=metrics.llm_config('agent.research'))
+        
+        async def summarize(inputs):
+            research_content = summarizer_content(inputs['research'], inputs['targeted_context'])
+            metrics.add_context('agent.summarizer', research_content)
+            with metrics.timed('agent.summarizer'):
+                return await chains.summarizer_agent.ainvoke(
+                    {"research_content": research_content},
+                    config=metrics.llm_config('agent.summarizer')
+                )
+        
+        async def critique(inputs):
+            return await acritique_by_section(chains.critic_agent, inputs['summarize'], metrics)
+        
+        async def write(inputs):
+            research_data = await asyncio.to_thread(
+                writer_research_data,
+                registry, query, inputs['primary_search'], inputs['targeted_search'], inputs['research']
+            )
+            metrics.add_context('agent.writer', research_data, inputs['summarize'], inputs.get('critique', ''))
+            
+            report_chunks = []
+            last_flush = time.monotonic()
+            with metrics.timed('agent.writer'):
+                async for chunk in chains.writer_agent.astream({
+                    "research_data": research_data,
+                    "summary": inputs['summarize'],
+                    "critique": inputs.get('critique', '')
+                }, config=metrics.llm_config('agent.writer')):
+                    check_cancelled()
+                    report_chunks.append(chunk)
+                    
+                    if time.monotonic() - last_flush >= Config.REPORT_STREAM_FLUSH_INTERVAL:
+                        publish_research(research_id, {'partial_result': ''.join(report_chunks)})
+                        last_flush = time.monotonic()
+            
+            return ''.join(report_chunks)
         
-        research_progress[research_id].update({
-            'status': 'error',
+        pipeline = PipelineExecutor(research_stages({
+            'primary_search': primary_search,
+            'targeted_search': targeted_search,
+            'research_context': research_context,
+            'targeted_context': targeted_context,
+            'research': research,
+            'summarize': summarize,
+            'critique': critique,
+            'write': write
+        }, research_phase(research_id, metrics), skip_critic=chains.skip_critic),
+            max_concurrency=Config.PIPELINE_MAX_CONCURRENCY, cancel_check=check_cancelled)
+        
+        try:
+            results = await pipeline.arun()
+        finally:
+            pipeline_report = pipeline.report()
+            print(f"Pipeline timings: {pipeline_report}")
+        
+        # Corpus indexing and the PDF hand-off touch SQLite and pickle the report
+        await asyncio.to_thread(complete_research, research_id, query, results, pipeline_report, metrics)
+        
+    except Exception as e:
+        fail_research(research_id, e, metrics)
+
+# Scheduler target for new jobs
+research_target = run_research_async if Config.ASYNC_MODE else run_research
+
+# One refresh at a time may be queued for a research ID
+refresh_lock = threading.Lock()
+
+def enqueue_refresh(research_id, client_id='anonymous'):
+    """Queue an incremental refresh of a completed research job.
+    
+    Raises KeyError for an unknown research ID, ValueError when the job is
+    not completed and QueueFullError when the queue is full; the job keeps
+    its completed report either way.
+    """
+    with refresh_lock:
+        progress_data = job_store.get(research_id)
+        if progress_data is None:
+            raise KeyError(research_id)
+        if progress_data['status'] != 'completed':
+            raise ValueError('Only completed research can be refreshed')
+        
+        # New sources are those published since the report was last written
+        last_run = progress_data.get('finished_at') or progress_data['created_at']
+        job_store.update(research_id, {
+            'status': 'queued',
             'progress': 0,
-            'message': error_msg,
-            'error': str(e)
+            'message': 'Waiting for an available research agent to refresh the report...',
+            'refreshing': True
         })
+        try:
+            scheduler.submit(research_id, refresh_target, research_id, last_run, client_id=client_id)
+        except QueueFullError:
+            job_store.update(research_id, {
+                **{key: progress_data[key] for key in ('status', 'progress', 'message', 'finished_at') if key in progress_data},
+                'refreshing': False
+            })
+            raise
+    print(f"Refresh of {research_id} queued, looking for sources since {datetime.fromtimestamp(last_run)}")
+
+def refresh_outcome(message, error=None):
+    """Job fields that end a refresh which left the previous report in place"""
+    return {
+        'status': 'completed',
+        'progress': 100,
+        'message': message,
+        'partial_result': None,
+        'refreshing': False,
+        'refresh_error': error
+    }
+
+def refresh_stages(stage_funcs, phase):
+    """The refresh DAG: only the new sources go through research and summarizer, then the writer patches"""
+    return [
+        Stage('primary_search', stage_funcs['primary_search'],
+              on_start=phase('searching', 25, 'Searching for sources published since the last run...')),
+        Stage('targeted_search', stage_funcs['targeted_search']),
+        Stage('delta', stage_funcs['delta'], depends_on=['primary_search', 'targeted_search']),
+        Stage('research_context', stage_funcs['research_context'], depends_on=['delta']),
+        Stage('research', stage_funcs['research'], depends_on=['research_context'],
+              on_start=phase('researching', 40, 'Analyzing new sources...')),
+        Stage('summarize', stage_funcs['summarize'], depends_on=['research'],
+              on_start=phase('summarizing', 60, 'Summarizing new findings...')),
+        Stage('patch', stage_funcs['patch'], depends_on=['delta', 'summarize'],
+              on_start=phase('writing', 85, 'Updating the affected report sections...')),
+    ]
+
+def refresh_delta(registry, progress_data, since, primary_response, targeted_responses):
+    """What a refresh works on: the new sources, the report split into sections, and the sections they touch"""
+    from utils.agents import REPORT_SECTIONS
+    from utils.refresh import new_results, merge_responses, report_urls, response_urls, split_report, match_sections
+    
+    seen_urls = progress_data.get('source_urls') or report_urls(progress_data['result'])
+    response = merge_responses(progress_data['query'], new_results(
+        [primary_response] + targeted_responses, seen_urls, since
+    ))
+    
+    context_budgeter = registry.context_budgeter
+    sources = context_budgeter.unique_sources([response])
+    passages = [
+        (passage, source.get('url') or '')
+        for source in sources
+        for passage in context_budgeter.passages(source)
+    ]
+    parts = split_report(progress_data['result'], REPORT_SECTIONS)
+    # References are updated without the model
+    targets = match_sections(parts, passages, Config.REFRESH_SECTION_MIN_SCORE, Config.REFRESH_MAX_SECTIONS,
+                             exclude=(REPORT_SECTIONS[-1],))
+    print(f"Refresh delta: {len(sources)} new sources, {len(passages)} passages, "
+          f"sections to patch: {[parts[i][0] for i in targets]}")
+    
+    return {
+        'since': since,
+        'response': response,
+        'sources': sources,
+        'parts': parts,
+        'targets': {i: hits[:Config.REFRESH_PASSAGES_PER_SECTION] for i, hits in targets.items()},
+        'source_urls': seen_urls + [url for url in response_urls([response]) if url not in seen_urls]
+    }
+
+def refresh_context(registry, query, delta):
+    # Nothing new that fits the report means no model calls at all
+    if not delta['targets']:
+        return ''
+    return build_research_context(registry, query, delta['response'])
+
+def patch_inputs(query, delta, summary):
+    """Prompt inputs of the patch agent per targeted section, in report order"""
+    from utils.refresh import format_passages
+    
+    return [
+        (part_index, {
+            "query": query,
+            "section": delta['parts'][part_index][1],
+            "new_findings": summary,
+            "new_sources": format_passages(passages)
+        })
+        for part_index, passages in delta['targets'].items()
+    ]
+
+def patch_report(delta, revised):
+    """The report with the revised sections swapped in and new sources added to the references"""
+    from utils.agents import REPORT_SECTIONS
+    from utils.refresh import keep_heading, append_references
+    
+    references = REPORT_SECTIONS[-1]
+    texts = []
+    for part_index, (title, text) in enumerate(delta['parts']):
+        if part_index in revised:
+            text = keep_heading(text, revised[part_index])
+        elif title == references:
+            text = append_references(text, delta['sources'])
+        texts.append(text)
+    
+    if not any(title == references for title, _ in delta['parts']):
+        texts.append(append_references(f"\n# {references}\n", delta['sources']))
+    return ''.join(texts)
+
+def patch_sections(patch_agent, query, delta, summary, metrics=NULL_JOB_METRICS):
+    """Revise the targeted sections in parallel; returns the patched report"""
+    def run_patch(inputs):
+        metrics.add_context('agent.patch', inputs['section'], inputs['new_findings'], inputs['new_sources'])
+        return patch_agent.invoke(inputs, config=metrics.llm_config('agent.patch'))
+    
+    inputs = patch_inputs(query, delta, summary)
+    # Like the critic, one wall-clock time for sections patched concurrently
+    with metrics.timed('agent.patch'):
+        with ThreadPoolExecutor(max_workers=Config.PIPELINE_MAX_CONCURRENCY) as executor:
+            revised = list(executor.map(run_patch, [section_inputs for _, section_inputs in inputs]))
+    
+    return patch_report(delta, {part_index: text for (part_index, _), text in zip(inputs, revised)})
+
+async def apatch_sections(patch_agent, query, delta, summary, metrics=NULL_JOB_METRICS):
+    """``patch_sections`` with ainvoke, at most PIPELINE_MAX_CONCURRENCY patches at a time"""
+    semaphore = asyncio.Semaphore(Config.PIPELINE_MAX_CONCURRENCY)
+    
+    async def run_patch(inputs):
+        metrics.add_context('agent.patch', inputs['section'], inputs['new_findings'], inputs['new_sources'])
+        async with semaphore:
+            return await patch_agent.ainvoke(inputs, config=metrics.llm_config('agent.patch'))
+    
+    inputs = patch_inputs(query, delta, summary)
+    with metrics.timed('agent.patch'):
+        revised = await asyncio.gather(*[run_patch(section_inputs) for _, section_inputs in inputs])
+    # Joining the sections can be a large string operation
+    return await asyncio.to_thread(
+        patch_report, delta, {part_index: text for (part_index, _), text in zip(inputs, revised)}
+    )
+
+def complete_refresh(research_id, progress_data, results, pipeline_report, metrics):
+    delta = results['delta']
+    patched = [delta['parts'][part_index][0] for part_index in delta['targets']]
+    refreshed_at = time.time()
+    refreshes = (progress_data.get('refreshes') or []) + [{
+        'refreshed_at': refreshed_at,
+        'since': delta['since'],
+        'new_sources': len(delta['sources']),
+        'sections_patched': patched
+    }]
+    
+    if not delta['sources']:
+        publish_research(research_id, {
+            **refresh_outcome(f"No new sources since {delta['since']}, the report is unchanged"),
+            'refreshed_at': refreshed_at,
+            'refreshes': refreshes,
+            'pipeline': pipeline_report,
+            'metrics': metrics.as_dict()
+        }, final=True)
+        print(f"=== Refresh of {research_id} found nothing new ===")
+        return
+    
+    metrics.finish()
+    
+    # Downloads of the previous report stay valid for requests coalesced with this one
+    previous_artifact_id = progress_data.get('artifact_id')
+    artifact_id = f"{research_id}_refresh_{len(refreshes)}"
+    report = results['patch'] if patched else patch_report(delta, {})
+    
+    publish_research(research_id, {
+        **refresh_outcome(
+            f"Report refreshed with {len(delta['sources'])} new sources"
+            + (f", updated {', '.join(patched)}" if patched else "")
+        ),
+        'result': report,
+        'artifact_id': artifact_id,
+        'source_urls': delta['source_urls'],
+        'refreshed_at': refreshed_at,
+        'refreshes': refreshes,
+        'pipeline': pipeline_report,
+        'metrics': metrics.as_dict()
+    }, final=True)
+    print(f"=== Refresh of {research_id} completed: {len(delta['sources'])} new sources, patched {patched} ===")
+    
+    if previous_artifact_id is not None:
+        artifact_store.discard(previous_artifact_id)
+        pdf_renderer.discard(previous_artifact_id)
+    if Config.PDF_RENDER_EAGER:
+        pdf_renderer.submit(artifact_id, report, progress_data['query'])
+    
+    corpus = get_corpus()
+    if corpus is not None:
+        try:
+            indexed = corpus.add_responses([delta['response']])
+            print(f"Indexed {indexed} sources into the corpus")
+        except Exception as e:
+            print(f"Corpus update failed: {str(e)}")
+
+def fail_refresh(research_id, error, metrics):
+    """Record a cancelled or failed refresh; the previous report stays in place"""
+    if isinstance(error, JobCancelled):
+        print(f"=== Refresh of {research_id} cancelled ===")
+        fields = refresh_outcome('Refresh was cancelled, showing the previous report')
+    else:
+        print(f"ERROR in refresh: {str(error)}")
+        print(f"Traceback: {traceback.format_exc()}")
+        fields = refresh_outcome(f'Refresh failed: {str(error)}. Showing the previous report', error=str(error))
+    
+    publish_research(research_id, {**fields, 'metrics': metrics.as_dict()}, final=True)
+
+def run_refresh(research_id, last_run):
+    """Refresh a completed report on a scheduler worker thread, from sources newer than ``last_run``"""
+    print(f"=== Starting refresh thread for {research_id} ===")
+    job = scheduler.get_job(research_id)
+    metrics = NULL_JOB_METRICS
+    
+    def check_cancelled():
+        if job is not None:
+            job.check_cancelled()
+    
+    try:
+        # A refresh runs with the profile the report was written with
+        progress_data = job_store.get(research_id)
+        profile = progress_data.get('profile')
+        query = progress_data['query']
+        
+        metrics = begin_research(research_id, job, profile)
+        registry = get_registry()
+        retrieval = registry.retrieval
+        chains = registry.chains(profile)
+        from utils.refresh import since_date
+        since = since_date(last_run)
+        
+        def primary_search(inputs):
+            return retrieval.fetch_primary(query, metrics, since=since)
+        
+        def targeted_search(inputs):
+            return retrieval.fetch_targeted(query, metrics, since=since)
+        
+        def delta(inputs):
+            return refresh_delta(registry, progress_data, since, inputs['primary_search'], inputs['targeted_search'])
+        
+        def research_context(inputs):
+            return refresh_context(registry, query, inputs['delta'])
+        
+        def research(inputs):
+            if not inputs['research_context']:
+                return ''
+            metrics.add_context('agent.research', inputs['research_context'])
+            with metrics.timed('agent.research'):
+                return chains.research_agent.invoke({
+                    "query": query,
+                    "search_results": inputs['research_context']
+                }, config=metrics.llm_config('agent.research'))
+        
+        def summarize(inputs):
+            if not inputs['research']:
+                return ''
+            metrics.add_context('agent.summarizer', inputs['research'])
+            with metrics.timed('agent.summarizer'):
+                return chains.summarizer_agent.invoke(
+                    {"research_content": inputs['research']},
+                    config=metrics.llm_config('agent.summarizer')
+                )
+        
+        def patch(inputs):
+            if not inputs['summarize']:
+                return None
+            return patch_sections(chains.patch_agent, query, inputs['delta'], inputs['summarize'], metrics)
+        
+        pipeline = PipelineExecutor(refresh_stages({
+            'primary_search': primary_search,
+            'targeted_search': targeted_search,
+            'delta': delta,
+            'research_context': research_context,
+            'research': research,
+            'summarize': summarize,
+            'patch': patch
+        }, research_phase(research_id, metrics)),
+            max_concurrency=Config.PIPELINE_MAX_CONCURRENCY, cancel_check=check_cancelled)
+        
+        try:
+            results = pipeline.run()
+        finally:
+            pipeline_report = pipeline.report()
+            print(f"Pipeline timings: {pipeline_report}")
+        
+        complete_refresh(research_id, progress_data, results, pipeline_report, metrics)
+        
+    except Exception as e:
+        fail_refresh(research_id, e, metrics)
+
+async def run_refresh_async(research_id, last_run):
+    """``run_refresh`` as a task on the scheduler's event loop"""
+    print(f"=== Starting refresh task for {research_id} ===")
+    job = scheduler.get_job(research_id)
+    metrics = NULL_JOB_METRICS
+    
+    def check_cancelled():
+        if job is not None:
+            job.check_cancelled()
+    
+    try:
+        progress_data = job_store.get(research_id)
+        profile = progress_data.get('profile')
+        query = progress_data['query']
+        
+        metrics = begin_research(research_id, job, profile)
+        registry = await asyncio.to_thread(get_registry)
+        retrieval = registry.retrieval
+        chains = registry.chains(profile)
+        from utils.refresh import since_date
+        since = since_date(last_run)
+        
+        async def primary_search(inputs):
+            return await retrieval.afetch_primary(query, metrics, since=since)
+        
+        async def targeted_search(inputs):
+            return await retrieval.afetch_targeted(query, metrics, since=since)
+        
+        def delta(inputs):
+            return refresh_delta(registry, progress_data, since, inputs['primary_search'], inputs['targeted_search'])
+        
+        def research_context(inputs):
+            return refresh_context(registry, query, inputs['delta'])
+        
+        async def research(inputs):
+            if not inputs['research_context']:
+                return ''
+            metrics.add_context('agent.research', inputs['research_context'])
+            with metrics.timed('agent.research'):
+                return await chains.research_agent.ainvoke({
+                    "query": query,
+                    "search_results": inputs['research_context']
+                }, config=metrics.llm_config('agent.research'))
+        
+        async def summarize(inputs):
+            if not inputs['research']:
+                return ''
+            metrics.add_context('agent.summarizer', inputs['research'])
+            with metrics.timed('agent.summarizer'):
+                return await chains.summarizer_agent.ainvoke(
+                    {"research_content": inputs['research']},
+                    config=metrics.llm_config('agent.summarizer')
+                )
+        
+        async def patch(inputs):
+            if not inputs['summarize']:
+                return None
+            return await apatch_sections(chains.patch_agent, query, inputs['delta'], inputs['summarize'], metrics)
+        
+        pipeline = PipelineExecutor(refresh_stages({
+            'primary_search': primary_search,
+            'targeted_search': targeted_search,
+            'delta': delta,
+            'research_context': research_context,
+            'research': research,
+            'summarize': summarize,
+            'patch': patch
+        }, research_phase(research_id, metrics)),
+            max_concurrency=Config.PIPELINE_MAX_CONCURRENCY, cancel_check=check_cancelled)
+        
+        try:
+            results = await pipeline.arun()
+        finally:
+            pipeline_report = pipeline.report()
+            print(f"Pipeline timings: {pipeline_report}")
+        
+        await asyncio.to_thread(complete_refresh, research_id, progress_data, results, pipeline_report, metrics)
+        
+    except Exception as e:
+        fail_refresh(research_id, e, metrics)
+
+# Scheduler target for refreshes
+refresh_target = run_refresh_async if Config.ASYNC_MODE else run_refresh
+
+def build_progress_payload(research_id, progress_data):
+    """Add live queue depth, position and wait time from the scheduler"""
+    # Attached requests report the position of the job doing their work
+    progress_data.update(scheduler.job_info(progress_data.get('coalesced_with') or research_id))
+    if progress_data['status'] == 'queued' and progress_data.get('queue_position'):
+        progress_data['message'] = (
+            f"Waiting in research queue (position {progress_data['queue_position']} "
+            f"of {progress_data['queue_depth']})..."
+        )
+    return progress_data
+
+def research_progress(research_id):
+    """(payload, status) for a progress poll; shared by the Flask view and the ASGI front end"""
+    progress_data = job_store.get(research_id)
+    if progress_data is None:
+        print(f"Research ID {research_id} not found")
+        return {'error': 'Research ID not found'}, 404
+    
+    progress_data.pop('partial_result', None)
+    return build_progress_payload(research_id, progress_data), 200
 
 @app.route('/research_progress/<research_id>')
 def get_research_progress(research_id):
     """Get research progress"""
-    print(f"Progress check for: {research_id}")  # Debug log
-    
-    if research_id not in research_progress:
+    payload, status = research_progress(research_id)
+    return jsonify(payload), status
+
+@app.route('/research_stream/<research_id>')
+def stream_research_progress(research_id):
+    """Push progress updates as Server-Sent Events"""
+    if job_store.get(research_id) is None:
         print(f"Research ID {research_id} not found")
         return jsonify({'error': 'Research ID not found'}), 404
     
-    progress_data = research_progress[research_id]
-    print(f"Progress data: {progress_data}")  # Debug log
+    # EventSource sends the last seen event ID when it reconnects
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '')
+    since_version = int(last_event_id) if last_event_id.isdigit() else -1
+    
+    def generate():
+        version = since_version
+        last_state = None
+        # Characters of the streamed report already sent on this connection
+        report_offset = 0
+        yield f"retry: {Config.SSE_RETRY_MS}\n\n"
+        
+        while True:
+            progress_data = job_store.wait_for_change(research_id, version, Config.SSE_HEARTBEAT_INTERVAL)
+            if progress_data is None:
+                yield f"event: error\ndata: {json.dumps({'error': 'Research ID not found'})}\n\n"
+                return
+            
+            # The final report is fetched from the result page, not streamed here
+            progress_data.pop('result', None)
+            partial_result = progress_data.pop('partial_result', None) or ''
+            payload = build_progress_payload(research_id, progress_data)
+            timed_out = payload['version'] == version
+            version = payload['version']
+            events = []
+            
+            # Render only complete lines, the trailing fragment waits for more text
+            complete_end = partial_result.rfind('\n') + 1
+            if complete_end > report_offset:
+                # Each chunk is rendered once, so it stays out of the report cache
+                html = markdown_chunk_to_html(partial_result[report_offset:complete_end])
+                events.append(f"event: report\ndata: {json.dumps({'start': report_offset, 'html': html})}\n\n")
+                report_offset = complete_end
+            
+            state = {k: v for k, v in payload.items() if k not in ('version', 'updated_at')}
+            if state != last_state:
+                events.append(f"id: {version}\nevent: progress\ndata: {json.dumps(payload)}\n\n")
+                last_state = state
+            
+            if events:
+                yield ''.join(events)
+            elif timed_out:
+                yield ": heartbeat\n\n"
+            
+            if payload['status'] in FINISHED_STATUSES:
+                return
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/cancel_research/<research_id>', methods=['POST'])
+def cancel_research(research_id):
+    """Cancel a queued or running research job"""
+    print(f"Cancel request for: {research_id}")  # Debug log
+    
+    progress_data = job_store.get(research_id)
+    if progress_data is None:
+        return jsonify({'error': 'Research ID not found'}), 404
+    
+    if progress_data['status'] in FINISHED_STATUSES or not withdraw_research(research_id):
+        return jsonify({'error': 'Research is not queued or running'}), 409
+    
+    if progress_data['status'] == 'queued' and progress_data.get('refreshing'):
+        # A cancelled refresh leaves the previous report in place
+        job_store.update(research_id, refresh_outcome('Refresh was cancelled, showing the previous report'))
+    elif progress_data['status'] == 'queued':
+        job_store.update(research_id, {
+            'status': 'cancelled',
+            'message': 'Research was cancelled',
+            'error': 'Research was cancelled'
+        })
+    
+    return jsonify({'research_id': research_id, 'status': 'cancelling'})
+
+@app.route('/refresh_research/<research_id>', methods=['POST'])
+def refresh_research(research_id):
+    """Update a completed report with what was published since it was written"""
+    print(f"Refresh request for: {research_id}")  # Debug log
+    
+    try:
+        enqueue_refresh(research_id, get_client_id())
+    except KeyError:
+        return jsonify({'error': 'Research ID not found'}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    except QueueFullError as e:
+        print(f"Refresh rejected: {str(e)} (queue depth {e.queue_depth})")
+        return jsonify({
+            'error': f'{str(e)}. Please try again shortly.',
+            'queue_depth': e.queue_depth,
+            'queue_position': e.queue_depth + 1
+        }), 429, {'Retry-After': '30'}
     
-    return jsonify(progress_data)
+    return jsonify({'research_id': research_id, 'status': 'queued', **scheduler.job_info(research_id)})
+
+def record_render_time(research_id, stage, seconds):
+    """Add report rendering time to the job's metrics and the /metrics histograms"""
+    if not Config.METRICS_ENABLED:
+        return
+    
+    metrics_registry.stage_seconds.observe(seconds, stage=stage)
+    
+    progress_data = job_store.get(research_id)
+    if progress_data is not None:
+        job_metrics = progress_data.get('metrics') or {}
+        stage_seconds = dict(job_metrics.get('stage_seconds', {}))
+        stage_seconds[stage] = round(seconds, 3)
+        job_store.update(research_id, {'metrics': {**job_metrics, 'stage_seconds': stage_seconds}})
 
 @app.route('/research_result/<research_id>')
 def research_result(research_id):
     """Display research results"""
     print(f"Displaying results for: {research_id}")  # Debug log
     
-    if research_id not in research_progress:
+    progress_data = job_store.get(research_id)
+    if progress_data is None:
         print(f"Research ID {research_id} not found")
         return render_template('index.html', error='Research not found')
     
-    progress_data = research_progress[research_id]
-    
-    if progress_data['status'] != 'completed':
+    if not report_available(progress_data):
         print(f"Research {research_id} not completed yet, status: {progress_data['status']}")
         return render_template('index.html', error='Research not completed yet')
     
-    print(f"Rendering research results for {research_id}")
-    return render_template('research.html', 
-                         query=progress_data['query'],
-                         report=progress_data['result'],
-                         research_id=research_id)
+    def render():
+        print(f"Rendering research results for {research_id}")
+        started = time.perf_counter()
+        html = render_template('research.html', 
+                             query=progress_data['query'],
+                             report=progress_data['result'],
+                             research_id=research_id)
+        record_render_time(research_id, 'render.html', time.perf_counter() - started)
+        return html.encode('utf-8'), 'text/html', None
+    
+    # The page links to this request's own downloads, so unlike the
+    # downloads it is not shared with coalesced requests
+    page_id = progress_data.get('artifact_id') or research_id
+    return artifact_response(
+        artifact_store.get_or_render(page_id, 'html', render),
+        as_attachment=False
+    )
+
+def report_available(progress_data):
+    """Whether a job has a report to serve; a refresh keeps serving the previous one until it replaces it"""
+    return progress_data['status'] == 'completed' or bool(progress_data.get('refreshing'))
+
+def artifact_id_for(research_id, progress_data):
+    """Key of a job's rendered artifacts: shared by coalesced requests, new after every refresh"""
+    return progress_data.get('artifact_id') or progress_data.get('coalesced_with') or research_id
+
+def artifact_response(artifact, as_attachment=True, environ=None):
+    """Serve a stored artifact straight from its buffer, answering If-None-Match with 304.
+    
+    ``environ`` replaces the current request, e.g. for the ASGI front end.
+    """
+    response = Response(artifact.stream(), mimetype=artifact.mimetype)
+    response.content_length = artifact.size
+    response.set_etag(artifact.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    if as_attachment:
+        response.headers.set('Content-Disposition', 'attachment', filename=artifact.filename)
+    return response.make_conditional(environ if environ is not None else request)
+
+def streamed_json_response(report_data, filename):
+    """Export a large report without holding its encoded JSON in memory"""
+    response = Response(iter_json(report_data), mimetype='application/json')
+    response.headers.set('Content-Disposition', 'attachment', filename=filename)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/download/<format>/<research_id>')
 def download_report(format, research_id):
     """Download report in specified format"""
     print(f"Download request: {format} for {research_id}")  # Debug log
     
-    if research_id not in research_progress:
+    progress_data = job_store.get(research_id)
+    if progress_data is None:
         print(f"Research ID {research_id} not found for download")
         return "Research not found", 404
     
-    progress_data = research_progress[research_id]
-    
-    if progress_data['status'] != 'completed':
+    if not report_available(progress_data):
         print(f"Research {research_id} not completed for download")
         return "Research not completed", 400
     
     query = progress_data['query']
     report_content = progress_data['result']
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # Requests coalesced onto one job share its rendered downloads
+    artifact_id = artifact_id_for(research_id, progress_data)
+    # ReportLab loads with the first download rather than with the app
+    load_research_modules()
+    from utils.report_generator import EnhancedReportGenerator, render_pdf_bytes
     
-    try:
-        if format == 'markdown':
-            content = EnhancedReportGenerator.generate_markdown(report_content, query)
-            filename = f"research_report_{timestamp}.md"
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(content)
-            
-            print(f"Generated markdown file: {filename}")
-            return send_file(filename, as_attachment=True, download_name=filename)
-            
-        elif format == 'pdf':
-            pdf_buffer = EnhancedReportGenerator.generate_pdf(report_content, query)
-            filename = f"research_report_{timestamp}.pdf"
-            
-            with open(filename, 'wb') as f:
-                f.write(pdf_buffer.getvalue())
-            
-            print(f"Generated PDF file: {filename}")
-            return send_file(filename, as_attachment=True, download_name=filename)
-        
-        elif format == 'json':
-            report_data = {
-                "query": query,
-                "report": report_content,
-                "timestamp": datetime.now().isoformat(),
-                "metadata": {
-                    "ai_model": "llama-3.3-70b-versatile",
-                    "search_engine": "tavily_advanced"
-                }
+    def render_markdown():
+        started = time.perf_counter()
+        content = EnhancedReportGenerator.generate_markdown(report_content, query)
+        record_render_time(research_id, 'render.markdown', time.perf_counter() - started)
+        filename = f"research_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
+        print(f"Generated markdown file: {filename}")
+        return content.encode('utf-8'), 'text/markdown', filename
+    
+    def render_pdf():
+        future = pdf_renderer.submit(artifact_id, report_content, query)
+        if future is None:
+            print("PDF render queue is full, rendering in the request")
+            pdf, seconds = render_pdf_bytes(report_content, query)
+        else:
+            try:
+                pdf, seconds = future.result(timeout=Config.PDF_RENDER_TIMEOUT)
+            except FutureTimeoutError:
+                # Leave the render running so a retry picks up its result
+                raise RenderPending(f"PDF render for {artifact_id} is still running")
+            except Exception as e:
+                print(f"Background PDF render failed ({str(e)}), rendering in the request")
+                pdf, seconds = render_pdf_bytes(report_content, query)
+            # The artifact store keeps the bytes from here on
+            pdf_renderer.discard(artifact_id)
+        
+        record_render_time(research_id, 'render.pdf', seconds)
+        filename = f"research_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        print(f"Generated PDF file: {filename}")
+        return pdf, 'application/pdf', filename
+    
+    def json_report_data():
+        profile = progress_data.get('profile') or Config.DEFAULT_PIPELINE_PROFILE
+        settings = Config.PIPELINE_PROFILES.get(profile) or Config.PIPELINE_PROFILES[Config.DEFAULT_PIPELINE_PROFILE]
+        return {
+            "query": query,
+            "report": report_content,
+            "timestamp": datetime.now().isoformat(),
+            "metadata": {
+                "ai_model": settings['agents']['writer']['model'],
+                "pipeline_profile": profile,
+                "search_engine": "tavily_advanced"
             }
-            filename = f"research_data_{timestamp}.json"
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2)
-            
-            print(f"Generated JSON file: {filename}")
-            return send_file(filename, as_attachment=True, download_name=filename)
+        }
+    
+    def render_json():
+        filename = f"research_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        print(f"Generated JSON file: {filename}")
+        return json.dumps(json_report_data(), indent=2).encode('utf-8'), 'application/json', filename
+    
+    renderers = {'markdown': render_markdown, 'pdf': render_pdf, 'json': render_json}
+    if format not in renderers:
+        print(f"Invalid format requested: {format}")
+        return "Invalid format", 400
+    
+    try:
+        if (format == 'json' and len(report_content.encode('utf-8')) > Config.DOWNLOAD_STREAM_JSON_BYTES
+                and artifact_store.get(artifact_id, format) is None):
+            filename = f"research_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            print(f"Streaming JSON export: {filename}")
+            return streamed_json_response(json_report_data(), filename)
         
-        else:
-            print(f"Invalid format requested: {format}")
-            return "Invalid format", 400
+        return artifact_response(artifact_store.get_or_render(artifact_id, format, renderers[format]))
+    
+    except RenderPending as e:
+        print(f"{str(e)}, asking the client to retry")
+        return "PDF is still rendering, please retry shortly", 503, {'Retry-After': '10'}
             
     except Exception as e:
         print(f"ERROR generating {format} file: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
         return f"Error generating {format} file: {str(e)}", 500
 
+@app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus-style latency, token and context size histograms"""
+    body = metrics_registry.render() if Config.METRICS_ENABLED else "# metrics disabled\n"
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
     groq_configured = bool(os.getenv("GROQ_API_KEY"))
     tavily_configured = bool(os.getenv("TAVILY_API_KEY"))
+    search_cache = get_search_cache()
+    corpus = get_corpus()
     
     return jsonify({
         'status': 'healthy',
@@ -363,7 +1617,15 @@ def health_check():
         'api_keys_configured': groq_configured and tavily_configured,
         'groq_configured': groq_configured,
         'tavily_configured': tavily_configured,
-        'debug_mode': app.debug
+        'debug_mode': app.debug,
+        'scheduler': scheduler.stats(),
+        'job_store': job_store.stats(),
+        'search_cache': search_cache.stats() if search_cache is not None else None,
+        'artifacts': artifact_store.stats(),
+        'pdf_renderer': pdf_renderer.stats(),
+        'coalescing': research_flights.stats(),
+        'providers': {name: get_provider_limiter(name).stats() for name in ('groq', 'tavily')},
+        'corpus': corpus.stats() if corpus is not None else None
     })
 
 @app.route('/test', methods=['POST'])
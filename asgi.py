@@ -0,0 +1,126 @@
+"""ASGI entry point: ``uvicorn asgi:application``.
+
+Starting a job, progress polls and downloads of rendered reports are
+answered on the server's event loop, so idle pollers and downloaders cost
+no thread. Every other route runs the Flask app in a worker thread. Set
+ASYNC_MODE=true so the research jobs run on an event loop as well.
+"""
+import re
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from app import (
+    app, job_store, artifact_store, queue_research_request, research_progress,
+    artifact_response, artifact_id_for, client_id_for, report_available
+)
+
+START_RESEARCH_PATH = '/start_research'
+PROGRESS_RE = re.compile(r'/research_progress/(?P<research_id>[^/]+)')
+DOWNLOAD_RE = re.compile(r'/download/(?P<format>[^/]+)/(?P<research_id>[^/]+)')
+
+class ThreadedWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs WSGI apps on one shared thread by default, which would
+    # serialize every fallback request behind a long SSE stream or render
+    run_wsgi_app = sync_to_async(vars(WsgiToAsgiInstance)['run_wsgi_app'].func, thread_sensitive=False)
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+flask_application = ThreadedWsgiToAsgi(app)
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    
+    if scope['type'] == 'http':
+        handled = await handle_native(scope, receive, send)
+        if handled:
+            return
+    
+    await flask_application(scope, receive, send)
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+def is_json(content_type: str) -> bool:
+    """The rule Flask's ``request.is_json`` applies to a Content-Type header"""
+    mimetype = content_type.split(';', 1)[0].strip().lower()
+    return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+async def handle_native(scope, receive, send) -> bool:
+    """Answer the hot routes without Flask; False means the request was left untouched"""
+    method = scope['method']
+    path = scope['path']
+    headers = {name.decode('latin-1'): value.decode('latin-1') for name, value in scope.get('headers', [])}
+    
+    if path == START_RESEARCH_PATH and method == 'POST':
+        if not is_json(headers.get('content-type', '')):
+            # Flask answers the non-JSON case with its usual error
+            return False
+        
+        body = await read_body(receive)
+        client = scope.get('client')
+        client_id = client_id_for(headers.get('x-forwarded-for', ''), client[0] if client else None)
+        payload, status, extra_headers = queue_research_request(body, client_id)
+        await send_response(send, app.json.response(payload), status, extra_headers)
+        return True
+    
+    match = PROGRESS_RE.fullmatch(path)
+    if match and method == 'GET':
+        payload, status = research_progress(match.group('research_id'))
+        await send_response(send, app.json.response(payload), status)
+        return True
+    
+    match = DOWNLOAD_RE.fullmatch(path)
+    if match and method in ('GET', 'HEAD'):
+        # Only reports already rendered into memory; renders and spilled
+        # files go through Flask in a thread
+        research_id = match.group('research_id')
+        progress_data = job_store.get(research_id)
+        if progress_data is None or not report_available(progress_data):
+            return False
+        artifact = artifact_store.get(artifact_id_for(research_id, progress_data), match.group('format'))
+        if artifact is None or artifact.data is None:
+            return False
+        
+        print(f"Download request: {match.group('format')} for {research_id}")
+        environ = {'REQUEST_METHOD': method}
+        if 'if-none-match' in headers:
+            environ['HTTP_IF_NONE_MATCH'] = headers['if-none-match']
+        await send_response(send, artifact_response(artifact, environ=environ), environ=environ)
+        return True
+    
+    return False
+
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+async def send_response(send, response, status=None, extra_headers=None, environ=None):
+    """Send a werkzeug Response whose body is already in memory"""
+    if status is not None:
+        response.status_code = status
+    for name, value in (extra_headers or {}).items():
+        response.headers[name] = value
+    
+    body = b''.join(response.get_app_iter(environ or {'REQUEST_METHOD': 'GET'}))
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.to_wsgi_list()
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
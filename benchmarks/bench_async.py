@@ -0,0 +1,208 @@
+"""Load test of the research scheduler: worker threads against the event loop.
+
+Submits ``jobs`` research jobs at once through /start_research (one client
+each) and polls /research_progress until all have finished. Groq and Tavily
+are replaced by offline fakes with a fixed latency per call, so only the
+scheduling model differs between runs:
+
+- threads: the default pool of MAX_CONCURRENT_RESEARCH worker threads
+- threads-N: a worker thread per job, the over-provisioned alternative
+- async: ASYNC_MODE, every job a task on one event loop
+
+Each mode runs in its own process because the app reads its Config at
+import time. Reported are wall time, jobs/min, p50/p95 job latency, peak
+thread count and peak RSS.
+
+Usage: python benchmarks/bench_async.py [jobs] [latency_seconds]
+"""
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = {
+    'threads': {'ASYNC_MODE': 'false'},
+    'threads-N': {'ASYNC_MODE': 'false', 'MAX_CONCURRENT_RESEARCH': '{jobs}'},
+    'async': {'ASYNC_MODE': 'true', 'MAX_CONCURRENT_RESEARCH_ASYNC': '{jobs}'},
+}
+
+REPORT = "\n".join([
+    "# Executive Summary", "Stub findings about **AI healthcare** in India.",
+    "## Market Analysis", "- Growth item one", "- Growth item two",
+    "## Future Outlook", "More stub text for the report body."
+])
+
+
+def build_registry(latency: float):
+    """Shared clients and chains like ResearchRegistry, backed by fakes"""
+    from utils.registry import load_research_modules
+    # After the app's background preload, which imports the same packages
+    load_research_modules()
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from utils.cache import MemoryCache
+    from utils.context import ContextBudgeter
+    from utils.llm_cache import CachedChatModel
+    from utils.ratelimit import ProviderLimiter
+    from utils.search import TavilyRetrievalSystem
+
+    chunks = 10
+
+    class FakeGroq(BaseChatModel):
+        """Answers after ``latency`` seconds; streams the answer in ten chunks"""
+
+        @property
+        def _llm_type(self):
+            return 'fake-groq'
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(latency)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=REPORT))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(latency)
+            return ChatResult(generations=[ChatGeneration(message=AIMessage(content=REPORT))])
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            for line in REPORT.split("\n"):
+                time.sleep(latency / chunks)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=line + "\n"))
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            for line in REPORT.split("\n"):
+                await asyncio.sleep(latency / chunks)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=line + "\n"))
+
+    def stub_response(query, kwargs):
+        return {
+            'answer': f"Stub answer for {query}",
+            'results': [
+                {'title': f"{query} #{i}", 'url': f"https://example.com/{abs(hash(query))}/{i}",
+                 'content': f"{query} stub content {i}", 'raw_content': f"{query} raw stub content {i}"}
+                for i in range(kwargs.get('max_results') or 5)
+            ]
+        }
+
+    class StubTavily:
+        def search(self, query, **kwargs):
+            time.sleep(latency)
+            return stub_response(query, kwargs)
+
+    class AsyncStubTavily:
+        async def search(self, query, **kwargs):
+            await asyncio.sleep(latency)
+            return stub_response(query, kwargs)
+
+    class BenchRegistry:
+        name = 'bench'
+        skip_critic = False
+
+        def chains(self, profile=None):
+            # One set of fake chains serves every profile
+            return self
+
+    registry = BenchRegistry()
+    registry.retrieval = TavilyRetrievalSystem(
+        'stub', client=StubTavily(), async_client=AsyncStubTavily(), cache=MemoryCache(),
+        limiter=ProviderLimiter('tavily')
+    )
+    registry.context_budgeter = ContextBudgeter()
+    llm = CachedChatModel(FakeGroq(), limiter=ProviderLimiter('groq'))
+    registry.research_agent = PromptTemplate.from_template("{query}{search_results}") | llm | StrOutputParser()
+    registry.summarizer_agent = PromptTemplate.from_template("{research_content}") | llm | StrOutputParser()
+    registry.critic_agent = PromptTemplate.from_template("{summary_content}") | llm | StrOutputParser()
+    registry.writer_agent = PromptTemplate.from_template("{research_data}{summary}{critique}") | llm | StrOutputParser()
+    return registry
+
+
+def run_mode(jobs: int, latency: float) -> dict:
+    """Runs inside the child process, configured through the environment"""
+    import builtins
+    print_ = builtins.print
+    # Per-request and per-stage logging would dominate the measurement
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        import app as app_module
+        from utils import registry as registry_module
+        registry_module._registry = build_registry(latency)
+
+        client = app_module.app.test_client()
+        peak_threads = threading.active_count()
+        submitted = {}
+        started = time.perf_counter()
+        for i in range(jobs):
+            response = client.post('/start_research', json={'query': f"AI healthcare startups {i}"},
+                                   headers={'X-Forwarded-For': f"10.0.{i // 250}.{i % 250}"})
+            submitted[response.get_json()['research_id']] = time.perf_counter()
+
+        latencies = []
+        statuses = {}
+        pending = set(submitted)
+        while pending:
+            # Roughly what a page of pollers adds; faster sweeps mostly measure the test client
+            time.sleep(0.5)
+            peak_threads = max(peak_threads, threading.active_count())
+            for research_id in list(pending):
+                status = client.get(f'/research_progress/{research_id}').get_json()['status']
+                if status in ('completed', 'error', 'cancelled'):
+                    pending.discard(research_id)
+                    statuses[status] = statuses.get(status, 0) + 1
+                    latencies.append(time.perf_counter() - submitted[research_id])
+        seconds = time.perf_counter() - started
+    finally:
+        builtins.print = print_
+
+    latencies.sort()
+    return {
+        'seconds': seconds,
+        'jobs_per_minute': jobs / seconds * 60,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        'statuses': statuses,
+        'peak_threads': peak_threads,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    }
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        print(json.dumps(run_mode(int(sys.argv[2]), float(sys.argv[3]))))
+        sys.exit(0)
+
+    jobs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    results = {}
+    for mode, overrides in MODES.items():
+        env = dict(
+            os.environ,
+            GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench'),
+            TAVILY_API_KEY=os.getenv('TAVILY_API_KEY', 'bench'),
+            MAX_QUEUED_RESEARCH=str(jobs),
+            LLM_CACHE_ENABLED='false',
+            CORPUS_ENABLED='false',
+            PDF_RENDER_EAGER='false',
+            JOB_STORE_MAX_FINISHED=str(jobs),
+            **{name: value.format(jobs=jobs) for name, value in overrides.items()}
+        )
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', str(jobs), str(latency)],
+            env=env, cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"{jobs} concurrent jobs, {latency * 1000:.0f} ms per Groq/Tavily call")
+    print(f"{'mode':<10} {'seconds':>8} {'jobs/min':>9} {'p50 s':>7} {'p95 s':>7} {'threads':>8} {'RSS MB':>7}  statuses")
+    for mode, result in results.items():
+        print(f"{mode:<10} {result['seconds']:>8.2f} {result['jobs_per_minute']:>9.1f} {result['p50']:>7.2f} "
+              f"{result['p95']:>7.2f} {result['peak_threads']:>8} {result['peak_rss_mb']:>7.0f}  {result['statuses']}")
@@ -0,0 +1,166 @@
+"""Cold start of a worker process: import cost of the app, measured with ``-X importtime``.
+
+Imports ``app`` in fresh interpreters and reports the median of:
+
+- app import: cumulative ``-X importtime`` time of ``import app``
+- first /health: interpreter start to the first /health response
+- deferred: what loading the research modules adds later, when the first
+  job or download (or the background preload) imports them
+
+with the heaviest packages on the app's import path. LangChain, Groq,
+Tavily, ReportLab and numpy must stay off that path; the run fails if
+``import app`` loads any of them.
+
+The numbers are tracked in importtime_baseline.json next to this script.
+``--check`` also fails when the app import got more than ``--tolerance``
+slower than the baseline; ``--update`` records the current run as the new
+baseline. Timings depend on the machine and Python version, so update the
+baseline together with them.
+
+Usage: python benchmarks/bench_importtime.py [--runs N] [--check [--tolerance 0.5]] [--update]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'importtime_baseline.json')
+
+# Packages only research jobs and downloads need
+DEFERRED_PACKAGES = ('langchain', 'langchain_core', 'langchain_groq', 'groq', 'tavily', 'reportlab', 'numpy')
+
+HEALTH_SCRIPT = """
+import app
+response = app.app.test_client().get('/health')
+assert response.status_code == 200, response.status_code
+"""
+
+DEFERRED_SCRIPT = """
+import app
+app.load_research_modules()
+"""
+
+
+def child_env() -> dict:
+    return dict(
+        os.environ,
+        GROQ_API_KEY=os.getenv('GROQ_API_KEY', 'bench'),
+        TAVILY_API_KEY=os.getenv('TAVILY_API_KEY', 'bench'),
+        # A background import would land in the measurement
+        PRELOAD_RESEARCH_MODULES='false',
+        PDF_RENDER_EAGER='false'
+    )
+
+
+def parse_importtime(stderr: str) -> list:
+    """``(name, depth, cumulative_ms)`` per imported module, in the order the imports finished"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules.append((name.strip(), depth, int(cumulative) / 1000))
+    return modules
+
+
+def split_at_app(modules: list) -> tuple:
+    """Modules imported by ``import app``, the app entry itself, and top-level imports after it"""
+    index = next(i for i, (name, depth, _) in enumerate(modules) if name == 'app' and depth == 0)
+    # Entries are printed after their children, so the app's imports directly precede it
+    first = max((i + 1 for i, (_, depth, _) in enumerate(modules[:index]) if depth == 0), default=0)
+    return modules[first:index], modules[index], [module for module in modules[index + 1:] if module[1] == 0]
+
+
+def run_python(script: str, importtime: bool = False) -> tuple:
+    """Run ``script`` in a fresh interpreter; returns (wall seconds, stderr)"""
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', script]
+    started = time.perf_counter()
+    result = subprocess.run(args, env=child_env(), cwd=ROOT, capture_output=True, text=True)
+    seconds = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"{script.strip()!r} failed:\n{result.stderr[-2000:]}")
+    return seconds, result.stderr
+
+
+def measure(runs: int) -> dict:
+    app_import_ms, first_health_ms, deferred_ms = [], [], []
+    loaded = set()
+    packages = {}
+
+    for _ in range(runs):
+        _, stderr = run_python('import app', importtime=True)
+        imported, (_, _, app_ms), _ = split_at_app(parse_importtime(stderr))
+        app_import_ms.append(app_ms)
+        loaded.update(name.split('.')[0] for name, _, _ in imported)
+        for name, _, cumulative in imported:
+            if '.' not in name:
+                packages.setdefault(name, []).append(cumulative)
+
+        seconds, _ = run_python(HEALTH_SCRIPT)
+        first_health_ms.append(seconds * 1000)
+
+        _, stderr = run_python(DEFERRED_SCRIPT, importtime=True)
+        _, _, later = split_at_app(parse_importtime(stderr))
+        deferred_ms.append(sum(cumulative for _, _, cumulative in later))
+
+    heaviest = sorted(((statistics.median(times), name) for name, times in packages.items()), reverse=True)[:10]
+    return {
+        'python': '.'.join(map(str, sys.version_info[:3])),
+        'runs': runs,
+        'app_import_ms': round(statistics.median(app_import_ms), 1),
+        'first_health_ms': round(statistics.median(first_health_ms), 1),
+        'deferred_ms': round(statistics.median(deferred_ms), 1),
+        'deferred_loaded': sorted(loaded.intersection(DEFERRED_PACKAGES)),
+        'heaviest': [[name, round(ms, 1)] for ms, name in heaviest]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--check', action='store_true', help='fail on a regression against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='allowed slowdown of the app import, as a fraction')
+    parser.add_argument('--update', action='store_true', help='record this run as the baseline')
+    options = parser.parse_args()
+
+    result = measure(options.runs)
+    print(f"Python {result['python']}, median of {result['runs']} fresh interpreters")
+    print(f"{'app import':<14} {result['app_import_ms']:>8.1f} ms")
+    print(f"{'first /health':<14} {result['first_health_ms']:>8.1f} ms  (interpreter start included)")
+    print(f"{'deferred':<14} {result['deferred_ms']:>8.1f} ms  (research modules, loaded after startup)")
+    print("Heaviest packages on the app import path:")
+    for name, ms in result['heaviest']:
+        print(f"  {name:<20} {ms:>8.1f} ms")
+
+    failures = []
+    if result['deferred_loaded']:
+        failures.append(f"import app loads {', '.join(result['deferred_loaded'])}")
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        change = result['app_import_ms'] / baseline['app_import_ms'] - 1
+        print(f"Baseline (Python {baseline['python']}): app import {baseline['app_import_ms']:.1f} ms, "
+              f"now {change:+.0%}")
+        if change > options.tolerance:
+            failures.append(f"app import {change:+.0%} slower than the baseline (tolerance {options.tolerance:.0%})")
+
+    if options.update:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {BASELINE_PATH}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if options.check and failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,416 @@
+"""End-to-end load test of the app against offline Groq and Tavily fakes.
+
+Starts benchmarks/fake_providers.py and the app in its own processes. The
+app runs on werkzeug's threaded server and is pointed at the fakes through
+GROQ_API_BASE and TAVILY_API_BASE. The load generator then keeps
+``--concurrency`` simulated users busy until ``--jobs`` jobs have finished.
+Each user does what the web page does: submit a query to /start_research,
+poll /research_progress until the job finishes, then download the report
+as Markdown and as PDF.
+
+Reported:
+- p50/p95/p99 of job latency (submit to finished) and of each download
+- jobs/min
+- the app process's RSS at start, peak and end
+- the per-stage breakdown from the jobs' own metrics, queue wait included
+- the estimated Groq cost per job, at Config.GROQ_PRICES
+- what the fakes served, including injected errors
+
+No API quota is used, so every performance change can be checked the same
+way on a laptop. Config overrides go to the app with ``--env``, e.g.
+``--env ASYNC_MODE=true --env MAX_CONCURRENT_RESEARCH=8``. ``--pipeline-profile fast``
+submits every job with that pipeline profile. ``--json`` writes the results
+for tracking across runs.
+
+To load an app that is already running (e.g. under gunicorn, or uvicorn
+asgi:application), start it with the fakes' URLs in its environment and
+pass ``--app-url`` and ``--groq-url``/``--tavily-url``. Give ``--app-pid``
+to also sample its RSS.
+
+Usage: python benchmarks/bench_load.py [--jobs 40] [--concurrency 10] [--latency 0.5] [--error-rate 0.02] ...
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from fake_providers import add_profile_arguments
+
+FINISHED = ('completed', 'error', 'cancelled')
+
+
+def percentile(values: list, fraction: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(values: list) -> dict:
+    return {
+        'count': len(values),
+        'p50': percentile(values, 0.50),
+        'p95': percentile(values, 0.95),
+        'p99': percentile(values, 0.99),
+        'mean': statistics.mean(values) if values else None
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def read_rss_mb(pid: int):
+    """Resident set size of ``pid`` from /proc, None where that is not available"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+class RSSMonitor:
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._sample()
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        if not self.samples:
+            return {}
+        return {'start_mb': self.samples[0], 'peak_mb': max(self.samples), 'end_mb': self.samples[-1],
+                'growth_mb': self.samples[-1] - self.samples[0]}
+
+    def _sample(self):
+        rss = read_rss_mb(self.pid)
+        if rss is not None:
+            self.samples.append(rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+
+class LoadGenerator:
+    """``concurrency`` users that each run submit → poll → download until ``jobs`` jobs are done"""
+
+    def __init__(self, app_url: str, jobs: int, concurrency: int, poll_interval: float,
+                 downloads: tuple, run_tag: str, pipeline_profile: str = None):
+        self.app_url = app_url.rstrip('/')
+        self.jobs = jobs
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.downloads = downloads
+        self.run_tag = run_tag
+        self.pipeline_profile = pipeline_profile
+
+        self._next_job = itertools.count()
+        self._lock = threading.Lock()
+        self.results = []
+        self.rejected = 0
+        self.http_errors = 0
+
+    def run(self) -> float:
+        users = [threading.Thread(target=self._user, args=(index,), daemon=True) for index in range(self.concurrency)]
+        started = time.perf_counter()
+        for user in users:
+            user.start()
+        for user in users:
+            user.join()
+        return time.perf_counter() - started
+
+    def _user(self, index: int):
+        session = requests.Session()
+        # One client address per user, so per-client queue limits apply as for real visitors
+        session.headers['X-Forwarded-For'] = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+        while True:
+            job = next(self._next_job)
+            if job >= self.jobs:
+                return
+            try:
+                result = self._run_job(session, job)
+            except requests.RequestException as e:
+                result = {'status': 'http_error', 'error': str(e)}
+                with self._lock:
+                    self.http_errors += 1
+            with self._lock:
+                self.results.append(result)
+
+    def _run_job(self, session, job: int) -> dict:
+        query = f"AI healthcare startups in India {self.run_tag} #{job}"
+        body = {'query': query}
+        if self.pipeline_profile:
+            body['profile'] = self.pipeline_profile
+        submitted = time.perf_counter()
+        while True:
+            response = session.post(f"{self.app_url}/start_research", json=body, timeout=30)
+            if response.status_code not in (429, 503):
+                break
+            with self._lock:
+                self.rejected += 1
+            time.sleep(min(5.0, float(response.headers.get('Retry-After') or 1)))
+        response.raise_for_status()
+        research_id = response.json()['research_id']
+
+        while True:
+            time.sleep(self.poll_interval)
+            progress = session.get(f"{self.app_url}/research_progress/{research_id}", timeout=30).json()
+            if progress.get('status') in FINISHED:
+                break
+        finished = time.perf_counter()
+
+        result = {
+            'status': progress['status'],
+            'latency': finished - submitted,
+            'downloads': {}
+        }
+        if progress['status'] == 'completed':
+            for format in self.downloads:
+                download_started = time.perf_counter()
+                response = session.get(f"{self.app_url}/download/{format}/{research_id}", timeout=300)
+                response.raise_for_status()
+                result['downloads'][format] = {'seconds': time.perf_counter() - download_started,
+                                               'bytes': len(response.content)}
+            # Render times are added to the job's metrics by the downloads
+            progress = session.get(f"{self.app_url}/research_progress/{research_id}", timeout=30).json()
+        else:
+            result['error'] = progress.get('error')
+
+        metrics = progress.get('metrics') or {}
+        result['stage_seconds'] = metrics.get('stage_seconds') or {}
+        result['tokens'] = metrics.get('tokens') or {}
+        result['cost_usd'] = metrics.get('total_cost_usd', 0)
+        return result
+
+
+def start_fake_providers(options) -> tuple:
+    args = [sys.executable, os.path.join(BENCH_DIR, 'fake_providers.py'),
+            '--groq-port', str(free_port()), '--tavily-port', str(free_port()),
+            '--latency', str(options.latency), '--jitter', str(options.jitter),
+            '--tokens-per-second', str(options.tokens_per_second),
+            '--completion-tokens', str(options.completion_tokens),
+            '--error-rate', str(options.error_rate), '--throttle-rate', str(options.throttle_rate),
+            '--retry-after', str(options.retry_after)]
+    if options.tavily_latency is not None:
+        args += ['--tavily-latency', str(options.tavily_latency)]
+    process = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+    urls = dict(item.split('=', 1) for item in process.stdout.readline().split())
+    return process, urls['GROQ_API_BASE'], urls['TAVILY_API_BASE']
+
+
+def start_app(options, groq_url: str, tavily_url: str, workdir: str) -> tuple:
+    port = free_port()
+    env = dict(
+        os.environ,
+        GROQ_API_KEY='bench',
+        TAVILY_API_KEY='bench',
+        GROQ_API_BASE=groq_url,
+        TAVILY_API_BASE=tavily_url,
+        # Every job should reach the fakes, and runs should not see each other's data
+        LLM_CACHE_ENABLED='false',
+        CORPUS_ENABLED='false',
+        SEARCH_CACHE_BACKEND='memory',
+        MAX_QUEUED_RESEARCH=str(max(50, options.concurrency * 2)),
+        JOB_STORE_MAX_FINISHED=str(max(200, options.jobs)),
+        ARTIFACT_DIR=os.path.join(workdir, 'artifacts'),
+        **dict(item.split('=', 1) for item in options.env)
+    )
+    log = open(options.app_log or os.devnull, 'w')
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', str(port)],
+        env=env, cwd=workdir, stdout=log, stderr=subprocess.STDOUT
+    )
+    app_url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + 60
+    while True:
+        if process.poll() is not None:
+            raise RuntimeError(f"app exited with {process.returncode}; rerun with --app-log to see why")
+        try:
+            if requests.get(f"{app_url}/health", timeout=2).status_code == 200:
+                return process, app_url
+        except requests.RequestException:
+            pass
+        if time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError("app did not answer /health within 60s")
+        time.sleep(0.2)
+
+
+def serve(port: int):
+    """Child process: the app on werkzeug's threaded server"""
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import make_server
+    import app as app_module
+
+    # Wait for the background import so the first jobs measure the app, not its start
+    app_module.load_research_modules()
+    make_server('127.0.0.1', port, app_module.app, threaded=True).serve_forever()
+
+
+def fake_stats(url: str) -> dict:
+    try:
+        return requests.get(f"{url}/stats", timeout=5).json()
+    except requests.RequestException:
+        return {}
+
+
+def report(results: list, seconds: float, rss: dict, generator: LoadGenerator, providers: dict, options) -> dict:
+    completed = [result for result in results if result['status'] == 'completed']
+    statuses = {}
+    for result in results:
+        statuses[result['status']] = statuses.get(result['status'], 0) + 1
+
+    stages = {}
+    for result in completed:
+        for stage, value in result['stage_seconds'].items():
+            stages.setdefault(stage, []).append(value)
+
+    downloads = {}
+    for result in completed:
+        for format, download in result['downloads'].items():
+            downloads.setdefault(format, []).append(download['seconds'])
+
+    return {
+        'settings': {
+            'jobs': options.jobs, 'concurrency': options.concurrency, 'latency': options.latency,
+            'tokens_per_second': options.tokens_per_second, 'completion_tokens': options.completion_tokens,
+            'error_rate': options.error_rate, 'throttle_rate': options.throttle_rate, 'env': options.env,
+            'pipeline_profile': options.pipeline_profile
+        },
+        'seconds': seconds,
+        'jobs_per_minute': len(completed) / seconds * 60 if seconds else 0,
+        'statuses': statuses,
+        'rejected_submissions': generator.rejected,
+        'job_latency': summarize([result['latency'] for result in completed]),
+        'job_cost_usd': summarize([result['cost_usd'] for result in completed]),
+        'downloads': {format: summarize(values) for format, values in downloads.items()},
+        'stages': {stage: summarize(values) for stage, values in sorted(stages.items())},
+        'rss': rss,
+        'providers': providers,
+        'errors': sorted({result.get('error') for result in results if result.get('error')})[:5]
+    }
+
+
+def print_report(result: dict):
+    settings = result['settings']
+    print(f"{settings['jobs']} jobs, {settings['concurrency']} concurrent users, "
+          f"{settings['latency'] * 1000:.0f} ms provider latency, {settings['tokens_per_second']:g} tokens/s, "
+          f"{settings['error_rate']:.0%} errors, {settings['throttle_rate']:.0%} throttled"
+          + (f", {settings['pipeline_profile']} profile" if settings['pipeline_profile'] else "")
+          + (f", env {' '.join(settings['env'])}" if settings['env'] else ""))
+    print(f"{result['seconds']:.1f} s, {result['jobs_per_minute']:.1f} jobs/min, statuses {result['statuses']}, "
+          f"{result['rejected_submissions']} rejected submissions")
+
+    def row(name, summary):
+        if not summary or not summary['count']:
+            return
+        print(f"  {name:<24} {summary['p50']:>8.3f} {summary['p95']:>8.3f} {summary['p99']:>8.3f} {summary['mean']:>8.3f}")
+
+    print(f"  {'seconds':<24} {'p50':>8} {'p95':>8} {'p99':>8} {'mean':>8}")
+    row('job latency', result['job_latency'])
+    for format, summary in result['downloads'].items():
+        row(f"download {format}", summary)
+    cost = result['job_cost_usd']
+    if cost and cost['count']:
+        print(f"Groq cost per job: ${cost['mean']:.5f} mean, ${cost['p95']:.5f} p95")
+    print("Per stage (from job metrics):")
+    for stage, summary in result['stages'].items():
+        row(stage, summary)
+
+    rss = result['rss']
+    if rss:
+        print(f"App RSS: {rss['start_mb']:.0f} MB at start, {rss['peak_mb']:.0f} MB peak, "
+              f"{rss['end_mb']:.0f} MB at end ({rss['growth_mb']:+.0f} MB)")
+    for name, stats in result['providers'].items():
+        print(f"{name}: {stats}")
+    for error in result['errors']:
+        print(f"Job error: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=10, help='simulated users submitting at once')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='seconds between progress polls')
+    parser.add_argument('--downloads', default='markdown,pdf', help="formats to download, '' for none")
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE', help='Config override for the app')
+    parser.add_argument('--pipeline-profile', help="pipeline profile of the submitted jobs, e.g. 'fast'")
+    parser.add_argument('--app-url', help='load an app that is already running instead of starting one')
+    parser.add_argument('--app-pid', type=int, help='process to sample RSS from with --app-url')
+    parser.add_argument('--app-log', help='file for the output of the app started here')
+    parser.add_argument('--groq-url', help='with --app-url: the fake Groq the app uses, for its stats')
+    parser.add_argument('--tavily-url', help='with --app-url: the fake Tavily the app uses, for its stats')
+    parser.add_argument('--json', help='also write the results to this file')
+    add_profile_arguments(parser)
+    options = parser.parse_args()
+
+    processes = []
+    workdir = tempfile.mkdtemp(prefix='bench_load_')
+    try:
+        if options.app_url:
+            app_url, app_pid = options.app_url, options.app_pid
+            groq_url, tavily_url = options.groq_url, options.tavily_url
+        else:
+            fakes, groq_url, tavily_url = start_fake_providers(options)
+            processes.append(fakes)
+            app, app_url = start_app(options, groq_url, tavily_url, workdir)
+            processes.append(app)
+            app_pid = app.pid
+
+        generator = LoadGenerator(
+            app_url, options.jobs, options.concurrency, options.poll_interval,
+            tuple(format for format in options.downloads.split(',') if format),
+            run_tag=f"run {int(time.time())}", pipeline_profile=options.pipeline_profile
+        )
+        monitor = RSSMonitor(app_pid).start() if app_pid else None
+        seconds = generator.run()
+        rss = monitor.stop() if monitor else {}
+
+        providers = {name: fake_stats(url) for name, url in (('groq', groq_url), ('tavily', tavily_url)) if url}
+        result = report(generator.results, seconds, rss, generator, providers, options)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_report(result)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[1] == '--serve':
+        serve(int(sys.argv[2]))
+    else:
+        main()
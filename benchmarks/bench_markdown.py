@@ -0,0 +1,124 @@
+"""Time the report Markdown renderers on reports of growing size.
+
+Compares the previous regex-chain renderer of process_report_content with
+the single-pass parser/renderer in utils/markdown.py, and times the PDF
+inline conversion off the same parse. Per-KB time should stay flat for a
+linear renderer. The second table adds an unclosed '<' per section
+(e.g. "valuation < $1B"), which sends the legacy tag stripper scanning to
+the end of the report from every occurrence. The garbage collector is disabled
+while timing, as timeit does.
+
+Usage: python benchmarks/bench_markdown.py [max_kb]
+"""
+import gc
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.markdown import parse_markdown, render_html, render_inline_reportlab
+
+SECTION = """# Executive Summary
+India's **AI healthcare** market is growing fast, with *diagnostics* leading adoption.
+
+## Top AI Healthcare Startups in India
+- **Qure.ai** raised funding for its radiology models https://qure.ai/news
+- **Niramai** uses thermal imaging for *early* breast cancer screening
+- See [Tracxn](https://tracxn.com/d/sectors/healthtech) for the `healthtech` landscape
+* **Tricog** scales remote ECG reads across 1,200 clinics & hospitals
+
+### Market Analysis
+Analysts expect a CAGR above 40% <br> through 2030, see https://economictimes.indiatimes.com/tech.
+A stray * asterisk & a 5 > 3 comparison must not break rendering.
+
+"""
+
+
+def legacy_process_report_content(content):
+    """process_report_content as it was before utils/markdown.py"""
+    html = re.sub(r'<[^>]+>', '', content)
+    processed_lines = []
+
+    for line in html.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('### '):
+            processed_lines.append(f'<h3 class="mt-4 mb-3 text-dark">{line[4:]}</h3>')
+        elif line.startswith('## '):
+            processed_lines.append(f'<h2 class="mt-4 mb-3 text-primary border-bottom pb-2">{line[3:]}</h2>')
+        elif line.startswith('# '):
+            processed_lines.append(f'<h1 class="mt-5 mb-4 text-primary border-bottom pb-2">{line[2:]}</h1>')
+        elif line.startswith('- ') or line.startswith('* '):
+            bullet_text = line[2:].strip()
+            bullet_text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', bullet_text)
+            bullet_text = re.sub(r'(?<!\*)\*(.*?)\*(?!\*)', r'<em>\1</em>', bullet_text)
+            processed_lines.append(f'<li class="mb-2">{bullet_text}</li>')
+        else:
+            line = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', line)
+            line = re.sub(r'(?<!\*)\*(.*?)\*(?!\*)', r'<em>\1</em>', line)
+            line = re.sub(r'(https?://[^\s<>"{}|\\^`[\]]+)',
+                          r'<a href="\1" target="_blank" rel="noopener noreferrer" class="text-decoration-underline">\1</a>',
+                          line)
+            processed_lines.append(f'<p class="mb-3 lh-lg">{line}</p>')
+
+    html = '\n'.join(processed_lines)
+    return re.sub(r'(<li[^>]*>.*?</li>(?:\s*<li[^>]*>.*?</li>)*)',
+                  r'<ul class="mb-4 ps-4">\1</ul>', html, flags=re.DOTALL)
+
+
+def render_pdf_inline(content):
+    return [render_inline_reportlab(block.inlines) for block in parse_markdown(content)]
+
+
+STRAY_BRACKET = "- Most rounds closed at a valuation < $1B\n"
+# No '>' anywhere, so nothing closes the stray brackets
+UNCLOSED_SECTION = SECTION.replace("<br> ", "").replace("5 > 3", "5 over 3") + STRAY_BRACKET
+
+
+def best_of(func, content, repeat=3):
+    timings = []
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(content)
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(timings)
+
+
+def run(sizes, section, legacy_max_kb=None):
+    print(f"{'size':>8}  {'legacy ms':>10}  {'single-pass ms':>15}  {'pdf inline ms':>14}  {'us/KB (single-pass)':>20}")
+    for kb in sizes:
+        content = (section * (kb * 1024 // len(section) + 1))[:kb * 1024]
+        if legacy_max_kb is None or kb <= legacy_max_kb:
+            legacy = f"{best_of(legacy_process_report_content, content, repeat=1) * 1000:>10.1f}"
+        else:
+            legacy = f"{'skipped':>10}"
+        single = best_of(lambda text: render_html(parse_markdown(text)), content)
+        pdf = best_of(render_pdf_inline, content)
+        print(f"{kb:>6}KB  {legacy}  {single * 1000:>15.1f}  {pdf * 1000:>14.1f}  {single * 1e6 / kb:>20.1f}")
+
+
+def main():
+    max_kb = int(sys.argv[1]) if len(sys.argv) > 1 else 1600
+
+    sizes = []
+    kb = 100
+    while kb <= max_kb:
+        sizes.append(kb)
+        kb *= 2
+
+    print("Well-formed report")
+    run(sizes, SECTION)
+
+    print("\nReport with an unclosed '<' per section")
+    run(sizes, UNCLOSED_SECTION, legacy_max_kb=800)
+
+
+if __name__ == "__main__":
+    main()
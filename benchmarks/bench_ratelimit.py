@@ -0,0 +1,139 @@
+"""Sustained throughput against a fake rate-limited provider.
+
+The fake provider admits ``rate`` requests per second (bursts of 5) and
+``concurrency`` requests at a time, and answers anything beyond that with a
+429 carrying Retry-After. Many client threads then make a fixed number of
+calls in three modes:
+
+- naive: no client limits, fixed short retry delay, give up after 3 retries
+  (what happens to targeted searches without the limiter)
+- adaptive: ProviderLimiter with only a concurrency cap, relying on AIMD
+  and Retry-After
+- tuned: ProviderLimiter that also knows the provider's requests/min
+
+Usage: python benchmarks/bench_ratelimit.py [calls] [threads]
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.ratelimit import ProviderLimiter
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, retry_after: float):
+        self.status_code = status_code
+        self.headers = {'retry-after': f"{retry_after:.2f}"}
+
+
+class FakeThrottled(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("429 Too Many Requests")
+        self.response = FakeResponse(429, retry_after)
+
+
+class FakeProvider:
+    """Server-side token bucket and concurrency cap with a fixed service time"""
+
+    def __init__(self, rate: float, concurrency: int, latency: float):
+        self.rate = rate
+        self.tokens = 5.0
+        self.updated = time.monotonic()
+        self.concurrency = concurrency
+        self.latency = latency
+        self.in_flight = 0
+        self.throttled = 0
+        self.served = 0
+        self._lock = threading.Lock()
+
+    def request(self, payload):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(5.0, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            # A real server rejects instead of queueing
+            if self.tokens < 1 or self.in_flight >= self.concurrency:
+                self.throttled += 1
+                raise FakeThrottled(retry_after=1 / self.rate)
+            self.tokens -= 1
+            self.in_flight += 1
+
+        try:
+            time.sleep(self.latency)
+            return payload
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.served += 1
+
+
+def naive_call(provider, payload):
+    for attempt in range(4):
+        try:
+            return provider.request(payload)
+        except FakeThrottled:
+            if attempt == 3:
+                raise
+            time.sleep(0.05)
+
+
+def run(mode: str, calls: int, threads: int, rate: float, concurrency: int, latency: float) -> dict:
+    provider = FakeProvider(rate, concurrency, latency)
+    if mode == 'adaptive':
+        limiter = ProviderLimiter('fake', max_concurrency=threads, max_retries=8, base_delay=0.1)
+    elif mode == 'tuned':
+        limiter = ProviderLimiter('fake', requests_per_minute=rate * 60, max_concurrency=concurrency,
+                                  max_retries=8, base_delay=0.1)
+    else:
+        limiter = None
+
+    def one(i):
+        try:
+            if limiter is None:
+                naive_call(provider, i)
+            else:
+                limiter.call(provider.request, i)
+            return True
+        except FakeThrottled:
+            return False
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        ok = sum(executor.map(one, range(calls)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'completed': ok,
+        'dropped': calls - ok,
+        'throttled': provider.throttled,
+        'throughput': ok / elapsed
+    }
+
+
+if __name__ == '__main__':
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    rate, concurrency, latency = 40.0, 8, 0.05
+
+    # Retry logging from the limiter would drown the table
+    import builtins
+    print_ = builtins.print
+    builtins.print = lambda *args, **kwargs: None
+    try:
+        results = [run(mode, calls, threads, rate, concurrency, latency) for mode in ('naive', 'adaptive', 'tuned')]
+    finally:
+        builtins.print = print_
+
+    print(f"Fake provider: {rate:.0f} req/s, {concurrency} concurrent, {latency * 1000:.0f} ms per call; "
+          f"{calls} calls from {threads} threads")
+    print(f"{'mode':<10} {'seconds':>8} {'completed':>10} {'dropped':>8} {'429s':>7} {'calls/s':>8}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['seconds']:>8.2f} {result['completed']:>10} {result['dropped']:>8} "
+              f"{result['throttled']:>7} {result['throughput']:>8.1f}")
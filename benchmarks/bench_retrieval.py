@@ -0,0 +1,113 @@
+"""Compare prompt size and latency of the writer and research contexts with and
+without the per-section vector retrieval, on synthetic search results.
+
+Runs fully offline. LLM latency is simulated from the prompt size with a fixed
+prefill rate, index build and search times are measured.
+
+Usage: python benchmarks/bench_retrieval.py [prefill_tokens_per_second]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.agents import RESEARCH_FOCUS_AREAS, REPORT_SECTIONS
+from utils.context import ContextBudgeter, estimate_tokens
+from utils.vector_index import index_passages, interleave
+
+COMPANIES = ["Qure.ai", "Niramai", "SigTuple", "Tricog", "HealthifyMe", "Innovaccer", "Practo", "Wysa"]
+TOPICS = [
+    "raised {amount} million in a Series {series} round led by {investor}",
+    "expanded its AI diagnostics platform to {count} hospitals across India",
+    "reported revenue growth of {count} percent year over year",
+    "launched a new radiology model approved by the CDSCO",
+    "partnered with {investor} to scale remote patient monitoring",
+    "the Indian AI healthcare market is projected to reach {amount} billion by 2030",
+    "analysts expect consolidation among early stage health tech startups",
+]
+INVESTORS = ["Peak XV", "Accel", "Nexus Venture Partners", "Lightspeed", "Tiger Global"]
+FILLER = "The company said in a statement that it remains focused on its long term roadmap."
+
+
+def sentence(rng):
+    return f"{rng.choice(COMPANIES)} " + rng.choice(TOPICS).format(
+        amount=rng.randint(5, 900),
+        series=rng.choice("ABCD"),
+        investor=rng.choice(INVESTORS),
+        count=rng.randint(10, 400)
+    ) + "."
+
+
+def page(rng, paragraphs):
+    return "\n\n".join(
+        " ".join([sentence(rng) for _ in range(6)] + [FILLER])
+        for _ in range(paragraphs)
+    )
+
+
+def response(rng, query, results, paragraphs):
+    return {
+        'answer': f"Summary answer for {query}",
+        'results': [
+            {
+                'title': f"{query} article {i}",
+                'url': f"https://news.example.com/{query.lower().replace(' ', '-')}/{i}",
+                'content': sentence(rng),
+                'raw_content': page(rng, paragraphs),
+                'score': rng.random()
+            }
+            for i in range(results)
+        ]
+    }
+
+
+def simulated_latency(tokens, prefill_rate):
+    return tokens / prefill_rate
+
+
+if __name__ == '__main__':
+    prefill_rate = float(sys.argv[1]) if len(sys.argv) > 1 else 2000.0
+    rng = random.Random(7)
+    query = "Top AI startups in Indian healthcare"
+
+    primary = response(rng, query, 15, 12)
+    targeted = [response(rng, f"{query} {suffix}", 5, 4) for suffix in ("funding", "news", "market")]
+    research_output = page(rng, 10)
+    summary, critique = page(rng, 4), page(rng, 2)
+    budgeter = ContextBudgeter()
+
+    # Research agent context
+    everything = "\n\n".join(
+        "\n".join(f"{r['title']}\n{r['url']}\n{r['raw_content']}" for r in resp['results'])
+        for resp in [primary]
+    )
+    started = time.perf_counter()
+    sources = budgeter.unique_sources([primary])
+    index = index_passages(budgeter, sources)
+    hits = index.search_sections(query, RESEARCH_FOCUS_AREAS, k=4)
+    rag_research = budgeter.pack([primary], sources, interleave(hits))['text']
+    research_overhead = time.perf_counter() - started
+
+    # Writer context
+    pass_everything_writer = research_output + summary + critique
+    started = time.perf_counter()
+    sources = budgeter.unique_sources([primary] + targeted)
+    sources.append({'title': 'Research agent findings', 'url': '', 'raw_content': research_output})
+    index = index_passages(budgeter, sources)
+    sections = index.search_sections(query, REPORT_SECTIONS, k=4)
+    rag_writer = "\n".join(passage for hits in sections.values() for _, _, passage in hits) + summary + critique
+    writer_overhead = time.perf_counter() - started
+
+    print(f"Indexed passages: {len(index)}, prefill rate: {prefill_rate:.0f} tokens/s\n")
+    print(f"{'stage':<10} {'mode':<16} {'prompt tokens':>14} {'retrieval ms':>13} {'est. latency s':>15}")
+    for stage, mode, text, overhead in [
+        ('research', 'pass-everything', everything, 0.0),
+        ('research', 'vector top-k', rag_research, research_overhead),
+        ('writer', 'pass-everything', pass_everything_writer, 0.0),
+        ('writer', 'vector top-k', rag_writer, writer_overhead),
+    ]:
+        tokens = estimate_tokens(text)
+        latency = simulated_latency(tokens, prefill_rate) + overhead
+        print(f"{stage:<10} {mode:<16} {tokens:>14} {overhead * 1000:>13.1f} {latency:>15.2f}")
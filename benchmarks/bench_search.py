@@ -0,0 +1,51 @@
+"""Compare sequential and concurrent advanced_search against a stub Tavily client.
+
+Usage: python benchmarks/bench_search.py [latency_seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache import MemoryCache
+from utils.config import Config
+from utils.search import TavilyRetrievalSystem
+
+
+class StubTavilyClient:
+    """Answers every search after a fixed delay, like a slow network"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def search(self, query, **kwargs):
+        time.sleep(self.latency)
+        return {
+            'answer': f"Stub answer for {query}",
+            'results': [
+                {'title': f"{query} #{i}", 'url': f"https://example.com/{i}", 'content': "stub content"}
+                for i in range(kwargs.get('max_results') or 5)
+            ]
+        }
+
+
+def run(concurrent: bool, latency: float) -> tuple:
+    Config.TAVILY_CONCURRENT_SEARCH = concurrent
+    # A fresh cache per run so the second mode is not served from the first one's results
+    retrieval = TavilyRetrievalSystem("stub", client=StubTavilyClient(latency), cache=MemoryCache())
+    start = time.perf_counter()
+    output = retrieval.advanced_search("AI healthcare startups")
+    return time.perf_counter() - start, output
+
+
+if __name__ == '__main__':
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.5
+
+    sequential_time, sequential_output = run(False, latency)
+    concurrent_time, concurrent_output = run(True, latency)
+
+    print(f"Stub latency per call: {latency:.2f}s")
+    print(f"Sequential: {sequential_time:.2f}s")
+    print(f"Concurrent: {concurrent_time:.2f}s")
+    print(f"Identical output: {sequential_output == concurrent_output}")
@@ -0,0 +1,299 @@
+"""Offline stand-ins for the Groq and Tavily HTTP APIs, for load tests.
+
+Point the app at them with GROQ_API_BASE and TAVILY_API_BASE. The Groq
+fake answers OpenAI-style chat completions, plain or streamed, with a
+synthetic report. The Tavily fake answers /search with synthetic results.
+Both can be configured with:
+
+- latency before the first byte, with random jitter
+- for Groq, an output token rate, used to pace streamed chunks and to
+  delay plain completions
+- error injection: a share of requests answered 429 with Retry-After, and
+  a share answered 500
+- for Tavily, a number of fresh results per search: new URLs published
+  today, while the others are the same month-old pages every time. Like
+  Tavily, ``start_date`` drops results published before it
+
+GET /stats on either server returns what it served so far.
+
+Usage: python benchmarks/fake_providers.py [--groq-port 8701] [--tavily-port 8702] [options]
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTIONS = [
+    "Executive Summary", "Top AI Healthcare Startups in India", "Market Analysis",
+    "Investment Landscape", "Future Outlook", "References and Sources"
+]
+WORDS = (
+    "diagnostics radiology funding series startup platform hospitals clinics growth market "
+    "investment adoption regulatory partnership telemedicine imaging screening revenue india "
+    "healthcare models accuracy deployment patients insurers analytics pipeline"
+).split()
+
+
+class ProviderProfile:
+    """Latency, throughput and error injection of one fake provider"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.2, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0, tokens_per_second: float = 0.0,
+                 completion_tokens: int = 600, results: int = 10, content_words: int = 300,
+                 fresh_results: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.results = results
+        self.content_words = content_words
+        self.fresh_results = fresh_results
+
+    def delay(self) -> float:
+        return max(0.0, self.latency * (1 + random.uniform(-self.jitter, self.jitter)))
+
+
+class ProviderStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                self.counts[name] = self.counts.get(name, 0) + amount
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def synthetic_words(seed: str, count: int) -> list:
+    rng = random.Random(hashlib.sha1(seed.encode('utf-8')).hexdigest())
+    return [rng.choice(WORDS) for _ in range(count)]
+
+
+def synthetic_report(seed: str, tokens: int) -> str:
+    """Markdown with the writer prompt's sections, about ``tokens`` words long"""
+    words = synthetic_words(seed, tokens)
+    per_section = max(1, len(words) // len(SECTIONS))
+    lines = []
+    for index, section in enumerate(SECTIONS):
+        lines.append(("# " if index == 0 else "## ") + section)
+        chunk = words[index * per_section:(index + 1) * per_section]
+        for start in range(0, len(chunk), 12):
+            lines.append(f"- **{chunk[start].title()}** " + " ".join(chunk[start + 1:start + 12]))
+        lines.append("")
+    return "\n".join(lines)
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    profile = ProviderProfile()
+    stats = ProviderStats()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            self.send_json(200, self.stats.as_dict())
+        else:
+            self.send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        self.stats.add(requests=1)
+
+        roll = random.random()
+        if roll < self.profile.throttle_rate:
+            self.stats.add(throttled=1)
+            time.sleep(self.profile.delay() / 10)
+            self.send_json(429, {'error': {'message': 'Rate limit reached (injected)', 'type': 'tokens',
+                                           'code': 'rate_limit_exceeded'}},
+                           {'Retry-After': f"{self.profile.retry_after:g}"})
+            return
+        if roll < self.profile.throttle_rate + self.profile.error_rate:
+            self.stats.add(errors=1)
+            time.sleep(self.profile.delay())
+            self.send_json(500, {'error': {'message': 'Internal server error (injected)'}})
+            return
+
+        self.handle_request(body)
+
+    def handle_request(self, body: dict):
+        raise NotImplementedError
+
+    def send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+
+class FakeGroqHandler(FakeProviderHandler):
+    """POST .../chat/completions, answered like Groq's OpenAI-compatible API"""
+
+    def handle_request(self, body: dict):
+        if not self.path.endswith('/chat/completions'):
+            self.send_json(404, {'error': {'message': f"unknown path {self.path}"}})
+            return
+
+        prompt = "".join(str(message.get('content', '')) for message in body.get('messages', []))
+        prompt_tokens = max(1, len(prompt) // 4)
+        completion_tokens = min(self.profile.completion_tokens, body.get('max_tokens') or self.profile.completion_tokens)
+        text = synthetic_report(prompt, completion_tokens)
+        usage = {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                 'total_tokens': prompt_tokens + completion_tokens}
+        self.stats.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        completion_id = f"chatcmpl-{hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]}"
+        model = body.get('model', 'fake-groq')
+        tps = self.profile.tokens_per_second
+
+        time.sleep(self.profile.delay())
+        if not body.get('stream'):
+            if tps > 0:
+                time.sleep(completion_tokens / tps)
+            self.send_json(200, {
+                'id': completion_id, 'object': 'chat.completion', 'created': int(time.time()), 'model': model,
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                             'finish_reason': 'stop', 'logprobs': None}],
+                'usage': usage
+            })
+            return
+
+        self.stats.add(streamed=1)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        def event(delta, finish_reason=None, **extra):
+            chunk = {'id': completion_id, 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                     'model': model, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+                     **extra}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode('utf-8'))
+
+        # About eight tokens per chunk, paced at the configured token rate
+        words = text.split(' ')
+        event({'role': 'assistant', 'content': ''})
+        for start in range(0, len(words), 8):
+            if tps > 0:
+                time.sleep(min(8, len(words) - start) / tps)
+            event({'content': " ".join(words[start:start + 8]) + (" " if start + 8 < len(words) else "")})
+        event({}, 'stop', x_groq={'id': completion_id, 'usage': usage})
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+
+class FakeTavilyHandler(FakeProviderHandler):
+    """POST /search, answered like Tavily's search API"""
+    fresh_ids = itertools.count(1)
+
+    def handle_request(self, body: dict):
+        if self.path.rstrip('/') != '/search':
+            self.send_json(404, {'detail': {'error': f"unknown path {self.path}"}})
+            return
+
+        query = body.get('query', '')
+        count = min(body.get('max_results') or 5, self.profile.results)
+        topic = hashlib.sha1(query.encode('utf-8')).hexdigest()[:8]
+        today = time.strftime('%Y-%m-%d', time.gmtime())
+        month_ago = time.strftime('%Y-%m-%d', time.gmtime(time.time() - 30 * 86400))
+        results = []
+        for index in range(count):
+            # The last fresh_results slots hold pages no earlier search returned
+            fresh = index >= count - self.profile.fresh_results
+            page = f"{index}-{next(self.fresh_ids)}" if fresh else str(index)
+            published = today if fresh else month_ago
+            if body.get('start_date') and published < body['start_date']:
+                continue
+            words = " ".join(synthetic_words(f"{query}/{page}", self.profile.content_words))
+            results.append({
+                'title': f"{query.title()} ({page})",
+                'url': f"https://example.com/{topic}/{page}",
+                'content': words[:400],
+                'raw_content': words if body.get('include_raw_content') else None,
+                'score': round(1 - index / (count + 1), 3),
+                'published_date': published
+            })
+        self.stats.add(results=len(results))
+
+        time.sleep(self.profile.delay())
+        self.send_json(200, {
+            'query': query,
+            'answer': f"Synthetic answer for {query}" if body.get('include_answer') else None,
+            'results': results,
+            'images': [],
+            'response_time': round(self.profile.latency, 2)
+        })
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Hundreds of concurrent jobs connect at once
+    request_queue_size = 1024
+
+
+def start_server(handler: type, profile: ProviderProfile, port: int = 0, host: str = '127.0.0.1') -> FakeServer:
+    """Serve ``handler`` with its own profile and stats on a daemon thread"""
+    handler = type(handler.__name__, (handler,), {'profile': profile, 'stats': ProviderStats()})
+    server = FakeServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, name=handler.__name__, daemon=True).start()
+    return server
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--latency', type=float, default=0.5, help='seconds before the first byte (both providers)')
+    parser.add_argument('--tavily-latency', type=float, help='override --latency for Tavily')
+    parser.add_argument('--jitter', type=float, default=0.2, help='latency varies by up to this fraction')
+    parser.add_argument('--tokens-per-second', type=float, default=250, help='Groq output token rate, 0 for instant')
+    parser.add_argument('--completion-tokens', type=int, default=600, help='Groq completion length')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of requests answered 429')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After of injected 429s')
+    parser.add_argument('--fresh-results', type=int, default=0, help='Tavily results per search that are new pages')
+
+
+def profiles_from_arguments(options) -> tuple:
+    common = dict(jitter=options.jitter, error_rate=options.error_rate,
+                  throttle_rate=options.throttle_rate, retry_after=options.retry_after)
+    groq = ProviderProfile(latency=options.latency, tokens_per_second=options.tokens_per_second,
+                           completion_tokens=options.completion_tokens, **common)
+    tavily_latency = options.tavily_latency if options.tavily_latency is not None else options.latency
+    tavily = ProviderProfile(latency=tavily_latency, fresh_results=options.fresh_results, **common)
+    return groq, tavily
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--groq-port', type=int, default=8701)
+    parser.add_argument('--tavily-port', type=int, default=8702)
+    add_profile_arguments(parser)
+    options = parser.parse_args()
+
+    groq_profile, tavily_profile = profiles_from_arguments(options)
+    groq = start_server(FakeGroqHandler, groq_profile, options.groq_port)
+    tavily = start_server(FakeTavilyHandler, tavily_profile, options.tavily_port)
+    # bench_load.py waits for this line
+    print(f"GROQ_API_BASE=http://127.0.0.1:{groq.server_address[1]} "
+          f"TAVILY_API_BASE=http://127.0.0.1:{tavily.server_address[1]}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
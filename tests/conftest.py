@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Tests that import the app should not start loading LangChain and ReportLab
+os.environ.setdefault('PRELOAD_RESEARCH_MODULES', 'false')
+os.environ.setdefault('CORPUS_ENABLED', 'false')
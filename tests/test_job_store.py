@@ -0,0 +1,105 @@
+import time
+
+from utils.job_store import JobStore
+
+
+def finish(store, research_id, result='report'):
+    store.update(research_id, {'status': 'completed', 'progress': 100, 'result': result})
+
+
+def test_oldest_finished_jobs_are_evicted_first():
+    store = JobStore(max_finished=2)
+    first, second, third = (store.create(f"query {i}") for i in range(3))
+    finish(store, first)
+    finish(store, second)
+    # Reading a job makes it the most recently used
+    store.get(first)
+    finish(store, third)
+
+    assert store.get(second) is None
+    assert store.get(first)['status'] == 'completed'
+    assert store.get(third)['status'] == 'completed'
+
+
+def test_active_jobs_are_never_evicted():
+    store = JobStore(max_finished=1, max_result_bytes=10)
+    queued = store.create('still waiting')
+    for i in range(3):
+        finish(store, store.create(f"query {i}"), result='x' * 8)
+
+    assert store.get(queued)['status'] == 'queued'
+    assert store.stats()['finished_in_memory'] == 1
+
+
+def test_result_bytes_bound_finished_jobs():
+    store = JobStore(max_result_bytes=10)
+    small, large = store.create('small'), store.create('large')
+    finish(store, small, result='x' * 4)
+    finish(store, large, result='x' * 8)
+
+    assert store.get(small) is None
+    assert store.stats()['result_bytes'] == 8
+
+
+def test_expired_jobs_are_dropped():
+    store = JobStore(finished_ttl=0.05)
+    old = store.create('old')
+    finish(store, old)
+    time.sleep(0.1)
+    finish(store, store.create('new'))
+
+    assert store.get(old) is None
+
+
+def test_jobs_survive_a_restart(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = JobStore(path=path)
+    research_id = store.create('persisted')
+    store.update(research_id, {'partial_result': 'streamed so far'})
+    finish(store, research_id, result='final report')
+
+    job = JobStore(path=path).get(research_id)
+    assert job['status'] == 'completed'
+    assert job['result'] == 'final report'
+    # Transient fields only matter to live readers of the old process
+    assert 'partial_result' not in job
+
+
+def test_evicted_jobs_load_from_disk(tmp_path):
+    store = JobStore(max_finished=1, path=str(tmp_path / 'jobs.db'))
+    first, second = store.create('first'), store.create('second')
+    finish(store, first)
+    finish(store, second)
+
+    assert store.stats()['finished_in_memory'] == 1
+    assert store.get(first)['result'] == 'report'
+
+
+def test_expiry_keeps_unfinished_rows(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = JobStore(finished_ttl=0.05, path=path)
+    queued = store.create('queued for a while')
+    old = store.create('old')
+    finish(store, old)
+    time.sleep(0.1)
+    finish(store, store.create('new'))
+
+    restarted = JobStore(path=path)
+    assert restarted.get(old) is None
+    assert restarted.get(queued)['status'] == 'queued'
+
+
+def test_jobs_abandoned_by_a_restart_are_closed(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    store = JobStore(path=path)
+    running = store.create('interrupted')
+    store.update(running, {'status': 'running'})
+    refreshing = store.create('refreshed')
+    finish(store, refreshing)
+    store.update(refreshing, {'status': 'running', 'refreshing': True})
+
+    restarted = JobStore(path=path, stale_after=0)
+    assert restarted.get(running)['status'] == 'error'
+    job = restarted.get(refreshing)
+    assert job['status'] == 'completed'
+    assert job['result'] == 'report'
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+import requests
+
+from benchmarks.fake_providers import FakeGroqHandler, ProviderProfile, start_server
+from utils.ratelimit import AdaptiveConcurrency, ProviderLimiter, classify_error
+
+
+@pytest.fixture
+def fake_groq():
+    server = start_server(FakeGroqHandler, ProviderProfile(latency=0, jitter=0, retry_after=0.2,
+                                                           completion_tokens=20))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def completion(server):
+    response = requests.post(f"http://127.0.0.1:{server.server_port}/openai/v1/chat/completions",
+                             json={'model': 'fake', 'messages': [{'role': 'user', 'content': 'hello'}]},
+                             timeout=5)
+    response.raise_for_status()
+    return response.json()
+
+
+def test_throttling_halves_the_concurrency_limit():
+    concurrency = AdaptiveConcurrency(max_limit=8, min_limit=2)
+    for expected in (4, 2, 2):
+        concurrency.acquire()
+        concurrency.release(throttled=True)
+        assert concurrency.limit == expected
+
+
+def test_successes_grow_the_limit_by_one_per_window():
+    concurrency = AdaptiveConcurrency(max_limit=8)
+    concurrency.limit = 4.0
+    for _ in range(4):
+        concurrency.acquire()
+        concurrency.release()
+    assert 4.8 < concurrency.limit < 5.0
+
+    for _ in range(100):
+        concurrency.acquire()
+        concurrency.release()
+    assert concurrency.limit == 8
+
+
+def test_throttled_call_is_retried_after_retry_after(fake_groq):
+    profile = fake_groq.RequestHandlerClass.profile
+    profile.throttle_rate = 1.0
+    limiter = ProviderLimiter('groq', max_concurrency=4, max_retries=3, base_delay=0.01)
+
+    def throttled_once():
+        try:
+            return completion(fake_groq)
+        finally:
+            profile.throttle_rate = 0.0
+
+    started = time.monotonic()
+    result = limiter.call(throttled_once)
+
+    assert result['choices'][0]['message']['content']
+    assert time.monotonic() - started >= profile.retry_after
+    stats = limiter.stats()
+    assert (stats['retries'], stats['throttled'], stats['failures']) == (1, 1, 0)
+    assert fake_groq.RequestHandlerClass.stats.as_dict()['requests'] == 2
+
+
+def test_retries_give_up_after_max_retries(fake_groq):
+    fake_groq.RequestHandlerClass.profile.throttle_rate = 1.0
+    fake_groq.RequestHandlerClass.profile.retry_after = 0
+    limiter = ProviderLimiter('groq', max_concurrency=4, max_retries=2, base_delay=0.01)
+
+    with pytest.raises(requests.HTTPError):
+        limiter.call(completion, fake_groq)
+
+    stats = limiter.stats()
+    assert (stats['retries'], stats['throttled'], stats['failures']) == (2, 3, 1)
+    assert stats['concurrency_limit'] == 1
+
+
+def test_server_errors_are_retried_without_throttling(fake_groq):
+    fake_groq.RequestHandlerClass.profile.error_rate = 1.0
+    limiter = ProviderLimiter('groq', max_concurrency=4, max_retries=1, base_delay=0.01)
+
+    with pytest.raises(requests.HTTPError) as error:
+        limiter.call(completion, fake_groq)
+
+    assert classify_error(error.value) == (True, False, None)
+    stats = limiter.stats()
+    assert (stats['retries'], stats['throttled'], stats['failures']) == (1, 0, 1)
+    assert stats['concurrency_limit'] == 4
+
+
+def test_client_errors_are_not_retried(fake_groq):
+    limiter = ProviderLimiter('groq', max_retries=3, base_delay=0.01)
+
+    def bad_path():
+        requests.post(f"http://127.0.0.1:{fake_groq.server_port}/unknown", json={}, timeout=5).raise_for_status()
+
+    with pytest.raises(requests.HTTPError):
+        limiter.call(bad_path)
+    assert limiter.stats()['retries'] == 0
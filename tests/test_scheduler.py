@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from utils.scheduler import ResearchScheduler, QueueFullError
+
+
+def noop(*args):
+    pass
+
+
+def test_queue_positions_interleave_clients():
+    scheduler = ResearchScheduler(max_workers=0)
+    for job_id, client_id in [('a1', 'a'), ('a2', 'a'), ('a3', 'a'), ('b1', 'b'), ('c1', 'c')]:
+        scheduler.submit(job_id, noop, client_id=client_id)
+
+    positions = {job_id: scheduler.queue_position(job_id) for job_id in ('a1', 'a2', 'a3', 'b1', 'c1')}
+    assert positions == {'a1': 1, 'b1': 2, 'c1': 3, 'a2': 4, 'a3': 5}
+
+
+def test_workers_dispatch_round_robin():
+    scheduler = ResearchScheduler(max_workers=1)
+    gate = threading.Event()
+    started = threading.Event()
+    order = []
+
+    def blocker():
+        started.set()
+        gate.wait(5)
+
+    scheduler.submit('gate', blocker, client_id='gate')
+    assert started.wait(5)
+    for job_id, client_id in [('a1', 'a'), ('a2', 'a'), ('a3', 'a'), ('b1', 'b'), ('c1', 'c')]:
+        scheduler.submit(job_id, order.append, job_id, client_id=client_id)
+
+    gate.set()
+    scheduler.shutdown(drain=True, timeout=5)
+    assert order == ['a1', 'b1', 'c1', 'a2', 'a3']
+
+
+def test_full_queue_is_rejected():
+    scheduler = ResearchScheduler(max_workers=0, max_queue=2)
+    scheduler.submit('one', noop, client_id='a')
+    scheduler.submit('two', noop, client_id='b')
+
+    with pytest.raises(QueueFullError) as error:
+        scheduler.submit('three', noop, client_id='c')
+    assert error.value.queue_depth == 2
+    assert scheduler.get_job('three') is None
+
+
+def test_client_limit_is_per_client():
+    scheduler = ResearchScheduler(max_workers=0, max_per_client=1)
+    scheduler.submit('a1', noop, client_id='a')
+
+    with pytest.raises(QueueFullError):
+        scheduler.submit('a2', noop, client_id='a')
+    scheduler.submit('b1', noop, client_id='b')
+    # A batch lane may queue more than an interactive client
+    scheduler.submit('batch1', noop, client_id='batch:a', client_limit=2)
+    scheduler.submit('batch2', noop, client_id='batch:a', client_limit=2)
+
+
+def test_cancelled_job_leaves_the_queue():
+    scheduler = ResearchScheduler(max_workers=0)
+    scheduler.submit('a1', noop, client_id='a')
+    scheduler.submit('b1', noop, client_id='b')
+
+    assert scheduler.cancel('a1')
+    assert scheduler.get_job('a1') is None
+    assert scheduler.queue_position('b1') == 1
+    assert scheduler.stats()['queue_depth'] == 1
+    assert not scheduler.cancel('a1')
+
+
+def test_shutdown_without_drain_reports_dropped_jobs():
+    dropped = []
+    scheduler = ResearchScheduler(max_workers=0, on_cancel=dropped.append)
+    scheduler.submit('a1', noop, client_id='a')
+    scheduler.submit('b1', noop, client_id='b')
+
+    scheduler.shutdown(drain=False, timeout=1)
+    assert sorted(job.job_id for job in dropped) == ['a1', 'b1']
+    assert all(job.state == 'cancelled' and job.cancel_event.is_set() for job in dropped)
+    with pytest.raises(QueueFullError):
+        scheduler.submit('c1', noop, client_id='c')
@@ -0,0 +1,92 @@
+import pytest
+
+from utils.job_store import JobStore
+from utils.scheduler import ResearchScheduler
+from utils.single_flight import SingleFlight
+
+
+def test_first_request_runs_the_job_and_later_ones_join():
+    flights = SingleFlight()
+    attached = []
+
+    assert flights.join('fast:q', 'r1') is None
+    assert flights.join('fast:q', 'r2', on_attach=attached.append) == 'r1'
+    assert flights.join('fast:q', 'r3') == 'r1'
+    assert attached == ['r1']
+    assert flights.member_count('r1') == 3
+
+    with flights.members('r1') as members:
+        assert members == ['r1', 'r2', 'r3']
+    assert flights.stats() == {'flights': 1, 'attached': 3, 'coalesced': 2}
+
+
+def test_final_update_dissolves_the_flight():
+    flights = SingleFlight()
+    flights.join('fast:q', 'r1')
+    flights.join('fast:q', 'r2')
+
+    with flights.members('r1', final=True) as members:
+        assert members == ['r1', 'r2']
+
+    assert flights.join('fast:q', 'r3') is None
+    assert flights.member_count('r1') == 0
+    with flights.members('r1') as members:
+        assert members == ['r1']
+
+
+def test_leaving_counts_down_the_members():
+    flights = SingleFlight()
+    flights.join('fast:q', 'r1')
+    flights.join('fast:q', 'r2')
+
+    assert flights.leave('r2') == ('r1', 1)
+    assert flights.leave('r1') == ('r1', 0)
+    assert flights.leave('r1') is None
+    # Nobody waits for the job any more, so a new request starts over
+    assert flights.join('fast:q', 'r3') is None
+
+
+def test_owner_that_left_is_remembered_until_the_job_ends():
+    flights = SingleFlight()
+    flights.join('fast:q', 'r1')
+    flights.join('fast:q', 'r2')
+
+    assert flights.leave('r1') == ('r1', 1)
+    assert flights.leave('r1') is None
+    assert flights.has_left('r1')
+    assert flights.member_count('r1') == 1
+
+    flights.finish('r1')
+    assert not flights.has_left('r1')
+    assert flights.member_count('r1') == 0
+
+
+@pytest.fixture
+def app_module(monkeypatch):
+    import app
+
+    monkeypatch.setattr(app, 'job_store', JobStore())
+    monkeypatch.setattr(app, 'scheduler', ResearchScheduler(max_workers=0))
+    monkeypatch.setattr(app, 'research_flights', SingleFlight())
+    monkeypatch.setattr(app.Config, 'RESEARCH_COALESCING', True)
+    return app
+
+
+def test_owner_cancelling_twice_keeps_the_shared_job(app_module):
+    app = app_module
+    owner = app.job_store.create('shared query')
+    member = app.job_store.create('shared query')
+    assert app.enqueue_research(owner, 'shared query', 'client-a') == owner
+    assert app.enqueue_research(member, 'shared query', 'client-b') == owner
+
+    client = app.app.test_client()
+    assert client.post(f'/cancel_research/{owner}').status_code == 200
+    assert client.post(f'/cancel_research/{owner}').status_code == 409
+
+    assert app.scheduler.get_job(owner).state == 'queued'
+    assert app.job_store.get(owner)['status'] == 'cancelled'
+    assert app.job_store.get(member)['status'] == 'queued'
+
+    # The last request withdrawing cancels the job
+    assert client.post(f'/cancel_research/{member}').status_code == 200
+    assert app.scheduler.get_job(owner) is None
@@ -1,8 +1,14 @@
 # Utils package initialization
+from importlib import import_module
 from .config import Config
-from .agents import ModernResearchAgents
-from .search import TavilyRetrievalSystem
-from .report_generator import EnhancedReportGenerator
+
+# Submodules are imported on first attribute access, so importing one light
+# utils module does not load LangChain, Groq, Tavily and ReportLab with it
+_LAZY_EXPORTS = {
+    'ModernResearchAgents': '.agents',
+    'TavilyRetrievalSystem': '.search',
+    'EnhancedReportGenerator': '.report_generator'
+}
 
 __all__ = [
     'Config',
@@ -10,3 +16,11 @@ __all__ = [
     'TavilyRetrievalSystem',
     'EnhancedReportGenerator'
 ]
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
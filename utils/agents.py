@@ -1,28 +1,121 @@
 import os
+import httpx
+from requests.adapters import HTTPAdapter
 from langchain_groq import ChatGroq
 from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from tavily import TavilyClient
+from langchain_core.callbacks import BaseCallbackHandler
+from tavily import AsyncTavilyClient, TavilyClient
 from .config import Config
+from .cache import get_llm_cache
+from .llm_cache import CachedChatModel
+from .ratelimit import get_provider_limiter
+
+# What the research prompt asks to extract; used as retrieval queries for its context
+RESEARCH_FOCUS_AREAS = [
+    "company names funding amounts recent developments",
+    "key market players and leaders",
+    "statistics and growth data",
+    "expert quotes and industry insights",
+    "recent news and technological breakthroughs"
+]
+
+# Top-level sections of the writer prompt's report structure
+REPORT_SECTIONS = [
+    "Executive Summary",
+    "Top AI Healthcare Startups in India",
+    "Market Analysis",
+    "Investment Landscape",
+    "Future Outlook",
+    "References and Sources"
+]
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """Reports prompt and completion token counts of each LLM call to a JobMetrics"""
+    
+    # Only a locked counter update, so async calls need not hop to a thread for it
+    run_inline = True
+    
+    def __init__(self, job_metrics, stage: str):
+        self.job_metrics = job_metrics
+        self.stage = stage
+    
+    def on_llm_end(self, response, **kwargs):
+        prompt_tokens = completion_tokens = 0
+        # The model that answered, for the cost estimate
+        model = (response.llm_output or {}).get('model_name')
+        
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, 'message', None)
+                usage = getattr(message, 'usage_metadata', None)
+                if usage:
+                    prompt_tokens += usage.get('input_tokens', 0)
+                    completion_tokens += usage.get('output_tokens', 0)
+                model = model or (getattr(message, 'response_metadata', None) or {}).get('model_name')
+        
+        if not prompt_tokens and not completion_tokens:
+            token_usage = (response.llm_output or {}).get('token_usage', {})
+            prompt_tokens = token_usage.get('prompt_tokens', 0)
+            completion_tokens = token_usage.get('completion_tokens', 0)
+        
+        self.job_metrics.add_tokens(self.stage, prompt_tokens, completion_tokens, model=model)
 
 class ModernResearchAgents:
-    def __init__(self):
+    def __init__(self, use_llm_cache: bool = True):
         self.groq_api_key = Config.GROQ_API_KEY
         self.tavily_api_key = Config.TAVILY_API_KEY
         
         if not self.groq_api_key or not self.tavily_api_key:
             raise ValueError("API keys not found in environment variables")
         
-        self.llm = ChatGroq(
-            api_key=self.groq_api_key,
-            model_name=Config.GROQ_MODEL,
-            temperature=0.1,
-            max_tokens=4000
+        # Pooled keep-alive connections, shared by every chain built from this instance
+        limits = httpx.Limits(
+            max_connections=Config.HTTP_POOL_SIZE,
+            max_keepalive_connections=Config.HTTP_POOL_SIZE
         )
+        self.http_client = httpx.Client(limits=limits)
+        # Used by ainvoke/astream; async jobs all run on one event loop
+        self.http_async_client = httpx.AsyncClient(limits=limits)
+        self.use_llm_cache = use_llm_cache
+        self._chat_models = {}
+        
+        self.llm = self.chat_model(Config.GROQ_MODEL)
+        
+        self.tavily = TavilyClient(api_key=self.tavily_api_key, api_base_url=Config.TAVILY_API_BASE)
+        self.async_tavily = AsyncTavilyClient(api_key=self.tavily_api_key, api_base_url=Config.TAVILY_API_BASE)
         
-        self.tavily = TavilyClient(api_key=self.tavily_api_key)
+        session = getattr(self.tavily, 'session', None)
+        if session is not None:
+            adapter = HTTPAdapter(pool_maxsize=Config.HTTP_POOL_SIZE)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
         
-    def setup_research_agent(self):
+    def chat_model(self, model: str, temperature: float = 0.1, max_tokens: int = 4000):
+        """Groq chat model with these settings, built once; all of them share the pooled connections"""
+        key = (model, temperature, max_tokens)
+        if key not in self._chat_models:
+            chat_model = ChatGroq(
+                api_key=self.groq_api_key,
+                base_url=Config.GROQ_API_BASE,
+                model_name=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+                # Retries and backoff are handled by the provider limiter
+                max_retries=0
+            )
+            
+            # Identical prompts are answered from the on-disk completion cache;
+            # pass use_llm_cache=False to always call Groq. Calls that reach Groq
+            # share one limiter, so concurrent jobs and batches stay within its limits
+            self._chat_models[key] = CachedChatModel(
+                chat_model, get_llm_cache(), bypass=not self.use_llm_cache, limiter=get_provider_limiter('groq')
+            )
+        return self._chat_models[key]
+    
+    def setup_research_agent(self, llm=None):
         research_prompt = PromptTemplate(
             input_variables=["query", "search_results"],
             template="""You are an Expert Research Agent. Analyze this search data about: {query}
@@ -40,10 +133,10 @@ Extract:
 Focus on factual, recent information. Prioritize Indian companies and current developments."""
         )
         
-        chain = research_prompt | self.llm | StrOutputParser()
+        chain = research_prompt | (llm if llm is not None else self.llm) | StrOutputParser()
         return chain
     
-    def setup_summarizer_agent(self):
+    def setup_summarizer_agent(self, llm=None):
         summarizer_prompt = PromptTemplate(
             input_variables=["research_content"],
             template="""Process this research content: {research_content}
@@ -67,10 +160,10 @@ Create structured summary:
 Include specific numbers, dates, and company names."""
         )
         
-        chain = summarizer_prompt | self.llm | StrOutputParser()
+        chain = summarizer_prompt | (llm if llm is not None else self.llm) | StrOutputParser()
         return chain
     
-    def setup_critic_agent(self):
+    def setup_critic_agent(self, llm=None):
         critic_prompt = PromptTemplate(
             input_variables=["summary_content"],
             template="""Evaluate this content for accuracy: {summary_content}
@@ -84,10 +177,10 @@ Analyze:
 Provide reliability score (1-10) and improvement recommendations."""
         )
         
-        chain = critic_prompt | self.llm | StrOutputParser()
+        chain = critic_prompt | (llm if llm is not None else self.llm) | StrOutputParser()
         return chain
     
-    def setup_writer_agent(self):
+    def setup_writer_agent(self, llm=None):
         writer_prompt = PromptTemplate(
             input_variables=["research_data", "summary", "critique"],
             template="""Create a comprehensive research report using:
@@ -134,5 +227,30 @@ List sources with clickable URLs and publication dates.
 Use professional tone with specific data, figures, and company details."""
         )
         
-        chain = writer_prompt | self.llm | StrOutputParser()
+        chain = writer_prompt | (llm if llm is not None else self.llm) | StrOutputParser()
+        return chain
+    
+    def setup_patch_agent(self, llm=None):
+        patch_prompt = PromptTemplate(
+            input_variables=["query", "section", "new_findings", "new_sources"],
+            template="""Update one section of an existing research report about: {query}
+
+CURRENT SECTION:
+{section}
+
+NEW FINDINGS SINCE THE REPORT WAS WRITTEN:
+{new_findings}
+
+NEW SOURCE PASSAGES FOR THIS SECTION:
+{new_sources}
+
+Rewrite the section to include the new information:
+- Keep its heading, structure and existing facts unless a new source supersedes them
+- Add new companies, figures and developments with their source URLs
+- Do not repeat information the section already contains
+
+Return only the revised section in Markdown."""
+        )
+        
+        chain = patch_prompt | (llm if llm is not None else self.llm) | StrOutputParser()
         return chain
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+class Artifact:
+    """One rendered output of a research job"""
+    
+    def __init__(self, research_id: str, format: str, data: bytes, mimetype: str, filename: str):
+        self.research_id = research_id
+        self.format = format
+        self.mimetype = mimetype
+        self.filename = filename
+        self.size = len(data)
+        self.etag = hashlib.sha256(data).hexdigest()[:32]
+        self.created_at = time.time()
+        self.data = data
+        self.path = None
+    
+    def read(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+    
+    def stream(self, chunk_size: int = 64 * 1024):
+        """Iterable over the artifact's bytes without building another copy.
+        
+        Spilled files are opened right away, so a later eviction cannot
+        remove them from under a response that is still being sent.
+        """
+        if self.data is not None:
+            return [self.data]
+        
+        f = open(self.path, 'rb')
+        
+        def generate():
+            with f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        
+        return generate()
+
+def iter_json(obj, chunk_size: int = 64 * 1024, indent: int = 2):
+    """Encode ``obj`` as JSON incrementally, yielding byte chunks of about ``chunk_size``"""
+    buffer = []
+    buffered = 0
+    
+    for piece in json.JSONEncoder(indent=indent).iterencode(obj):
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield ''.join(buffer).encode('utf-8')
+            buffer = []
+            buffered = 0
+    
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+class ArtifactStore:
+    """Renders each (research_id, format) at most once and keeps the bytes.
+    
+    Artifacts up to ``spill_bytes`` stay in memory, larger ones are written
+    to a managed directory. Least recently used artifacts are evicted once
+    their total size exceeds ``max_bytes``, and any artifact older than
+    ``max_age`` seconds is dropped.
+    """
+    
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_age: float = 6 * 3600,
+                 spill_bytes: int = 1024 * 1024, directory: str = None):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.spill_bytes = spill_bytes
+        self._directory = directory
+        self._owns_directory = directory is None
+        
+        self._artifacts = OrderedDict()  # (research_id, format) -> Artifact, in LRU order
+        self._total_bytes = 0
+        self._render_locks = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.hits = 0
+        self.evictions = 0
+    
+    def get(self, research_id: str, format: str):
+        key = (research_id, format)
+        with self._lock:
+            artifact = self._artifacts.get(key)
+            if artifact is None:
+                return None
+            
+            # Only the requested artifact is checked here; full sweeps run on insert
+            if artifact.created_at < time.time() - self.max_age:
+                self._remove(key)
+                self.evictions += 1
+                return None
+            
+            self._artifacts.move_to_end(key)
+            self.hits += 1
+            return artifact
+    
+    def get_or_render(self, research_id: str, format: str, render) -> Artifact:
+        """Return the stored artifact, calling ``render() -> (bytes, mimetype, filename)`` only on a miss.
+        
+        Concurrent requests for the same artifact wait for the first render
+        instead of starting their own.
+        """
+        key = (research_id, format)
+        
+        artifact = self.get(research_id, format)
+        if artifact is not None:
+            return artifact
+        
+        with self._lock:
+            render_lock = self._render_locks.setdefault(key, threading.Lock())
+        
+        try:
+            with render_lock:
+                artifact = self.get(research_id, format)
+                if artifact is not None:
+                    return artifact
+                
+                data, mimetype, filename = render()
+                artifact = Artifact(research_id, format, data, mimetype, filename)
+                self._put(artifact)
+                return artifact
+        finally:
+            with self._lock:
+                self._render_locks.pop(key, None)
+    
+    def discard(self, research_id: str):
+        """Drop every format of a job, e.g. after its report changed"""
+        with self._lock:
+            for key in [key for key in self._artifacts if key[0] == research_id]:
+                self._remove(key)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'artifacts': len(self._artifacts),
+                'bytes': self._total_bytes,
+                'spilled': sum(1 for artifact in self._artifacts.values() if artifact.path),
+                'renders': self.renders,
+                'hits': self.hits,
+                'evictions': self.evictions
+            }
+    
+    def close(self):
+        """Remove every artifact, including spilled files"""
+        with self._lock:
+            for key in list(self._artifacts):
+                self._remove(key)
+            if self._owns_directory and self._directory:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+    
+    def _put(self, artifact: Artifact):
+        if artifact.size > self.spill_bytes:
+            artifact.path = os.path.join(
+                self._spill_directory(),
+                f"{artifact.research_id}.{artifact.format}"
+            )
+            with open(artifact.path, 'wb') as f:
+                f.write(artifact.data)
+            artifact.data = None
+        
+        with self._lock:
+            key = (artifact.research_id, artifact.format)
+            if key in self._artifacts:
+                self._remove(key)
+            
+            self._artifacts[key] = artifact
+            self._total_bytes += artifact.size
+            self.renders += 1
+            
+            self._expire()
+            while self._total_bytes > self.max_bytes and len(self._artifacts) > 1:
+                self._remove(next(iter(self._artifacts)))
+                self.evictions += 1
+    
+    def _spill_directory(self) -> str:
+        with self._lock:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix='research-artifacts-')
+            else:
+                os.makedirs(self._directory, exist_ok=True)
+            return self._directory
+    
+    def _expire(self):
+        cutoff = time.time() - self.max_age
+        for key in [key for key, artifact in self._artifacts.items() if artifact.created_at < cutoff]:
+            self._remove(key)
+            self.evictions += 1
+    
+    def _remove(self, key):
+        artifact = self._artifacts.pop(key)
+        self._total_bytes -= artifact.size
+        if artifact.path:
+            try:
+                os.remove(artifact.path)
+            except OSError:
+                pass
@@ -0,0 +1,49 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from .cache import normalize_query
+
+class BatchStore:
+    """Remembers which research jobs belong to each batch.
+    
+    The jobs themselves live in the JobStore; a batch only maps its queries
+    to their research IDs. The oldest batches are forgotten past
+    ``max_batches``.
+    """
+    
+    def __init__(self, max_batches: int = 100):
+        self.max_batches = max_batches
+        self._batches = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def new_id() -> str:
+        return f"batch_{uuid.uuid4().hex}"
+    
+    def create(self, items: list, batch_id: str = None) -> str:
+        """``items`` are ``{'query': ..., 'research_id': ...}`` dicts in submission order"""
+        batch_id = batch_id or self.new_id()
+        with self._lock:
+            self._batches[batch_id] = {
+                'batch_id': batch_id,
+                'created_at': time.time(),
+                'items': [dict(item) for item in items]
+            }
+            while len(self._batches) > self.max_batches:
+                self._batches.popitem(last=False)
+        return batch_id
+    
+    def get(self, batch_id: str):
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            return {**batch, 'items': [dict(item) for item in batch['items']]}
+
+def dedupe_queries(queries: list) -> OrderedDict:
+    """Map each distinct normalized query to the original queries that share it, keeping first-seen order"""
+    groups = OrderedDict()
+    for query in queries:
+        groups.setdefault(normalize_query(query), []).append(query)
+    return groups
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from .config import Config
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share a key"""
+    return re.sub(r'\s+', ' ', query or '').strip().lower()
+
+def make_cache_key(namespace: str, query: str, **params) -> str:
+    payload = json.dumps(
+        {"query": normalize_query(query), "params": params},
+        sort_keys=True,
+        default=str
+    )
+    return f"{namespace}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+class MemoryCache:
+    """Thread-safe in-memory LRU cache with per-entry TTLs"""
+    
+    def __init__(self, max_entries: int = 512, default_ttl: float = 3600):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: str, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return default
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value, ttl: float = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else None
+        
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+    
+    def stats(self) -> dict:
+        return {
+            'backend': 'memory',
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+class SQLiteCache:
+    """On-disk cache with the same interface as MemoryCache; values must be JSON serializable"""
+    
+    def __init__(self, path: str, max_entries: int = 5000, default_ttl: float = 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+        self._conn.commit()
+    
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return default
+            
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return default
+            
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        
+        return json.loads(value)
+    
+    def set(self, key: str, value, ttl: float = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        serialized = json.dumps(value)
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, serialized, expires_at, now)
+            )
+            
+            # Drop expired entries first, then the least recently used ones
+            self._conn.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+            overflow = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (overflow,)
+                )
+                self.evictions += overflow
+            
+            self._conn.commit()
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+    
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+    
+    def stats(self) -> dict:
+        return {
+            'backend': 'sqlite',
+            'path': self.path,
+            'entries': len(self),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+def create_cache(backend: str, path: str = None, max_entries: int = 512, default_ttl: float = 3600):
+    """Build a cache backend by name; returns None when caching is disabled"""
+    backend = (backend or 'none').lower()
+    
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    elif backend == 'sqlite':
+        return SQLiteCache(path, max_entries=max_entries, default_ttl=default_ttl)
+    elif backend == 'none':
+        return None
+    
+    raise ValueError(f"Unknown cache backend: {backend}")
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def _get_shared_cache(name: str, backend: str, path: str, max_entries: int, default_ttl: float):
+    if name not in _shared_caches:
+        with _shared_caches_lock:
+            if name not in _shared_caches:
+                _shared_caches[name] = create_cache(
+                    backend,
+                    path=path,
+                    max_entries=max_entries,
+                    default_ttl=default_ttl
+                )
+    
+    return _shared_caches[name]
+
+def get_search_cache():
+    """Process-wide search result cache shared by every TavilyRetrievalSystem"""
+    return _get_shared_cache(
+        'search',
+        Config.SEARCH_CACHE_BACKEND,
+        Config.SEARCH_CACHE_PATH,
+        Config.SEARCH_CACHE_MAX_ENTRIES,
+        Config.SEARCH_CACHE_TTL
+    )
+
+def get_llm_cache():
+    """Process-wide on-disk completion cache shared by every agent chain"""
+    return _get_shared_cache(
+        'llm',
+        'sqlite' if Config.LLM_CACHE_ENABLED else 'none',
+        Config.LLM_CACHE_PATH,
+        Config.LLM_CACHE_MAX_ENTRIES,
+        Config.LLM_CACHE_TTL
+    )
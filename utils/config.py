@@ -1,14 +1,185 @@
 import os
+import json
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def pipeline_profile(name: str, skip_critic: bool, **agents) -> dict:
+    """A pipeline profile from each agent's default ``(model, temperature, max_tokens)``.
+    
+    Every value can be overridden from the environment, e.g. FAST_CRITIC_MODEL,
+    FAST_CRITIC_TEMPERATURE, FAST_CRITIC_MAX_TOKENS or FAST_SKIP_CRITIC.
+    """
+    prefix = name.upper()
+    settings = {}
+    for agent, (model, temperature, max_tokens) in agents.items():
+        key = f"{prefix}_{agent.upper()}"
+        settings[agent] = {
+            'model': os.getenv(f"{key}_MODEL", model),
+            'temperature': float(os.getenv(f"{key}_TEMPERATURE", str(temperature))),
+            'max_tokens': int(os.getenv(f"{key}_MAX_TOKENS", str(max_tokens)))
+        }
+    return {
+        'skip_critic': os.getenv(f"{prefix}_SKIP_CRITIC", str(skip_critic)).lower() == "true",
+        'agents': settings
+    }
+
 class Config:
     GROQ_MODEL = "llama-3.3-70b-versatile"
+    GROQ_FAST_MODEL = os.getenv("GROQ_FAST_MODEL", "llama-3.1-8b-instant")
+    
+    # Pipeline profiles, chosen per request with "profile" in /start_research.
+    # "thorough" is the full pipeline on the large model; "fast" runs the
+    # summarizer and critic on the small model, skips the critic and caps outputs
+    PIPELINE_PROFILES = {
+        'thorough': pipeline_profile(
+            'thorough', False,
+            research=(GROQ_MODEL, 0.1, 4000),
+            summarizer=(GROQ_MODEL, 0.1, 4000),
+            critic=(GROQ_MODEL, 0.1, 4000),
+            writer=(GROQ_MODEL, 0.1, 4000),
+            patch=(GROQ_MODEL, 0.1, 4000)
+        ),
+        'fast': pipeline_profile(
+            'fast', True,
+            research=(GROQ_MODEL, 0.1, 1500),
+            summarizer=(GROQ_FAST_MODEL, 0.1, 1000),
+            critic=(GROQ_FAST_MODEL, 0.1, 600),
+            writer=(GROQ_MODEL, 0.1, 2500),
+            patch=(GROQ_MODEL, 0.1, 1500)
+        )
+    }
+    DEFAULT_PIPELINE_PROFILE = os.getenv("DEFAULT_PIPELINE_PROFILE", "thorough")
+    
+    # USD per million (prompt, completion) tokens, for the cost recorded per
+    # job; add models as GROQ_PRICES='{"model": [prompt, completion]}'
+    GROQ_PRICES = {
+        "llama-3.3-70b-versatile": (0.59, 0.79),
+        "llama-3.1-8b-instant": (0.05, 0.08),
+        **json.loads(os.getenv("GROQ_PRICES", "{}"))
+    }
     TAVILY_MAX_RESULTS = 15
     TAVILY_SEARCH_DEPTH = "advanced"
     
+    # Search concurrency
+    TAVILY_CONCURRENT_SEARCH = os.getenv("TAVILY_CONCURRENT_SEARCH", "true").lower() == "true"
+    TAVILY_SEARCH_WORKERS = int(os.getenv("TAVILY_SEARCH_WORKERS", "4"))
+    TAVILY_QUERY_TIMEOUT = float(os.getenv("TAVILY_QUERY_TIMEOUT", "30"))
+    
+    # Search result cache (memory, sqlite or none)
+    SEARCH_CACHE_BACKEND = os.getenv("SEARCH_CACHE_BACKEND", "memory")
+    SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "cache/search_cache.sqlite3")
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
+    
+    # LLM completion cache
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3")
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+    
+    # Connection pool size for the shared Groq and Tavily HTTP clients
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+    
+    # Research job scheduler
+    MAX_CONCURRENT_RESEARCH = int(os.getenv("MAX_CONCURRENT_RESEARCH", "4"))
+    MAX_QUEUED_RESEARCH = int(os.getenv("MAX_QUEUED_RESEARCH", "50"))
+    MAX_RESEARCH_PER_CLIENT = int(os.getenv("MAX_RESEARCH_PER_CLIENT", "5"))
+    # Reverse proxies in front of the app that append to X-Forwarded-For; with
+    # 0 the header is client-supplied and ignored, so it cannot dodge the limit
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+    SCHEDULER_DRAIN_TIMEOUT = float(os.getenv("SCHEDULER_DRAIN_TIMEOUT", "300"))
+    
+    # Async mode: research jobs run as tasks on one event loop instead of worker threads
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+    MAX_CONCURRENT_RESEARCH_ASYNC = int(os.getenv("MAX_CONCURRENT_RESEARCH_ASYNC", "200"))
+    
+    # Identical queries submitted while one is queued or running attach to that job
+    RESEARCH_COALESCING = os.getenv("RESEARCH_COALESCING", "true").lower() == "true"
+    
+    # LangChain, Groq, Tavily and ReportLab load lazily; when true, a background
+    # thread imports them right after startup instead of the first job paying for it
+    PRELOAD_RESEARCH_MODULES = os.getenv("PRELOAD_RESEARCH_MODULES", "true").lower() == "true"
+    
+    # Research job store; set JOB_STORE_PATH to persist jobs in SQLite
+    JOB_STORE_MAX_FINISHED = int(os.getenv("JOB_STORE_MAX_FINISHED", "200"))
+    JOB_STORE_MAX_RESULT_BYTES = int(os.getenv("JOB_STORE_MAX_RESULT_BYTES", str(50 * 1024 * 1024)))
+    JOB_STORE_TTL = int(os.getenv("JOB_STORE_TTL", str(24 * 3600)))
+    JOB_STORE_PATH = os.getenv("JOB_STORE_PATH")
+    
+    # Server-Sent Events progress stream
+    SSE_HEARTBEAT_INTERVAL = float(os.getenv("SSE_HEARTBEAT_INTERVAL", "15"))
+    SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+    
+    # How often streamed report text is published to progress listeners
+    REPORT_STREAM_FLUSH_INTERVAL = float(os.getenv("REPORT_STREAM_FLUSH_INTERVAL", "0.25"))
+    
+    # Research pipeline: concurrent stages and per-section critiques
+    PIPELINE_MAX_CONCURRENCY = int(os.getenv("PIPELINE_MAX_CONCURRENCY", "3"))
+    PIPELINE_SECTION_CRITIQUE = os.getenv("PIPELINE_SECTION_CRITIQUE", "true").lower() == "true"
+    
+    # Per-stage latency, token and context size instrumentation
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
+    # Context budgeting between search and the agents
+    CONTEXT_BUDGET_ENABLED = os.getenv("CONTEXT_BUDGET_ENABLED", "true").lower() == "true"
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "6000"))
+    CONTEXT_TARGETED_TOKEN_BUDGET = int(os.getenv("CONTEXT_TARGETED_TOKEN_BUDGET", "2000"))
+    CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.8"))
+    
+    # Retrieval-augmented prompts from an in-process vector index of the job's sources
+    RAG_ENABLED = os.getenv("RAG_ENABLED", "true").lower() == "true"
+    RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+    
+    # Cross-job source corpus; sub-queries it covers well enough skip the web
+    CORPUS_ENABLED = os.getenv("CORPUS_ENABLED", "true").lower() == "true"
+    CORPUS_PATH = os.getenv("CORPUS_PATH", "cache/source_corpus.sqlite3")
+    CORPUS_MAX_AGE_DAYS = float(os.getenv("CORPUS_MAX_AGE_DAYS", "7"))
+    CORPUS_MIN_SCORE = float(os.getenv("CORPUS_MIN_SCORE", "0.5"))
+    CORPUS_MAX_INDEXED_WORDS = int(os.getenv("CORPUS_MAX_INDEXED_WORDS", "2000"))
+    
+    # Rendered report artifacts; large ones spill to ARTIFACT_DIR (a temp dir by default)
+    ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(256 * 1024 * 1024)))
+    ARTIFACT_MAX_AGE = int(os.getenv("ARTIFACT_MAX_AGE", str(6 * 3600)))
+    ARTIFACT_SPILL_BYTES = int(os.getenv("ARTIFACT_SPILL_BYTES", str(1024 * 1024)))
+    ARTIFACT_DIR = os.getenv("ARTIFACT_DIR")
+    
+    # Reports larger than this many UTF-8 bytes are exported as a streamed JSON body instead of a stored artifact
+    DOWNLOAD_STREAM_JSON_BYTES = int(os.getenv("DOWNLOAD_STREAM_JSON_BYTES", str(1024 * 1024)))
+    
+    # Background PDF rendering; 0 workers renders in the request thread
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "2"))
+    PDF_RENDER_QUEUE = int(os.getenv("PDF_RENDER_QUEUE", "16"))
+    PDF_RENDER_TIMEOUT = int(os.getenv("PDF_RENDER_TIMEOUT", "120"))
+    PDF_RENDER_EAGER = os.getenv("PDF_RENDER_EAGER", "true").lower() == "true"
+    PDF_RENDER_START_METHOD = os.getenv("PDF_RENDER_START_METHOD", "spawn")
+    
+    # Client-side provider limits shared by all jobs; 0 disables a limit
+    GROQ_REQUESTS_PER_MINUTE = float(os.getenv("GROQ_REQUESTS_PER_MINUTE", "0"))
+    GROQ_TOKENS_PER_MINUTE = float(os.getenv("GROQ_TOKENS_PER_MINUTE", "0"))
+    GROQ_MAX_CONCURRENCY = int(os.getenv("GROQ_MAX_CONCURRENCY", "8"))
+    TAVILY_REQUESTS_PER_MINUTE = float(os.getenv("TAVILY_REQUESTS_PER_MINUTE", "0"))
+    TAVILY_MAX_CONCURRENCY = int(os.getenv("TAVILY_MAX_CONCURRENCY", "8"))
+    PROVIDER_REQUEST_BURST = int(os.getenv("PROVIDER_REQUEST_BURST", "5"))
+    PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "3"))
+    PROVIDER_RETRY_BASE_DELAY = float(os.getenv("PROVIDER_RETRY_BASE_DELAY", "0.5"))
+    PROVIDER_RETRY_MAX_DELAY = float(os.getenv("PROVIDER_RETRY_MAX_DELAY", "30"))
+    
+    # Batch research
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "50"))
+    BATCH_MAX_STORED = int(os.getenv("BATCH_MAX_STORED", "100"))
+    
+    # Incremental refresh: new passages are matched to the report sections they
+    # resemble, and at most REFRESH_MAX_SECTIONS sections are rewritten
+    REFRESH_SECTION_MIN_SCORE = float(os.getenv("REFRESH_SECTION_MIN_SCORE", "0.05"))
+    REFRESH_MAX_SECTIONS = int(os.getenv("REFRESH_MAX_SECTIONS", "3"))
+    REFRESH_PASSAGES_PER_SECTION = int(os.getenv("REFRESH_PASSAGES_PER_SECTION", "6"))
+    
     # API Keys
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+    
+    # API endpoints; point them at a proxy or at the offline fakes in benchmarks/
+    GROQ_API_BASE = os.getenv("GROQ_API_BASE")
+    TAVILY_API_BASE = os.getenv("TAVILY_API_BASE")
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
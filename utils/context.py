@@ -0,0 +1,179 @@
+import math
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'will', 'with'
+}
+
+def tokenize(text: str) -> list:
+    return [token for token in re.findall(r'\w+', text.lower()) if token not in STOPWORDS]
+
+def normalize_url(url: str) -> str:
+    """Scheme, www., query string, fragment and trailing slash do not make a different page"""
+    parts = urlsplit((url or '').strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+def shingles(text: str, size: int = 5) -> set:
+    words = tokenize(text)
+    if len(words) <= size:
+        return {tuple(words)} if words else set()
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    return int(math.ceil(len(text) / chars_per_token))
+
+class ContextBudgeter:
+    """Turns raw Tavily responses into a deduplicated, relevance-ranked prompt context.
+    
+    Sources are deduplicated by normalized URL and by word-shingle Jaccard
+    similarity, split into passages, ranked with BM25 against the query and
+    packed greedily into a token budget. The output keeps the
+    ``**SOURCE n:** / **URL:** / **CONTENT:**`` layout of ``_format_response``.
+    """
+    
+    def __init__(self, token_budget: int = 6000, duplicate_threshold: float = 0.8,
+                 passage_words: int = 120, chars_per_token: float = 4.0):
+        self.token_budget = token_budget
+        self.duplicate_threshold = duplicate_threshold
+        self.passage_words = passage_words
+        self.chars_per_token = chars_per_token
+    
+    def build(self, query: str, responses: list, exclude_responses: list = (), token_budget: int = None) -> dict:
+        """Build the context; sources also present in ``exclude_responses`` are dropped.
+        
+        Returns a dict with the context ``text`` and selection statistics.
+        """
+        sources = self.unique_sources(responses, exclude_responses)
+        ranked = [item[1:] for item in self._rank_passages(query, sources)]
+        return self.pack(responses, sources, ranked, token_budget)
+    
+    def unique_sources(self, responses: list, exclude_responses: list = ()) -> list:
+        """Results of ``responses`` minus URL and near-duplicate content repeats"""
+        seen_urls = set()
+        seen_shingles = []
+        for response in exclude_responses:
+            for result in response.get('results') or []:
+                seen_urls.add(normalize_url(result.get('url')))
+                seen_shingles.append(shingles(self._source_text(result)))
+        
+        sources = []
+        for response in responses:
+            for result in response.get('results') or []:
+                url = normalize_url(result.get('url'))
+                if url and url in seen_urls:
+                    continue
+                
+                fingerprint = shingles(self._source_text(result))
+                if any(jaccard(fingerprint, other) >= self.duplicate_threshold for other in seen_shingles):
+                    continue
+                
+                seen_urls.add(url)
+                seen_shingles.append(fingerprint)
+                sources.append(result)
+        
+        return sources
+    
+    def passages(self, source: dict) -> list:
+        """The search snippet followed by ``passage_words``-sized chunks of the raw page"""
+        passages = []
+        snippet = (source.get('content') or '').strip()
+        if snippet:
+            passages.append(snippet)
+        
+        raw_content = source.get('raw_content') or ''
+        for paragraph in re.split(r'\n\s*\n', raw_content):
+            words = paragraph.split()
+            for i in range(0, len(words), self.passage_words):
+                passage = ' '.join(words[i:i + self.passage_words])
+                if len(passage) > 40 and passage not in snippet:
+                    passages.append(passage)
+        
+        return passages
+    
+    def pack(self, responses: list, sources: list, ranked: list, token_budget: int = None) -> dict:
+        """Fill the token budget with Tavily's answers, then ``(source_index, passage_index, passage)``
+        items in the given priority order"""
+        token_budget = self.token_budget if token_budget is None else token_budget
+        parts = []
+        used_tokens = 0
+        
+        # Tavily's answers are short and dense, they go first
+        for response in responses:
+            if response.get('answer'):
+                insight = f"**INSIGHT:** {response['answer']}\n"
+                cost = estimate_tokens(insight, self.chars_per_token)
+                if used_tokens + cost <= token_budget:
+                    parts.append(insight)
+                    used_tokens += cost
+        
+        selected = {}
+        for source_index, passage_index, passage in ranked:
+            cost = estimate_tokens(passage, self.chars_per_token) + 1
+            if used_tokens + cost > token_budget:
+                continue
+            selected.setdefault(source_index, []).append((passage_index, passage))
+            used_tokens += cost
+        
+        # Keep the original source order and passage order within each source
+        for number, source_index in enumerate(sorted(selected), 1):
+            source = sources[source_index]
+            passages = [passage for _, passage in sorted(selected[source_index])]
+            parts.append(f"**SOURCE {number}:** {source.get('title', 'No title')}")
+            parts.append(f"**URL:** {source.get('url', 'No URL')}")
+            parts.append(f"**CONTENT:** {' ... '.join(passages)}")
+            parts.append("-" * 30)
+        
+        return {
+            'text': "\n".join(parts),
+            'sources_in': sum(len(response.get('results') or []) for response in responses),
+            'sources_kept': len(sources),
+            'sources_used': len(selected),
+            'estimated_tokens': used_tokens
+        }
+    
+    def _source_text(self, result: dict) -> str:
+        return result.get('raw_content') or result.get('content') or ''
+    
+    def _rank_passages(self, query: str, sources: list) -> list:
+        candidates = []
+        for source_index, source in enumerate(sources):
+            for passage_index, passage in enumerate(self.passages(source)):
+                candidates.append((source_index, passage_index, passage, Counter(tokenize(passage))))
+        
+        if not candidates:
+            return []
+        
+        # BM25 with the usual k1/b defaults
+        k1, b = 1.5, 0.75
+        query_terms = set(tokenize(query))
+        average_length = sum(sum(terms.values()) for *_, terms in candidates) / len(candidates) or 1
+        document_frequency = Counter(term for *_, terms in candidates for term in query_terms if term in terms)
+        
+        ranked = []
+        for source_index, passage_index, passage, terms in candidates:
+            length = sum(terms.values())
+            score = 0.0
+            for term in query_terms:
+                frequency = terms.get(term, 0)
+                if not frequency:
+                    continue
+                idf = math.log(1 + (len(candidates) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+                score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * length / average_length))
+            
+            # Tavily's own relevance score and the search snippet break ties
+            score += float(sources[source_index].get('score') or 0)
+            if passage_index == 0:
+                score += 0.5
+            ranked.append((score, source_index, passage_index, passage))
+        
+        ranked.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return ranked
@@ -0,0 +1,206 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from .config import Config
+from .context import tokenize, normalize_url
+
+class SourceCorpus:
+    """Persistent store of fetched Tavily results with an incremental BM25 inverted index.
+    
+    Documents are keyed by normalized URL; re-adding a URL replaces its
+    postings, so the index is updated in place as jobs finish instead of
+    being rebuilt.
+    """
+    
+    K1 = 1.5
+    B = 0.75
+    
+    def __init__(self, path: str, max_age: float = 7 * 24 * 3600, max_indexed_words: int = 2000):
+        self.path = path
+        self.max_age = max_age
+        self.max_indexed_words = max_indexed_words
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id INTEGER PRIMARY KEY,
+                url_key TEXT UNIQUE NOT NULL,
+                url TEXT NOT NULL,
+                title TEXT,
+                content TEXT,
+                raw_content TEXT,
+                published_date TEXT,
+                length INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_doc_id ON postings (doc_id);
+        """)
+        self._conn.commit()
+    
+    def add_responses(self, responses: list) -> int:
+        """Index the web results of the given Tavily responses; returns the number of documents written"""
+        # Results served from the corpus itself lead the list and must not
+        # have their fetch time refreshed
+        results = [
+            result
+            for response in responses
+            for result in (response.get('results') or [])[response.get('corpus_results', 0):]
+        ]
+        return self.add_results(results)
+    
+    def add_results(self, results: list) -> int:
+        now = time.time()
+        written = 0
+        
+        with self._lock:
+            for result in results:
+                url_key = normalize_url(result.get('url'))
+                if not url_key:
+                    continue
+                
+                text = ' '.join(filter(None, [result.get('title'), result.get('content'), result.get('raw_content')]))
+                terms = Counter(tokenize(text)[:self.max_indexed_words])
+                
+                row = self._conn.execute("SELECT doc_id FROM documents WHERE url_key = ?", (url_key,)).fetchone()
+                if row is not None:
+                    doc_id = row[0]
+                    self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+                    self._conn.execute(
+                        """UPDATE documents SET url = ?, title = ?, content = ?, raw_content = ?,
+                           published_date = ?, length = ?, fetched_at = ? WHERE doc_id = ?""",
+                        (result.get('url'), result.get('title'), result.get('content'), result.get('raw_content'),
+                         result.get('published_date'), sum(terms.values()), now, doc_id)
+                    )
+                else:
+                    doc_id = self._conn.execute(
+                        """INSERT INTO documents (url_key, url, title, content, raw_content, published_date, length, fetched_at)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (url_key, result.get('url'), result.get('title'), result.get('content'), result.get('raw_content'),
+                         result.get('published_date'), sum(terms.values()), now)
+                    ).lastrowid
+                
+                self._conn.executemany(
+                    "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    [(term, doc_id, tf) for term, tf in terms.items()]
+                )
+                written += 1
+            
+            self._prune(now)
+            self._conn.commit()
+        
+        return written
+    
+    def search(self, query: str, k: int = 10, domains: list = None, min_score: float = 0.0) -> list:
+        """BM25 search over fresh documents.
+        
+        Scores are normalized by the best score the query could reach, so
+        ``min_score`` is a fraction between 0 and 1. Returns ``(score, result)``
+        pairs with results shaped like Tavily's.
+        """
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return []
+        
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            doc_count, total_length = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents WHERE fetched_at >= ?", (cutoff,)
+            ).fetchone()
+            if not doc_count:
+                return []
+            average_length = total_length / doc_count or 1
+            
+            scores = {}
+            max_score = 0.0
+            lengths = {}
+            for term in query_terms:
+                postings = self._conn.execute(
+                    """SELECT p.doc_id, p.tf, d.length FROM postings p JOIN documents d ON d.doc_id = p.doc_id
+                       WHERE p.term = ? AND d.fetched_at >= ?""",
+                    (term, cutoff)
+                ).fetchall()
+                
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                max_score += idf * (self.K1 + 1)
+                for doc_id, tf, length in postings:
+                    lengths[doc_id] = length
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.K1 + 1) / (
+                        tf + self.K1 * (1 - self.B + self.B * length / average_length)
+                    )
+            
+            ranked = sorted(
+                ((score / max_score, doc_id) for doc_id, score in scores.items() if score / max_score >= min_score),
+                reverse=True
+            )
+            
+            domains = [domain.lower() for domain in domains or []]
+            hits = []
+            for score, doc_id in ranked:
+                url, title, content, raw_content, published_date = self._conn.execute(
+                    "SELECT url, title, content, raw_content, published_date FROM documents WHERE doc_id = ?",
+                    (doc_id,)
+                ).fetchone()
+                
+                host = normalize_url(url).split('/')[0].split(':')[0]
+                if domains and not any(host == domain or host.endswith('.' + domain) for domain in domains):
+                    continue
+                
+                hits.append((score, {
+                    'title': title,
+                    'url': url,
+                    'content': content,
+                    'raw_content': raw_content,
+                    'published_date': published_date,
+                    'score': score
+                }))
+                if len(hits) >= k:
+                    break
+        
+        return hits
+    
+    def stats(self) -> dict:
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            terms = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {'path': self.path, 'documents': documents, 'terms': terms}
+    
+    def _prune(self, now: float):
+        stale = "SELECT doc_id FROM documents WHERE fetched_at < ?"
+        self._conn.execute(f"DELETE FROM postings WHERE doc_id IN ({stale})", (now - self.max_age,))
+        self._conn.execute("DELETE FROM documents WHERE fetched_at < ?", (now - self.max_age,))
+
+_corpus = None
+_corpus_lock = threading.Lock()
+
+def get_corpus():
+    """Process-wide source corpus, or None when CORPUS_ENABLED is off"""
+    global _corpus
+    
+    if not Config.CORPUS_ENABLED:
+        return None
+    
+    if _corpus is None:
+        with _corpus_lock:
+            if _corpus is None:
+                _corpus = SourceCorpus(
+                    Config.CORPUS_PATH,
+                    max_age=Config.CORPUS_MAX_AGE_DAYS * 24 * 3600,
+                    max_indexed_words=Config.CORPUS_MAX_INDEXED_WORDS
+                )
+    
+    return _corpus
@@ -0,0 +1,24 @@
+import asyncio
+import threading
+
+class EventLoopThread:
+    """An asyncio event loop running forever on a daemon thread.
+    
+    Other threads schedule coroutines on ``loop``, e.g. with
+    ``asyncio.run_coroutine_threadsafe``; thousands of them can wait on the
+    network at once without a thread each.
+    """
+    
+    def __init__(self, name: str = 'event-loop'):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: float = 5):
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+    
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
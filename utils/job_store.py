@@ -0,0 +1,236 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+FINISHED_STATUSES = ('completed', 'error', 'cancelled')
+# Fields only live readers in this process need, e.g. the report streamed so
+# far; rewriting the whole job on each of their updates grows quadratically
+TRANSIENT_FIELDS = ('partial_result',)
+
+class JobStore:
+    """Thread-safe store for research job state.
+    
+    Active jobs are always kept in memory. Finished jobs are evicted least
+    recently used first once there are more than ``max_finished`` of them,
+    their results exceed ``max_result_bytes``, or they are older than
+    ``finished_ttl`` seconds. With a SQLite ``path`` every state change but
+    the TRANSIENT_FIELDS is also written to disk, so evicted jobs and jobs
+    from before a restart can still be loaded.
+    """
+    
+    def __init__(self, max_finished: int = 200, max_result_bytes: int = 50 * 1024 * 1024,
+                 finished_ttl: float = 24 * 3600, stale_after: float = 900, path: str = None):
+        self.max_finished = max_finished
+        self.max_result_bytes = max_result_bytes
+        self.finished_ttl = finished_ttl
+        self.stale_after = stale_after
+        self.path = path
+        
+        self._jobs = {}
+        self._finished = OrderedDict()  # research_id -> result size, in LRU order
+        self._finished_bytes = 0
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._conn = None
+        
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    research_id TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+    
+    @staticmethod
+    def new_id() -> str:
+        return f"research_{uuid.uuid4().hex}"
+    
+    def create(self, query: str, **fields) -> str:
+        research_id = self.new_id()
+        job = {
+            'status': 'queued',
+            'progress': 0,
+            'message': '',
+            'query': query,
+            'result': None,
+            'error': None,
+            'created_at': time.time(),
+            'version': 0
+        }
+        job.update(fields)
+        
+        with self._lock:
+            self._jobs[research_id] = job
+            self._persist(research_id, job)
+        
+        return research_id
+    
+    def get(self, research_id: str):
+        """Return a snapshot of the job state, or None for unknown IDs"""
+        with self._lock:
+            job = self._jobs.get(research_id)
+            if job is None:
+                job = self._load(research_id)
+                if job is None:
+                    return None
+            
+            if research_id in self._finished:
+                self._finished.move_to_end(research_id)
+            
+            return dict(job)
+    
+    def update(self, research_id: str, fields: dict):
+        with self._lock:
+            job = self._jobs.get(research_id)
+            if job is None:
+                job = self._load(research_id)
+                if job is None:
+                    raise KeyError(research_id)
+                self._jobs[research_id] = job
+            
+            job.update(fields)
+            job['updated_at'] = time.time()
+            job['version'] = job.get('version', 0) + 1
+            
+            if job['status'] in FINISHED_STATUSES:
+                job.setdefault('finished_at', job['updated_at'])
+                self._track_finished(research_id, job)
+            elif research_id in self._finished:
+                # A finished job running again (a refresh) is active until it finishes anew
+                self._finished_bytes -= self._finished.pop(research_id)
+                job.pop('finished_at', None)
+            
+            if not set(fields) <= set(TRANSIENT_FIELDS):
+                self._persist(research_id, job)
+            self._evict()
+            self._changed.notify_all()
+    
+    def wait_for_change(self, research_id: str, since_version: int, timeout: float):
+        """Block until the job moves past ``since_version`` or the timeout expires.
+        
+        Returns the latest snapshot either way, or None once the job is gone.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self.get(research_id)
+                if job is None or job.get('version', 0) > since_version:
+                    return job
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return job
+                self._changed.wait(remaining)
+    
+    def delete(self, research_id: str):
+        with self._lock:
+            self._jobs.pop(research_id, None)
+            self._finished_bytes -= self._finished.pop(research_id, 0)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM jobs WHERE research_id = ?", (research_id,))
+                self._conn.commit()
+            self._changed.notify_all()
+    
+    def __contains__(self, research_id: str) -> bool:
+        return self.get(research_id) is not None
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'jobs_in_memory': len(self._jobs),
+                'finished_in_memory': len(self._finished),
+                'result_bytes': self._finished_bytes,
+                'persistent': self._conn is not None
+            }
+    
+    def _track_finished(self, research_id: str, job: dict):
+        size = len(job.get('result') or '')
+        self._finished_bytes += size - self._finished.get(research_id, 0)
+        self._finished[research_id] = size
+        self._finished.move_to_end(research_id)
+    
+    def _evict(self):
+        now = time.time()
+        expired = [
+            research_id for research_id in self._finished
+            if now - self._jobs[research_id]['finished_at'] > self.finished_ttl
+        ]
+        for research_id in expired:
+            self._drop(research_id)
+        
+        while self._finished and (
+            len(self._finished) > self.max_finished or self._finished_bytes > self.max_result_bytes
+        ):
+            self._drop(next(iter(self._finished)))
+        
+        if expired and self._conn is not None:
+            # Only finished jobs expire; a queued job may just not have been updated for a while
+            self._conn.execute(
+                f"DELETE FROM jobs WHERE updated_at < ? AND json_extract(data, '$.status') IN "
+                f"({', '.join('?' * len(FINISHED_STATUSES))})",
+                (now - self.finished_ttl, *FINISHED_STATUSES)
+            )
+            self._conn.commit()
+    
+    def _drop(self, research_id: str):
+        # Only the in-memory copy goes away, a persisted copy can still be loaded
+        self._finished_bytes -= self._finished.pop(research_id, 0)
+        self._jobs.pop(research_id, None)
+    
+    def _persist(self, research_id: str, job: dict):
+        if self._conn is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs (research_id, data, updated_at) VALUES (?, ?, ?)",
+            (research_id, json.dumps({k: v for k, v in job.items() if k not in TRANSIENT_FIELDS}, default=str),
+             time.time())
+        )
+        self._conn.commit()
+    
+    def _load(self, research_id: str):
+        if self._conn is None:
+            return None
+        
+        row = self._conn.execute(
+            "SELECT data FROM jobs WHERE research_id = ?", (research_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        
+        job = json.loads(row[0])
+        if job['status'] not in FINISHED_STATUSES:
+            if time.time() - job.get('updated_at', job['created_at']) < self.stale_after:
+                # Still owned by another worker process, hand out a read-only snapshot
+                return job
+            
+            # The worker that owned this job went away without finishing it;
+            # an interrupted refresh still has the previous report
+            job.update({
+                'status': 'completed',
+                'progress': 100,
+                'message': 'Refresh was interrupted by a server restart, showing the previous report',
+                'refreshing': False,
+                'finished_at': time.time()
+            } if job.get('refreshing') else {
+                'status': 'error',
+                'progress': 0,
+                'message': 'Research was interrupted by a server restart',
+                'error': 'Research was interrupted by a server restart',
+                'finished_at': time.time()
+            })
+            self._persist(research_id, job)
+        
+        self._jobs[research_id] = job
+        self._track_finished(research_id, job)
+        return job
@@ -0,0 +1,133 @@
+import asyncio
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+from .cache import make_cache_key
+from .context import estimate_tokens
+
+def _render(prompt) -> str:
+    return prompt.to_string() if hasattr(prompt, 'to_string') else str(prompt)
+
+def _total_tokens(message) -> int:
+    usage = getattr(message, 'usage_metadata', None) or {}
+    return usage.get('total_tokens', 0)
+
+class CachedChatModel(Runnable):
+    """Memoizes chat model completions keyed on the model settings and the rendered prompt.
+    
+    Drop-in replacement for the wrapped model inside a ``prompt | llm | parser`` chain.
+    Calls that reach the model, but not cache hits, go through ``limiter``
+    (a ProviderLimiter) for rate limiting and retries.
+    """
+    
+    def __init__(self, llm, cache=None, bypass: bool = False, limiter=None):
+        self.llm = llm
+        self.cache = cache
+        self.bypass = bypass
+        self.limiter = limiter
+    
+    @property
+    def enabled(self) -> bool:
+        return self.cache is not None and not self.bypass
+    
+    def _cache_key(self, prompt) -> str:
+        # The prompt goes into the params so it is hashed verbatim, not normalized
+        return make_cache_key(
+            "llm",
+            "",
+            model=getattr(self.llm, 'model_name', None),
+            temperature=getattr(self.llm, 'temperature', None),
+            max_tokens=getattr(self.llm, 'max_tokens', None),
+            prompt=_render(prompt)
+        )
+    
+    def _lookup(self, prompt) -> tuple:
+        """``(cache_key, cached_entry)``; the async paths run it in a thread, off the event loop"""
+        cache_key = self._cache_key(prompt)
+        return cache_key, self.cache.get(cache_key)
+    
+    def _invoke(self, input, config, **kwargs):
+        if self.limiter is None:
+            return self.llm.invoke(input, config, **kwargs)
+        return self.limiter.call(
+            self.llm.invoke, input, config,
+            tokens=estimate_tokens(_render(input)), usage=_total_tokens, **kwargs
+        )
+    
+    async def _ainvoke(self, input, config, **kwargs):
+        if self.limiter is None:
+            return await self.llm.ainvoke(input, config, **kwargs)
+        return await self.limiter.acall(
+            self.llm.ainvoke, input, config,
+            tokens=estimate_tokens(_render(input)), usage=_total_tokens, **kwargs
+        )
+    
+    def _stream(self, input, config, **kwargs):
+        if self.limiter is None:
+            return self.llm.stream(input, config, **kwargs)
+        return self.limiter.stream(self.llm.stream, input, config, tokens=estimate_tokens(_render(input)), **kwargs)
+    
+    def _astream(self, input, config, **kwargs):
+        if self.limiter is None:
+            return self.llm.astream(input, config, **kwargs)
+        return self.limiter.astream(self.llm.astream, input, config, tokens=estimate_tokens(_render(input)), **kwargs)
+    
+    def invoke(self, input, config=None, **kwargs):
+        if not self.enabled:
+            return self._invoke(input, config, **kwargs)
+        
+        cache_key, cached = self._lookup(input)
+        if cached is not None:
+            return AIMessage(content=cached['content'])
+        
+        message = self._invoke(input, config, **kwargs)
+        self.cache.set(cache_key, {'content': message.content})
+        return message
+    
+    async def ainvoke(self, input, config=None, **kwargs):
+        if not self.enabled:
+            return await self._ainvoke(input, config, **kwargs)
+        
+        # Hashing the prompt and the SQLite round trip would stall every job on the loop
+        cache_key, cached = await asyncio.to_thread(self._lookup, input)
+        if cached is not None:
+            return AIMessage(content=cached['content'])
+        
+        message = await self._ainvoke(input, config, **kwargs)
+        await asyncio.to_thread(self.cache.set, cache_key, {'content': message.content})
+        return message
+    
+    def stream(self, input, config=None, **kwargs):
+        if not self.enabled:
+            yield from self._stream(input, config, **kwargs)
+            return
+        
+        cache_key, cached = self._lookup(input)
+        if cached is not None:
+            yield AIMessageChunk(content=cached['content'])
+            return
+        
+        parts = []
+        for chunk in self._stream(input, config, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        
+        # Only completed streams are cached, an interrupted one is simply dropped
+        self.cache.set(cache_key, {'content': ''.join(parts)})
+    
+    async def astream(self, input, config=None, **kwargs):
+        if not self.enabled:
+            async for chunk in self._astream(input, config, **kwargs):
+                yield chunk
+            return
+        
+        cache_key, cached = await asyncio.to_thread(self._lookup, input)
+        if cached is not None:
+            yield AIMessageChunk(content=cached['content'])
+            return
+        
+        parts = []
+        async for chunk in self._astream(input, config, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        
+        await asyncio.to_thread(self.cache.set, cache_key, {'content': ''.join(parts)})
@@ -0,0 +1,159 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+from html import escape
+
+# Tags are dropped before parsing. Excluding '<' from the body keeps an
+# unmatched '<' from scanning to the end of the document.
+TAG_RE = re.compile(r'<[^<>]+>')
+HEADING_RE = re.compile(r'(#{1,3}) (.*)')
+BULLET_RE = re.compile(r'[-*] (.*)')
+# Every branch starts with a literal, which lets the regex engine skip
+# plain text without trying each alternative at every position.
+INLINE_RE = re.compile(r'''
+    \*\*(?P<strong>.+?)\*\*
+  | \*(?<!\*\*)(?P<em>[^*\s][^*]*?)\*(?!\*)
+  | `(?P<code>[^`]+)`
+  | \[(?P<label>[^\]]+)\]\((?P<href>https?://[^)\s]+)\)
+  | (?P<url>https?://[^\s<>"{}|\\^`\[\]]+)
+''', re.VERBOSE)
+
+# ``kind`` is 'heading', 'bullet', 'paragraph' or 'blank'; ``level`` is only
+# meaningful for headings. ``inlines`` holds inline nodes:
+#   ('text', str), ('code', str), ('strong', [nodes]), ('em', [nodes]),
+#   ('link', href, [nodes])
+Block = namedtuple('Block', ['kind', 'level', 'inlines'])
+
+def parse_inline(text: str) -> list:
+    # Most report lines carry no inline markup at all
+    if '*' not in text and '`' not in text and '[' not in text and '://' not in text:
+        return [('text', text)]
+    
+    nodes = []
+    position = 0
+    
+    for match in INLINE_RE.finditer(text):
+        if match.start() > position:
+            nodes.append(('text', text[position:match.start()]))
+        
+        kind = match.lastgroup
+        if kind == 'strong' or kind == 'em':
+            nodes.append((kind, parse_inline(match.group(kind))))
+        elif kind == 'code':
+            nodes.append(('code', match.group('code')))
+        elif kind == 'href':
+            nodes.append(('link', match.group('href'), parse_inline(match.group('label'))))
+        else:
+            nodes.append(('link', match.group('url'), [('text', match.group('url'))]))
+        
+        position = match.end()
+    
+    if position < len(text):
+        nodes.append(('text', text[position:]))
+    
+    return nodes
+
+def parse_markdown(text: str) -> list:
+    """Single scan over the lines of a report into a list of Blocks"""
+    blocks = []
+    
+    for line in TAG_RE.sub('', text or '').split('\n'):
+        line = line.strip()
+        
+        if not line:
+            blocks.append(Block('blank', 0, []))
+            continue
+        
+        match = HEADING_RE.match(line)
+        if match:
+            blocks.append(Block('heading', len(match.group(1)), parse_inline(match.group(2))))
+            continue
+        
+        match = BULLET_RE.match(line)
+        if match:
+            blocks.append(Block('bullet', 0, parse_inline(match.group(1).strip())))
+            continue
+        
+        blocks.append(Block('paragraph', 0, parse_inline(line)))
+    
+    return blocks
+
+HTML_HEADINGS = {
+    1: '<h1 class="mt-5 mb-4 text-primary border-bottom pb-2">{}</h1>',
+    2: '<h2 class="mt-4 mb-3 text-primary border-bottom pb-2">{}</h2>',
+    3: '<h3 class="mt-4 mb-3 text-dark">{}</h3>'
+}
+
+def render_inline_html(nodes: list) -> str:
+    parts = []
+    for node in nodes:
+        kind = node[0]
+        if kind == 'text':
+            parts.append(escape(node[1], quote=False))
+        elif kind == 'code':
+            parts.append(f'<code>{escape(node[1], quote=False)}</code>')
+        elif kind == 'strong':
+            parts.append(f'<strong>{render_inline_html(node[1])}</strong>')
+        elif kind == 'em':
+            parts.append(f'<em>{render_inline_html(node[1])}</em>')
+        elif kind == 'link':
+            parts.append(
+                f'<a href="{escape(node[1])}" target="_blank" rel="noopener noreferrer" '
+                f'class="text-decoration-underline">{render_inline_html(node[2])}</a>'
+            )
+    return ''.join(parts)
+
+def render_html(blocks: list) -> str:
+    lines = []
+    in_list = False
+    
+    for block in blocks:
+        if block.kind == 'blank':
+            continue
+        
+        if block.kind == 'bullet':
+            if not in_list:
+                lines.append('<ul class="mb-4 ps-4">')
+                in_list = True
+            lines.append(f'<li class="mb-2">{render_inline_html(block.inlines)}</li>')
+            continue
+        
+        if in_list:
+            lines.append('</ul>')
+            in_list = False
+        
+        if block.kind == 'heading':
+            lines.append(HTML_HEADINGS[block.level].format(render_inline_html(block.inlines)))
+        else:
+            lines.append(f'<p class="mb-3 lh-lg">{render_inline_html(block.inlines)}</p>')
+    
+    if in_list:
+        lines.append('</ul>')
+    
+    return '\n'.join(lines)
+
+def markdown_chunk_to_html(text: str) -> str:
+    """Parse and render without caching, for text seen once such as a streamed report chunk"""
+    return render_html(parse_markdown(text))
+
+@lru_cache(maxsize=32)
+def markdown_to_html(text: str) -> str:
+    """Parse and render in one call; repeated renders of a report hit the cache"""
+    return markdown_chunk_to_html(text)
+
+def render_inline_reportlab(nodes: list) -> str:
+    """Inline nodes in ReportLab's paragraph markup"""
+    parts = []
+    for node in nodes:
+        kind = node[0]
+        if kind == 'text':
+            parts.append(escape(node[1], quote=False))
+        elif kind == 'code':
+            parts.append(f'<font name="Courier">{escape(node[1], quote=False)}</font>')
+        elif kind == 'strong':
+            parts.append(f'<b>{render_inline_reportlab(node[1])}</b>')
+        elif kind == 'em':
+            parts.append(f'<i>{render_inline_reportlab(node[1])}</i>')
+        elif kind == 'link':
+            parts.append(f'<link href="{escape(node[1])}">{render_inline_reportlab(node[2])}</link>')
+    return ''.join(parts)
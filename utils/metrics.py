@@ -0,0 +1,196 @@
+import threading
+import time
+from contextlib import contextmanager
+from .config import Config
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+COST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """USD at Config.GROQ_PRICES list prices; models without a price count as free"""
+    prompt_price, completion_price = Config.GROQ_PRICES.get(model, (0, 0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus exposition format"""
+    
+    def __init__(self, name: str, help_text: str, buckets: tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # sorted label items -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{self.name}_bucket{_labels(key, le=bound)} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_labels(key, le='+Inf')} {count}")
+                lines.append(f"{self.name}_sum{_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_labels(key)} {count}")
+        
+        return lines
+
+def _labels(key: tuple, **extra) -> str:
+    items = list(key) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in items) + "}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            'research_stage_duration_seconds',
+            'Wall time per research stage',
+            LATENCY_BUCKETS
+        )
+        self.llm_tokens = Histogram(
+            'research_llm_tokens',
+            'Prompt and completion tokens per LLM call',
+            TOKEN_BUCKETS
+        )
+        self.context_bytes = Histogram(
+            'research_context_bytes',
+            'Bytes of context passed into each stage',
+            BYTES_BUCKETS
+        )
+        self.job_seconds = Histogram(
+            'research_job_duration_seconds',
+            'Wall time of each completed job, from dispatch to report, per pipeline profile',
+            LATENCY_BUCKETS
+        )
+        self.job_cost = Histogram(
+            'research_job_cost_usd',
+            'Estimated Groq cost of each completed job per pipeline profile',
+            COST_BUCKETS
+        )
+    
+    def render(self) -> str:
+        lines = []
+        for histogram in (self.stage_seconds, self.llm_tokens, self.context_bytes, self.job_seconds, self.job_cost):
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+class JobMetrics:
+    """Per-job stage timings, token counts and context sizes, also fed into the registry"""
+    
+    def __init__(self, registry: MetricsRegistry, profile: str = None):
+        self.registry = registry
+        self.profile = profile
+        self.stage_seconds = {}
+        self.tokens = {}
+        self.cost = {}
+        self.context_bytes = {}
+        self.errors = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_time(stage, time.perf_counter() - started)
+    
+    def record_time(self, stage: str, seconds: float):
+        self.registry.stage_seconds.observe(seconds, stage=stage)
+        with self._lock:
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0) + seconds
+    
+    def add_tokens(self, stage: str, prompt_tokens: int, completion_tokens: int, model: str = None):
+        self.registry.llm_tokens.observe(prompt_tokens, stage=stage, kind='prompt')
+        self.registry.llm_tokens.observe(completion_tokens, stage=stage, kind='completion')
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            usage = self.tokens.setdefault(stage, {'prompt': 0, 'completion': 0})
+            usage['prompt'] += prompt_tokens
+            usage['completion'] += completion_tokens
+            self.cost[stage] = self.cost.get(stage, 0) + cost
+    
+    def add_context(self, stage: str, *texts):
+        size = sum(len(text.encode('utf-8')) for text in texts if text)
+        self.registry.context_bytes.observe(size, stage=stage)
+        with self._lock:
+            self.context_bytes[stage] = self.context_bytes.get(stage, 0) + size
+    
+    def record_error(self, stage: str, message: str):
+        """Keep a failure that did not abort the job, e.g. a targeted search that gave up"""
+        with self._lock:
+            self.errors.append({'stage': stage, 'error': message})
+    
+    def llm_config(self, stage: str) -> dict:
+        """Runnable config whose callback counts the tokens of every LLM call in the chain"""
+        from .agents import TokenUsageCallback
+        return {'callbacks': [TokenUsageCallback(self, stage)]}
+    
+    def finish(self):
+        """Record the completed job's wall time and cost under its pipeline profile"""
+        with self._lock:
+            cost = sum(self.cost.values())
+        self.registry.job_seconds.observe(time.perf_counter() - self.started, profile=self.profile)
+        self.registry.job_cost.observe(cost, profile=self.profile)
+    
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                'profile': self.profile,
+                'stage_seconds': {stage: round(seconds, 3) for stage, seconds in self.stage_seconds.items()},
+                'tokens': {stage: dict(usage) for stage, usage in self.tokens.items()},
+                'cost_usd': {stage: round(cost, 6) for stage, cost in self.cost.items()},
+                'total_cost_usd': round(sum(self.cost.values()), 6),
+                'context_bytes': dict(self.context_bytes),
+                'errors': list(self.errors)
+            }
+
+class NullJobMetrics:
+    """Drop-in JobMetrics that records nothing, used when METRICS_ENABLED is off"""
+    
+    @contextmanager
+    def timed(self, stage: str):
+        yield
+    
+    def record_time(self, stage: str, seconds: float):
+        pass
+    
+    def add_tokens(self, stage: str, prompt_tokens: int, completion_tokens: int, model: str = None):
+        pass
+    
+    def add_context(self, stage: str, *texts):
+        pass
+    
+    def record_error(self, stage: str, message: str):
+        pass
+    
+    def llm_config(self, stage: str) -> dict:
+        return {}
+    
+    def finish(self):
+        pass
+    
+    def as_dict(self) -> dict:
+        return {}
+
+metrics_registry = MetricsRegistry()
+NULL_JOB_METRICS = NullJobMetrics()
+
+def new_job_metrics(profile: str = None):
+    return JobMetrics(metrics_registry, profile) if Config.METRICS_ENABLED else NULL_JOB_METRICS
@@ -0,0 +1,180 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+class Stage:
+    """One node of a pipeline; ``func`` receives a dict of its dependencies' outputs"""
+    
+    def __init__(self, name: str, func, depends_on: tuple = (), on_start=None):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.on_start = on_start
+
+class PipelineExecutor:
+    """Runs a DAG of stages, starting each one as soon as its dependencies finish.
+    
+    Independent stages run concurrently, at most ``max_concurrency`` at a time.
+    Start and end times of every stage are recorded so the critical path, the
+    chain of stages that determined the total latency, can be reported.
+    """
+    
+    def __init__(self, stages: list, max_concurrency: int = 3, cancel_check=None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_concurrency = max_concurrency
+        self.cancel_check = cancel_check
+        self.timings = {}
+        self._validate()
+    
+    def _validate(self):
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+        
+        # Kahn's algorithm; anything left over is part of a cycle
+        remaining = {name: set(stage.depends_on) for name, stage in self.stages.items()}
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle between: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+    
+    def run(self) -> dict:
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        start = time.monotonic()
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="pipeline")
+        try:
+            while pending or running:
+                if self.cancel_check is not None:
+                    self.cancel_check()
+                
+                # Declaration order breaks ties, so earlier stages start first
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dependency in results for dependency in stage.depends_on)
+                ]
+                for stage in ready[:self.max_concurrency - len(running)]:
+                    del pending[stage.name]
+                    inputs = {dependency: results[dependency] for dependency in stage.depends_on}
+                    running[executor.submit(self._run_stage, stage, inputs)] = stage
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    results[stage.name] = future.result()
+        finally:
+            # On failure or cancellation, do not wait for stages still in flight
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.total_time = time.monotonic() - start
+        return results
+    
+    async def arun(self) -> dict:
+        """``run`` on the current event loop.
+        
+        Coroutine stage functions are awaited; plain ones, e.g. CPU-bound
+        context building, run in the loop's default thread pool.
+        """
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        start = time.monotonic()
+        
+        try:
+            while pending or running:
+                if self.cancel_check is not None:
+                    self.cancel_check()
+                
+                ready = [
+                    stage for stage in pending.values()
+                    if all(dependency in results for dependency in stage.depends_on)
+                ]
+                for stage in ready[:self.max_concurrency - len(running)]:
+                    del pending[stage.name]
+                    inputs = {dependency: results[dependency] for dependency in stage.depends_on}
+                    running[asyncio.ensure_future(self._arun_stage(stage, inputs))] = stage
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    results[stage.name] = task.result()
+        finally:
+            for task in running:
+                task.cancel()
+        
+        self.total_time = time.monotonic() - start
+        return results
+    
+    async def _arun_stage(self, stage: Stage, inputs: dict):
+        if not asyncio.iscoroutinefunction(stage.func):
+            return await asyncio.to_thread(self._run_stage, stage, inputs)
+        
+        started = time.monotonic()
+        if stage.on_start is not None:
+            stage.on_start()
+        try:
+            return await stage.func(inputs)
+        finally:
+            self.timings[stage.name] = (started, time.monotonic())
+    
+    def _run_stage(self, stage: Stage, inputs: dict):
+        started = time.monotonic()
+        if stage.on_start is not None:
+            stage.on_start()
+        try:
+            return stage.func(inputs)
+        finally:
+            self.timings[stage.name] = (started, time.monotonic())
+    
+    def critical_path(self) -> list:
+        """Stage names on the longest dependency chain, in execution order"""
+        if not self.timings:
+            return []
+        
+        # Walk back from the stage that finished last through the dependency that finished last
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while self.stages[name].depends_on:
+            name = max(self.stages[name].depends_on, key=lambda n: self.timings[n][1])
+            path.append(name)
+        
+        return list(reversed(path))
+    
+    def report(self) -> dict:
+        critical_path = self.critical_path()
+        return {
+            'stage_seconds': {
+                name: round(end - started, 3)
+                for name, (started, end) in self.timings.items()
+            },
+            'critical_path': critical_path,
+            'critical_path_seconds': round(sum(
+                self.timings[name][1] - self.timings[name][0] for name in critical_path
+            ), 3),
+            'total_seconds': round(getattr(self, 'total_time', 0), 3)
+        }
+
+def split_markdown_sections(text: str) -> list:
+    """Split Markdown into (heading, body) pairs at level-2 headings"""
+    sections = []
+    heading, body = None, []
+    
+    for line in text.split('\n'):
+        if line.startswith('## '):
+            if heading is not None or any(part.strip() for part in body):
+                sections.append((heading, '\n'.join(body).strip()))
+            heading, body = line[3:].strip(), []
+        else:
+            body.append(line)
+    
+    if heading is not None or any(part.strip() for part in body):
+        sections.append((heading, '\n'.join(body).strip()))
+    
+    return sections
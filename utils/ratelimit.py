@@ -0,0 +1,396 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from .config import Config
+
+@lru_cache(maxsize=None)
+def provider_errors() -> tuple:
+    """``(throttle_errors, transient_errors)`` exception classes of the provider SDKs.
+    
+    Imported on the first failure rather than with this module, which the
+    app loads at startup for its limiter stats.
+    """
+    import requests
+    from groq import APIConnectionError, APITimeoutError, RateLimitError
+    from tavily.errors import TimeoutError as TavilyTimeoutError, UsageLimitExceededError
+    
+    # Errors that mean "slow down" even when they carry no HTTP status
+    throttle_errors = (RateLimitError, UsageLimitExceededError)
+    # Errors worth retrying as they are
+    transient_errors = (
+        APIConnectionError, APITimeoutError, TavilyTimeoutError,
+        requests.ConnectionError, requests.Timeout, TimeoutError, ConnectionError
+    )
+    return throttle_errors, transient_errors
+
+class RateLimiter:
+    """Token bucket that admits ``rate_per_minute`` calls on average and bursts of up to ``burst``.
+    
+    Callers reserve a slot and sleep until it comes up, so waiting callers
+    are admitted in arrival order and the limit is used back to back. A
+    rate of 0 disables limiting.
+    """
+    
+    def __init__(self, rate_per_minute: float = 0, burst: int = 1):
+        self.rate_per_minute = rate_per_minute
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+    
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_minute > 0
+    
+    def reserve(self, amount: float = 1) -> float:
+        """Take ``amount`` tokens now and return how long the caller must wait before using them"""
+        if not self.enabled:
+            return 0.0
+        
+        rate = self.rate_per_minute / 60.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            
+            # The balance may go negative; later callers queue up behind it
+            self._tokens -= amount
+            delay = max(0.0, -self._tokens / rate)
+            self.acquired += 1
+            self.waited_seconds += delay
+            return delay
+    
+    def acquire(self, amount: float = 1) -> float:
+        delay = self.reserve(amount)
+        if delay:
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self, amount: float = 1) -> float:
+        delay = self.reserve(amount)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'rate_per_minute': self.rate_per_minute,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'waited_seconds': round(self.waited_seconds, 3)
+            }
+
+def _status_code(exc):
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(exc, 'response', None), 'status_code', None)
+    return status
+
+def _retry_after(exc):
+    """Seconds from a Retry-After header (delta or HTTP date), if the error carries one"""
+    headers = getattr(getattr(exc, 'response', None), 'headers', None)
+    value = headers.get('retry-after') if headers is not None else None
+    if not value:
+        return None
+    
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def classify_error(exc) -> tuple:
+    """``(retryable, throttled, retry_after)`` for a provider error.
+    
+    Throttling (429, 503, provider quota errors) also shrinks the
+    concurrency limit; timeouts, connection errors and other 5xx are only
+    retried.
+    """
+    throttle_errors, transient_errors = provider_errors()
+    status = _status_code(exc)
+    if status == 429 or status == 503 or isinstance(exc, throttle_errors):
+        return True, True, _retry_after(exc)
+    if status is not None and status >= 500:
+        return True, False, _retry_after(exc)
+    if isinstance(exc, transient_errors):
+        return True, False, None
+    return False, False, None
+
+def _grant(waiter):
+    # Runs on the waiter's loop; a waiter cancelled meanwhile hands its slot back itself
+    if not waiter.done():
+        waiter.set_result(None)
+
+class AdaptiveConcurrency:
+    """Concurrency limit adjusted by AIMD: +1 per limit's worth of successes, halved on throttling"""
+    
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit)) if max_limit > 0 else 1
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._cond = threading.Condition()
+        self._waiters = deque()  # (loop, future) of coroutines waiting for a slot, in arrival order
+    
+    @property
+    def enabled(self) -> bool:
+        return self.max_limit > 0
+    
+    async def acquire_async(self):
+        """``acquire`` for coroutines: waits on a future that ``release`` resolves, in arrival order"""
+        if not self.enabled:
+            return
+        with self._cond:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            entry = (loop, loop.create_future())
+            self._waiters.append(entry)
+        
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            with self._cond:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                else:
+                    # Granted just as we were cancelled; pass the slot on
+                    self.in_flight -= 1
+                    self._wake()
+            raise
+    
+    def acquire(self):
+        if not self.enabled:
+            return
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+    
+    def release(self, throttled: bool = False):
+        if not self.enabled:
+            return
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._wake()
+    
+    def _wake(self):
+        # Called with the lock held: hand free slots to waiting coroutines first, then to threads
+        while self._waiters and self.in_flight < int(self.limit):
+            loop, waiter = self._waiters.popleft()
+            self.in_flight += 1
+            try:
+                loop.call_soon_threadsafe(_grant, waiter)
+            except RuntimeError:
+                # Its loop is closed, so nobody will use the slot
+                self.in_flight -= 1
+        self._cond.notify_all()
+
+class ProviderLimiter:
+    """Client-side admission control for one API provider.
+    
+    Every call waits on a requests/min bucket, a tokens/min bucket and an
+    AIMD concurrency limit, and is retried with jittered exponential
+    backoff when the provider throttles or fails transiently. A throttled
+    call pauses the whole provider for its Retry-After, so waiting callers
+    do not pile onto the same limit and cascade into more 429s.
+    """
+    
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 max_concurrency: int = 0, request_burst: int = 5, max_retries: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        self.name = name
+        self.requests = RateLimiter(requests_per_minute, request_burst)
+        # Providers refill token budgets continuously up to a minute's worth
+        self.tokens = RateLimiter(tokens_per_minute, int(tokens_per_minute) or 1)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+    
+    def call(self, func, *args, tokens: int = 0, usage=None, **kwargs):
+        """Run ``func(*args, **kwargs)`` under the limits.
+        
+        ``tokens`` is the estimated cost charged up front; ``usage(result)``
+        may return the actual cost, and any excess is charged afterwards.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self._admission_delay(tokens))
+            self.concurrency.acquire()
+            throttled = False
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                delay = self._after_failure(e, attempt, retryable, throttled, retry_after)
+            else:
+                self._after_success(result, tokens, usage)
+                return result
+            finally:
+                self.concurrency.release(throttled=throttled)
+            
+            time.sleep(delay)
+            attempt += 1
+    
+    async def acall(self, func, *args, tokens: int = 0, usage=None, **kwargs):
+        """``call`` for coroutine functions, sleeping without blocking the event loop"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admission_delay(tokens))
+            await self.concurrency.acquire_async()
+            throttled = False
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                delay = self._after_failure(e, attempt, retryable, throttled, retry_after)
+            else:
+                self._after_success(result, tokens, usage)
+                return result
+            finally:
+                self.concurrency.release(throttled=throttled)
+            
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    def stream(self, func, *args, tokens: int = 0, **kwargs):
+        """``call`` for generator functions; only retried if nothing was yielded yet"""
+        attempt = 0
+        while True:
+            time.sleep(self._admission_delay(tokens))
+            self.concurrency.acquire()
+            throttled = False
+            started = False
+            try:
+                for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                delay = self._after_failure(e, attempt, retryable and not started, throttled, retry_after)
+            else:
+                self._after_success(None, tokens, None)
+                return
+            finally:
+                self.concurrency.release(throttled=throttled)
+            
+            time.sleep(delay)
+            attempt += 1
+    
+    async def astream(self, func, *args, tokens: int = 0, **kwargs):
+        """``stream`` for async generator functions"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._admission_delay(tokens))
+            await self.concurrency.acquire_async()
+            throttled = False
+            started = False
+            try:
+                async for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                retryable, throttled, retry_after = classify_error(e)
+                delay = self._after_failure(e, attempt, retryable and not started, throttled, retry_after)
+            else:
+                self._after_success(None, tokens, None)
+                return
+            finally:
+                self.concurrency.release(throttled=throttled)
+            
+            await asyncio.sleep(delay)
+            attempt += 1
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'retries': self.retries,
+                'throttled': self.throttled,
+                'failures': self.failures,
+                'concurrency_limit': round(self.concurrency.limit, 2) if self.concurrency.enabled else None,
+                'in_flight': self.concurrency.in_flight,
+                'requests': self.requests.stats(),
+                'tokens': self.tokens.stats()
+            }
+    
+    def _admission_delay(self, tokens: int) -> float:
+        with self._lock:
+            paused = max(0.0, self._resume_at - time.monotonic())
+        return max(paused, self.requests.reserve(), self.tokens.reserve(tokens) if tokens else 0.0)
+    
+    def _after_success(self, result, tokens: int, usage):
+        with self._lock:
+            self.calls += 1
+        if usage is not None and self.tokens.enabled:
+            actual = usage(result) or 0
+            if actual > tokens:
+                self.tokens.reserve(actual - tokens)
+    
+    def _after_failure(self, exc, attempt: int, retryable: bool, throttled: bool, retry_after) -> float:
+        """Backoff before the next attempt; re-raises when the call should not be retried"""
+        with self._lock:
+            self.calls += 1
+            if throttled:
+                self.throttled += 1
+            if not retryable or attempt >= self.max_retries:
+                self.failures += 1
+                raise exc
+            self.retries += 1
+            
+            if retry_after is not None:
+                delay = retry_after + random.uniform(0, self.base_delay)
+            else:
+                # Full jitter keeps retrying callers from synchronizing
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+            
+            if throttled:
+                self._resume_at = max(self._resume_at, time.monotonic() + delay)
+        
+        print(f"{self.name} call failed ({type(exc).__name__}: {exc}), retry {attempt + 1}/{self.max_retries} in {delay:.2f}s")
+        return delay
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_provider_limiter(name: str) -> ProviderLimiter:
+    """Process-wide limiter for 'groq' or 'tavily', configured from Config"""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            prefix = name.upper()
+            limiter = _limiters[name] = ProviderLimiter(
+                name,
+                requests_per_minute=getattr(Config, f"{prefix}_REQUESTS_PER_MINUTE", 0),
+                tokens_per_minute=getattr(Config, f"{prefix}_TOKENS_PER_MINUTE", 0),
+                max_concurrency=getattr(Config, f"{prefix}_MAX_CONCURRENCY", 0),
+                request_burst=Config.PROVIDER_REQUEST_BURST,
+                max_retries=Config.PROVIDER_MAX_RETRIES,
+                base_delay=Config.PROVIDER_RETRY_BASE_DELAY,
+                max_delay=Config.PROVIDER_RETRY_MAX_DELAY
+            )
+        return limiter
@@ -0,0 +1,149 @@
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from .context import normalize_url
+from .vector_index import VectorIndex
+
+URL_RE = re.compile(r'https?://[^\s<>()\[\]"\']+')
+HEADING_RE = re.compile(r'^(#{1,2})\s+(.*?)\s*#*\s*$')
+
+def since_date(timestamp: float) -> str:
+    """Tavily's ``start_date`` (YYYY-MM-DD, UTC) for content published after ``timestamp``"""
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
+
+def response_urls(responses: list) -> list:
+    """Normalized URLs of every result in ``responses``, in first-seen order"""
+    urls = []
+    for response in responses:
+        for result in response.get('results') or []:
+            url = normalize_url(result.get('url'))
+            if url and url not in urls:
+                urls.append(url)
+    return urls
+
+def report_urls(report: str) -> list:
+    """Normalized URLs cited in a report, for jobs that finished before source URLs were stored"""
+    urls = []
+    for url in URL_RE.findall(report or ''):
+        url = normalize_url(url.rstrip('.,;:'))
+        if url not in urls:
+            urls.append(url)
+    return urls
+
+def published_at(result: dict):
+    """A result's ``published_date`` as an aware datetime, or None when missing or unparsable"""
+    value = (result.get('published_date') or '').strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+def new_results(responses: list, seen_urls, since: str) -> list:
+    """Copies of ``responses`` keeping only results not seen before and not dated before ``since``.
+    
+    Results without a date are kept; the search already asked for content
+    newer than ``since``. Responses left without results are dropped, and so
+    is their answer, which summarized the old results as well.
+    """
+    seen = set(seen_urls)
+    cutoff = datetime.strptime(since, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    
+    delta = []
+    for response in responses:
+        results = []
+        for result in response.get('results') or []:
+            url = normalize_url(result.get('url'))
+            published = published_at(result)
+            if url in seen or (published is not None and published < cutoff):
+                continue
+            seen.add(url)
+            results.append(result)
+        if results:
+            delta.append(dict(response, results=results))
+    return delta
+
+def merge_responses(query: str, responses: list) -> dict:
+    """One response holding the results of all ``responses``, in order"""
+    return {
+        'query': query,
+        'answer': None,
+        'results': [result for response in responses for result in response.get('results') or []]
+    }
+
+def split_report(report: str, section_titles: list) -> list:
+    """Split a report into ``(title, text)`` parts at the headings of its known sections.
+    
+    Only level 1 and 2 headings named like one of ``section_titles`` start a
+    part, so company subsections stay inside theirs; text before the first
+    one has a None title. Joining the texts gives back the report unchanged.
+    """
+    titles = {title.lower(): title for title in section_titles}
+    parts = []
+    title, lines = None, []
+    
+    for line in report.splitlines(keepends=True):
+        match = HEADING_RE.match(line.rstrip('\r\n'))
+        heading = match.group(2).strip('*_ ').lower() if match else None
+        if heading in titles:
+            if title is not None or lines:
+                parts.append((title, ''.join(lines)))
+            title, lines = titles[heading], []
+        lines.append(line)
+    
+    if title is not None or lines:
+        parts.append((title, ''.join(lines)))
+    return parts
+
+def match_sections(parts: list, passages: list, min_score: float, max_sections: int,
+                   exclude: tuple = ()) -> dict:
+    """Assign each new passage to the report section it is most similar to.
+    
+    ``passages`` are ``(text, url)`` pairs. Returns ``{part_index: [passages]}``
+    for at most ``max_sections`` sections, those that drew the most passages
+    scoring at least ``min_score``.
+    """
+    candidates = [index for index, (title, _) in enumerate(parts) if title is not None and title not in exclude]
+    if not candidates or not passages:
+        return {}
+    
+    index = VectorIndex()
+    index.add([parts[i][1] for i in candidates], candidates)
+    
+    assigned = {}
+    for passage in passages:
+        score, part_index = index.search(passage[0], k=1)[0]
+        if score >= min_score:
+            assigned.setdefault(part_index, []).append(passage)
+    
+    chosen = sorted(assigned, key=lambda i: -len(assigned[i]))[:max_sections]
+    return {i: assigned[i] for i in sorted(chosen)}
+
+def format_passages(passages: list) -> str:
+    return "\n".join(f"- {text} ({url})" if url else f"- {text}" for text, url in passages)
+
+def append_references(section: str, sources: list) -> str:
+    """Add new sources to a references section as ``- [title](url) (date)`` lines"""
+    lines = []
+    for source in sources:
+        published = published_at(source)
+        date = f" ({published.strftime('%Y-%m-%d')})" if published else ""
+        lines.append(f"- [{source.get('title') or source['url']}]({source['url']}){date}")
+    
+    # New lines go after the last entry, before the blank lines that end the section
+    body = section.rstrip()
+    return body + "\n" + "\n".join(lines) + (section[len(body):] or "\n")
+
+def keep_heading(original: str, revised: str) -> str:
+    """The revised section under the original heading line, whatever heading the model wrote"""
+    heading = original.split('\n', 1)[0]
+    lines = revised.strip().split('\n')
+    if lines and HEADING_RE.match(lines[0]):
+        lines = lines[1:]
+    body = original.rstrip()
+    return heading + "\n" + "\n".join(lines).strip('\n') + (original[len(body):] or "\n")
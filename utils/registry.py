@@ -0,0 +1,86 @@
+import importlib
+import threading
+from .context import ContextBudgeter
+from .corpus import get_corpus
+from .config import Config
+
+class ProfileChains:
+    """The agent chains of one pipeline profile, each on the model settings the profile gives its agent"""
+    
+    def __init__(self, name: str, agents, profile: dict):
+        self.name = name
+        self.skip_critic = profile['skip_critic']
+        self.models = {agent: settings['model'] for agent, settings in profile['agents'].items()}
+        llms = {agent: agents.chat_model(**settings) for agent, settings in profile['agents'].items()}
+        
+        self.research_agent = agents.setup_research_agent(llms['research'])
+        self.summarizer_agent = agents.setup_summarizer_agent(llms['summarizer'])
+        self.critic_agent = agents.setup_critic_agent(llms['critic'])
+        self.writer_agent = agents.setup_writer_agent(llms['writer'])
+        self.patch_agent = agents.setup_patch_agent(llms['patch'])
+
+class ResearchRegistry:
+    """Pooled API clients and compiled agent chains shared by all research jobs.
+    
+    Chains are stateless runnables, so one instance can serve concurrent jobs.
+    """
+    
+    def __init__(self):
+        load_research_modules()
+        from .agents import ModernResearchAgents
+        from .search import TavilyRetrievalSystem
+        
+        self.agents = ModernResearchAgents()
+        self.retrieval = TavilyRetrievalSystem(
+            self.agents.tavily_api_key, client=self.agents.tavily, corpus=get_corpus(),
+            async_client=self.agents.async_tavily
+        )
+        self.context_budgeter = ContextBudgeter(
+            token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            duplicate_threshold=Config.CONTEXT_DUPLICATE_THRESHOLD
+        )
+        
+        self.profiles = {
+            name: ProfileChains(name, self.agents, profile)
+            for name, profile in Config.PIPELINE_PROFILES.items()
+        }
+    
+    def chains(self, profile: str = None) -> ProfileChains:
+        """Chains of a pipeline profile, by default Config.DEFAULT_PIPELINE_PROFILE"""
+        return self.profiles[profile or Config.DEFAULT_PIPELINE_PROFILE]
+
+# Modules kept off the app's import path (LangChain, Groq, Tavily, numpy,
+# ReportLab); pages, /health and progress polls are served without them
+RESEARCH_MODULES = ('.agents', '.search', '.vector_index', '.refresh', '.report_generator')
+
+_modules_loaded = False
+_modules_lock = threading.Lock()
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def load_research_modules():
+    """Import ``RESEARCH_MODULES`` once; concurrent callers wait for the first.
+    
+    Importing the same packages from two threads at once can fail on their
+    circular imports (e.g. requests), so deferred imports go through here.
+    """
+    global _modules_loaded
+    
+    if not _modules_loaded:
+        with _modules_lock:
+            if not _modules_loaded:
+                for module in RESEARCH_MODULES:
+                    importlib.import_module(module, __package__)
+                _modules_loaded = True
+
+def get_registry() -> ResearchRegistry:
+    """Build the registry on first use; later calls return the same instance"""
+    global _registry
+    
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ResearchRegistry()
+    
+    return _registry
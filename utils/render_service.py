@@ -0,0 +1,109 @@
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+class RenderPending(Exception):
+    """Raised when a background render is still running after the caller stopped waiting"""
+
+class PDFRenderService:
+    """Renders report PDFs in a process pool so ReportLab layout never blocks a request worker.
+    
+    Renders are keyed by research ID. At most ``max_queue`` renders may be
+    pending; ``submit`` returns None beyond that and the caller renders
+    inline. Finished futures are kept for the ``keep_results`` most recent
+    jobs so a download can pick up a render that started at job completion.
+    With ``max_workers=0`` renders run synchronously in the calling thread.
+    """
+    
+    def __init__(self, max_workers: int = 2, max_queue: int = 16, keep_results: int = 50,
+                 start_method: str = 'spawn'):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.keep_results = keep_results
+        self.start_method = start_method
+        
+        self._executor = None
+        self._futures = OrderedDict()  # research_id -> Future, oldest first
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+    
+    def submit(self, research_id: str, report_content: str, query: str):
+        """Start rendering unless a render for this job exists; returns its Future or None when the queue is full"""
+        # ReportLab loads with the first render, in this process and in each worker
+        from .report_generator import render_pdf_bytes
+        
+        with self._lock:
+            future = self._futures.get(research_id)
+            if future is not None:
+                return future
+            
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                return None
+            
+            if self.max_workers <= 0:
+                future = Future()
+            else:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context(self.start_method)
+                    )
+                try:
+                    future = self._executor.submit(render_pdf_bytes, report_content, query)
+                except BrokenProcessPool:
+                    # A crashed worker breaks the whole pool; start a fresh one next time
+                    self._executor = None
+                    return None
+            
+            self._pending += 1
+            self._futures[research_id] = future
+            self._trim()
+        
+        future.add_done_callback(self._on_done)
+        
+        if self.max_workers <= 0:
+            try:
+                future.set_result(render_pdf_bytes(report_content, query))
+            except Exception as e:
+                future.set_exception(e)
+        
+        return future
+    
+    def get(self, research_id: str):
+        with self._lock:
+            return self._futures.get(research_id)
+    
+    def discard(self, research_id: str):
+        with self._lock:
+            future = self._futures.pop(research_id, None)
+        if future is not None:
+            future.cancel()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'workers': self.max_workers,
+                'pending': self._pending,
+                'max_queue': self.max_queue,
+                'results': sum(1 for future in self._futures.values() if future.done()),
+                'rejected': self.rejected
+            }
+    
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _on_done(self, future):
+        with self._lock:
+            self._pending -= 1
+    
+    def _trim(self):
+        finished = [research_id for research_id, future in self._futures.items() if future.done()]
+        for research_id in finished[:max(0, len(self._futures) - self.keep_results)]:
+            del self._futures[research_id]
@@ -1,26 +1,13 @@
 
-import re
+import time
 from datetime import datetime
+from functools import lru_cache
 from io import BytesIO
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer  # CORRECT IMPORT
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-
-def convert_markdown_to_reportlab(text: str) -> str:
-    # Convert **bold** to <b>bold</b>
-    text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-    
-    # Convert *italic* to <i>italic</i>
-    text = re.sub(r'(?<!\*)\*([^*]+?)\*(?!\*)', r'<i>\1</i>', text)
-    
-    # Convert `code` to monospace
-    text = re.sub(r'`(.*?)`', r'<font name="Courier">\1</font>', text)
-    
-    # Handle URLs
-    text = re.sub(r'https?://[^\s<>"{}|\\^`[\]]+', r'<link href="\g<0>">\g<0></link>', text)
-    
-    return text
+from .markdown import parse_markdown, render_inline_reportlab
 
 class EnhancedReportGenerator:
     @staticmethod
@@ -52,93 +39,104 @@ class EnhancedReportGenerator:
     def generate_pdf(report_content: str, query: str) -> BytesIO:
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=1*inch)
-        styles = getSampleStyleSheet()
+        styles = get_pdf_styles()
+        
+        content = []
+        
+        # Header
+        content.append(Paragraph("🔬 AI Research Report", styles['title']))
+        content.append(Paragraph(f"<b>Query:</b> {query}", styles['subtitle']))
+        content.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['subtitle']))
+        content.append(Spacer(1, 0.3*inch))
+        
+        # Process content
+        for block in parse_markdown(report_content):
+            content.extend(BLOCK_FLOWABLES[block.kind](block, styles))
         
-        # Professional styles
-        title_style = ParagraphStyle(
+        doc.build(content)
+        buffer.seek(0)
+        return buffer
+
+# Gap after every block, folded into the styles instead of a Spacer per line
+BLOCK_SPACE = 0.05*inch
+
+@lru_cache(maxsize=1)
+def get_pdf_styles() -> dict:
+    """Report paragraph styles, built once per process"""
+    styles = getSampleStyleSheet()
+    
+    # Professional styles
+    return {
+        'title': ParagraphStyle(
             'CustomTitle',
             parent=styles['Title'],
             fontSize=20,
             textColor='#1e40af',
             spaceAfter=30,
             alignment=1
-        )
-        
-        subtitle_style = ParagraphStyle(
+        ),
+        'subtitle': ParagraphStyle(
             'CustomSubtitle',
             parent=styles['Normal'],
             fontSize=12,
             textColor='#64748b',
             spaceAfter=20,
             alignment=1
-        )
-        
-        heading1_style = ParagraphStyle(
+        ),
+        'heading1': ParagraphStyle(
             'CustomHeading1',
             parent=styles['Heading1'],
             fontSize=16,
             textColor='#1e40af',
             spaceBefore=20,
-            spaceAfter=12
-        )
-        
-        heading2_style = ParagraphStyle(
+            spaceAfter=12 + BLOCK_SPACE
+        ),
+        'heading2': ParagraphStyle(
             'CustomHeading2',
             parent=styles['Heading2'],
             fontSize=14,
             textColor='#1e40af',
             spaceBefore=16,
-            spaceAfter=10
-        )
-        
-        normal_style = ParagraphStyle(
+            spaceAfter=10 + BLOCK_SPACE
+        ),
+        'normal': ParagraphStyle(
             'CustomNormal',
             parent=styles['Normal'],
             fontSize=11,
-            spaceAfter=8
-        )
-        
-        bullet_style = ParagraphStyle(
+            spaceAfter=8 + BLOCK_SPACE
+        ),
+        'bullet': ParagraphStyle(
             'CustomBullet',
             parent=styles['Normal'],
             fontSize=11,
-            spaceAfter=6,
+            spaceAfter=6 + BLOCK_SPACE,
             leftIndent=20
         )
-        
-        content = []
-        
-        # Header
-        content.append(Paragraph("🔬 AI Research Report", title_style))
-        content.append(Paragraph(f"<b>Query:</b> {query}", subtitle_style))
-        content.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", subtitle_style))
-        content.append(Spacer(1, 0.3*inch))
-        
-        # Process content
-        lines = report_content.split('\n')
-        
-        for line in lines:
-            line = line.strip()
-            
-            if not line:
-                content.append(Spacer(1, 0.1*inch))
-                continue
-                
-            processed_line = convert_markdown_to_reportlab(line)
-            
-            if line.startswith('# '):
-                content.append(Paragraph(processed_line[2:], heading1_style))
-            elif line.startswith('## '):
-                content.append(Paragraph(processed_line[3:], heading2_style))
-            elif line.startswith('- ') or line.startswith('* '):
-                bullet_text = processed_line[2:]
-                content.append(Paragraph(f"• {bullet_text}", bullet_style))
-            else:
-                if processed_line:
-                    content.append(Paragraph(processed_line, normal_style))
-            
-            content.append(Spacer(1, 0.05*inch))
-        
-        doc.build(content)
-        buffer.seek(0)
-        return buffer
+    }
+
+def _blank_flowables(block, styles) -> list:
+    return [Spacer(1, 0.1*inch)]
+
+def _heading_flowables(block, styles) -> list:
+    style = styles['heading1'] if block.level == 1 else styles['heading2']
+    return [Paragraph(render_inline_reportlab(block.inlines), style)]
+
+def _bullet_flowables(block, styles) -> list:
+    return [Paragraph(f"• {render_inline_reportlab(block.inlines)}", styles['bullet'])]
+
+def _paragraph_flowables(block, styles) -> list:
+    return [Paragraph(render_inline_reportlab(block.inlines), styles['normal'])]
+
+# One builder per block kind, looked up once per block
+BLOCK_FLOWABLES = {
+    'blank': _blank_flowables,
+    'heading': _heading_flowables,
+    'bullet': _bullet_flowables,
+    'paragraph': _paragraph_flowables
+}
+
+def render_pdf_bytes(report_content: str, query: str) -> tuple:
+    """PDF bytes and render seconds; top-level so a process pool can run it"""
+    started = time.perf_counter()
+    pdf = EnhancedReportGenerator.generate_pdf(report_content, query).getvalue()
+    return pdf, time.perf_counter() - started
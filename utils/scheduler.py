@@ -0,0 +1,269 @@
+import asyncio
+import inspect
+import threading
+import time
+from collections import OrderedDict, deque
+
+class QueueFullError(Exception):
+    """Raised when the scheduler cannot accept another job right now"""
+    
+    def __init__(self, message: str, queue_depth: int):
+        super().__init__(message)
+        self.queue_depth = queue_depth
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation has been requested"""
+
+class ResearchJob:
+    def __init__(self, job_id: str, client_id: str, target, args: tuple):
+        self.job_id = job_id
+        self.client_id = client_id
+        self.target = target
+        self.args = args
+        self.state = 'queued'
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+    
+    @property
+    def wait_time(self) -> float:
+        end = self.started_at if self.started_at is not None else time.time()
+        return round(end - self.submitted_at, 3)
+    
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled(f"Job {self.job_id} was cancelled")
+
+class ResearchScheduler:
+    """Bounded worker pool with a fair, bounded queue for research jobs.
+    
+    Queued jobs are kept per client and dispatched round-robin, so one client
+    submitting a burst cannot starve everyone else.
+    
+    Given an event ``loop``, no worker threads are started: up to
+    ``max_workers`` jobs run as tasks on that loop instead, and targets
+    should be coroutine functions.
+    
+    ``on_cancel(job)`` is called for each queued job that ``shutdown``
+    drops without running it, so the caller can record the cancellation.
+    """
+    
+    def __init__(self, max_workers: int = 4, max_queue: int = 50, max_per_client: int = 5, loop=None,
+                 on_cancel=None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_per_client = max_per_client
+        self.loop = loop
+        self.on_cancel = on_cancel
+        
+        self._queues = OrderedDict()  # client_id -> deque of queued jobs
+        self._jobs = {}  # job_id -> queued or running job
+        self._queued = 0
+        self._running = 0
+        self._accepting = True
+        self._cond = threading.Condition()
+        
+        self._workers = []
+        for i in range(max_workers if loop is None else 0):
+            worker = threading.Thread(target=self._worker_loop, name=f"research-worker-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+    
+    def submit(self, job_id: str, target, *args, client_id: str = 'anonymous', client_limit: int = None) -> ResearchJob:
+        """Queue a job; ``client_limit`` overrides ``max_per_client``, e.g. for a batch's own lane"""
+        with self._cond:
+            if not self._accepting:
+                raise QueueFullError("Scheduler is shutting down", self._queued)
+            
+            if self._queued >= self.max_queue:
+                raise QueueFullError("Research queue is full", self._queued)
+            
+            client_queue = self._queues.get(client_id)
+            client_active = len(client_queue) if client_queue else 0
+            client_active += sum(
+                1 for job in self._jobs.values()
+                if job.client_id == client_id and job.state == 'running'
+            )
+            if client_active >= (self.max_per_client if client_limit is None else client_limit):
+                raise QueueFullError("Too many research jobs for this client", self._queued)
+            
+            job = ResearchJob(job_id, client_id, target, args)
+            self._queues.setdefault(client_id, deque()).append(job)
+            self._jobs[job_id] = job
+            self._queued += 1
+            if self.loop is not None:
+                self._dispatch()
+            else:
+                self._cond.notify()
+            return job
+    
+    def get_job(self, job_id: str):
+        with self._cond:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job or ask a running one to stop at its next checkpoint"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            
+            job.cancel_event.set()
+            if job.state == 'queued':
+                client_queue = self._queues[job.client_id]
+                client_queue.remove(job)
+                if not client_queue:
+                    del self._queues[job.client_id]
+                self._queued -= 1
+                job.state = 'cancelled'
+                job.finished_at = time.time()
+                del self._jobs[job_id]
+            
+            return True
+    
+    def queue_position(self, job_id: str):
+        """1-based dispatch position of a queued job, following the round-robin order"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state != 'queued':
+                return None
+            
+            for position, queued_job in enumerate(self._dispatch_order(), 1):
+                if queued_job is job:
+                    return position
+            return None
+    
+    def job_info(self, job_id: str) -> dict:
+        position = self.queue_position(job_id)
+        with self._cond:
+            job = self._jobs.get(job_id)
+            info = {
+                'queue_depth': self._queued,
+                'running_jobs': self._running
+            }
+            if job is not None:
+                info.update({
+                    'queue_position': position,
+                    'wait_time': job.wait_time
+                })
+            return info
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'mode': 'async' if self.loop is not None else 'threads',
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'queue_depth': self._queued,
+                'running_jobs': self._running,
+                'accepting': self._accepting
+            }
+    
+    def shutdown(self, drain: bool = True, timeout: float = None):
+        """Stop accepting jobs; finish queued work when draining, otherwise cancel it"""
+        dropped = []
+        with self._cond:
+            self._accepting = False
+            
+            if not drain:
+                for client_queue in self._queues.values():
+                    for job in client_queue:
+                        job.cancel_event.set()
+                        job.state = 'cancelled'
+                        self._forget(job)
+                        dropped.append(job)
+                self._queues.clear()
+                self._queued = 0
+                
+                for job in self._jobs.values():
+                    job.cancel_event.set()
+            
+            self._cond.notify_all()
+        
+        if self.on_cancel is not None:
+            for job in dropped:
+                self.on_cancel(job)
+        
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        if self.loop is not None:
+            with self._cond:
+                while self._jobs and (deadline is None or deadline > time.monotonic()):
+                    self._cond.wait(None if deadline is None else deadline - time.monotonic())
+            return
+        
+        for worker in self._workers:
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            worker.join(remaining)
+    
+    def _dispatch_order(self):
+        # Round-robin interleaving of the per-client queues
+        client_queues = [list(client_queue) for client_queue in self._queues.values()]
+        for i in range(max((len(q) for q in client_queues), default=0)):
+            for client_queue in client_queues:
+                if i < len(client_queue):
+                    yield client_queue[i]
+    
+    def _next_job(self):
+        client_id, client_queue = next(iter(self._queues.items()))
+        job = client_queue.popleft()
+        
+        # Move the client to the back so other clients go first next time
+        del self._queues[client_id]
+        if client_queue:
+            self._queues[client_id] = client_queue
+        
+        self._queued -= 1
+        job.state = 'running'
+        job.started_at = time.time()
+        self._running += 1
+        return job
+    
+    def _finish(self, job: ResearchJob):
+        job.state = 'finished'
+        job.finished_at = time.time()
+        self._running -= 1
+        self._forget(job)
+        self._cond.notify_all()
+    
+    def _forget(self, job: ResearchJob):
+        # A refresh reuses its research ID and can be submitted while the run
+        # before it is still wrapping up, so only drop the entry if it is this job's
+        if self._jobs.get(job.job_id) is job:
+            del self._jobs[job.job_id]
+    
+    def _dispatch(self):
+        # Loop mode, called with the lock held: fill free slots from the queue
+        while self._queues and self._running < self.max_workers:
+            asyncio.run_coroutine_threadsafe(self._run_async(self._next_job()), self.loop)
+    
+    async def _run_async(self, job: ResearchJob):
+        try:
+            result = job.target(*job.args)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            print(f"Unhandled error in research job {job.job_id}: {str(e)}")
+        finally:
+            with self._cond:
+                self._finish(job)
+                self._dispatch()
+    
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._queues and self._accepting:
+                    self._cond.wait()
+                
+                if not self._queues:
+                    return
+                
+                job = self._next_job()
+            
+            try:
+                job.target(*job.args)
+            except Exception as e:
+                print(f"Unhandled error in research job {job.job_id}: {str(e)}")
+            finally:
+                with self._cond:
+                    self._finish(job)
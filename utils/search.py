@@ -1,59 +1,362 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from tavily import TavilyClient
 from .config import Config
+from .cache import get_search_cache, make_cache_key
+from .context import normalize_url
+from .metrics import NULL_JOB_METRICS
+from .ratelimit import get_provider_limiter
+
+INDIAN_BUSINESS_DOMAINS = [
+    "yourstory.com",
+    "economictimes.indiatimes.com", 
+    "techcrunch.com",
+    "inc42.com",
+    "entrackr.com",
+    "business-standard.com",
+    "livemint.com",
+    "startupnews.fyi",
+    "forbesindia.com",
+    "moneycontrol.com"
+]
 
 class TavilyRetrievalSystem:
-    def __init__(self, tavily_api_key: str):
-        self.tavily = TavilyClient(api_key=tavily_api_key)
+    def __init__(self, tavily_api_key: str, client=None, cache=None, corpus=None, limiter=None, async_client=None):
+        # Any object with a TavilyClient-compatible ``search`` method can be
+        # injected, e.g. a local stub that simulates network latency.
+        self.tavily = client if client is not None else TavilyClient(api_key=tavily_api_key)
+        # AsyncTavilyClient-compatible client for the async methods; without
+        # one they run the blocking client in a worker thread
+        self.async_tavily = async_client
+        self.cache = cache if cache is not None else get_search_cache()
+        self.corpus = corpus
+        # Rate limits, adaptive concurrency and retries for every Tavily request
+        self.limiter = limiter if limiter is not None else get_provider_limiter('tavily')
+        self._inflight = {}  # cache key -> Future of a search currently running
+        self._inflight_lock = threading.Lock()
+        self.coalesced = 0
         
-    def advanced_search(self, query: str) -> str:
+    def advanced_search(self, query: str, metrics=NULL_JOB_METRICS) -> str:
         try:
-            # Comprehensive search with Indian business domains
-            primary_response = self.tavily.search(
-                query=query,
-                search_depth=Config.TAVILY_SEARCH_DEPTH,
-                max_results=Config.TAVILY_MAX_RESULTS,
-                include_answer=True,
-                include_raw_content=True,
-                include_domains=[
-                    "yourstory.com",
-                    "economictimes.indiatimes.com", 
-                    "techcrunch.com",
-                    "inc42.com",
-                    "entrackr.com",
-                    "business-standard.com",
-                    "livemint.com",
-                    "startupnews.fyi",
-                    "forbesindia.com",
-                    "moneycontrol.com"
-                ]
+            targeted_requests = self._targeted_requests(query)
+            responses = self._run_searches(
+                [self._primary_request(query)] + targeted_requests,
+                metrics,
+                ['search.primary'] + self._targeted_stage_names(targeted_requests)
             )
             
-            # Targeted searches
-            targeted_searches = [
-                f"{query} funding investment 2024 2025",
-                f"{query} latest news recent developments",
-                f"Indian AI healthcare market statistics"
-            ]
-            
-            all_results = [self._format_response(primary_response)]
+            # The primary search is mandatory, targeted searches are best effort
+            if isinstance(responses[0], Exception):
+                raise responses[0]
+            self._report_failures(targeted_requests, responses[1:], metrics)
             
-            for targeted_query in targeted_searches:
-                try:
-                    response = self.tavily.search(
-                        query=targeted_query,
-                        search_depth="basic",
-                        max_results=5,
-                        include_answer=True
-                    )
-                    all_results.append(self._format_response(response))
-                except:
-                    continue
+            all_results = [
+                self._format_response(response)
+                for response in responses
+                if not isinstance(response, Exception)
+            ]
             
             return "\n\n" + "="*50 + "\n\n".join(all_results)
             
         except Exception as e:
             raise Exception(f"Search failed: {str(e)}")
     
+    def format_results(self, responses: list) -> str:
+        return "\n\n".join(self._format_response(response) for response in responses)
+    
+    def fetch_primary(self, query: str, metrics=NULL_JOB_METRICS, since: str = None) -> dict:
+        """Raw Tavily response of the primary search; ``since`` (YYYY-MM-DD) asks for newer content only"""
+        try:
+            response = self._run_searches([self._primary_request(query, since)], metrics, ['search.primary'])[0]
+            if isinstance(response, Exception):
+                raise response
+            return response
+            
+        except Exception as e:
+            raise Exception(f"Search failed: {str(e)}")
+    
+    def fetch_targeted(self, query: str, metrics=NULL_JOB_METRICS, since: str = None) -> list:
+        """Raw Tavily responses of the targeted searches that succeeded, in request order"""
+        targeted_requests = self._targeted_requests(query, since)
+        responses = self._run_searches(targeted_requests, metrics, self._targeted_stage_names(targeted_requests))
+        self._report_failures(targeted_requests, responses, metrics)
+        
+        return [response for response in responses if not isinstance(response, Exception)]
+    
+    async def afetch_primary(self, query: str, metrics=NULL_JOB_METRICS, since: str = None) -> dict:
+        """``fetch_primary`` without blocking the event loop"""
+        try:
+            return await self._asearch(self._primary_request(query, since), metrics, 'search.primary')
+        except Exception as e:
+            raise Exception(f"Search failed: {str(e)}")
+    
+    async def afetch_targeted(self, query: str, metrics=NULL_JOB_METRICS, since: str = None) -> list:
+        """``fetch_targeted`` without blocking the event loop; all searches run at once"""
+        targeted_requests = self._targeted_requests(query, since)
+        responses = await asyncio.gather(*[
+            self._asearch(search_request, metrics, stage)
+            for search_request, stage in zip(targeted_requests, self._targeted_stage_names(targeted_requests))
+        ], return_exceptions=True)
+        self._report_failures(targeted_requests, responses, metrics)
+        
+        return [response for response in responses if not isinstance(response, Exception)]
+    
+    def _report_failures(self, search_requests: list, responses: list, metrics):
+        """Targeted searches that still failed after retries are logged and kept in the job metrics"""
+        for search_request, response in zip(search_requests, responses):
+            if isinstance(response, Exception):
+                message = f"{search_request['query']}: {type(response).__name__}: {response}"
+                print(f"Targeted search failed, continuing without it - {message}")
+                metrics.record_error('search.targeted', message)
+    
+    def _run_searches(self, search_requests: list, metrics, stage_names: list) -> list:
+        if Config.TAVILY_CONCURRENT_SEARCH and len(search_requests) > 1:
+            return self._run_concurrent(search_requests, metrics, stage_names)
+        return self._run_sequential(search_requests, metrics, stage_names)
+    
+    def _targeted_stage_names(self, targeted_requests: list) -> list:
+        return [f"search.targeted_{i}" for i in range(1, len(targeted_requests) + 1)]
+    
+    def _primary_request(self, query: str, since: str = None) -> dict:
+        # Comprehensive search with Indian business domains
+        return self._with_since({
+            "query": query,
+            "search_depth": Config.TAVILY_SEARCH_DEPTH,
+            "max_results": Config.TAVILY_MAX_RESULTS,
+            "include_answer": True,
+            "include_raw_content": True,
+            "include_domains": INDIAN_BUSINESS_DOMAINS
+        }, since)
+    
+    def _with_since(self, search_request: dict, since: str = None) -> dict:
+        # Refreshes only want content published after the previous run
+        if since:
+            search_request["start_date"] = since
+        return search_request
+    
+    def _targeted_requests(self, query: str, since: str = None) -> list:
+        # Targeted searches
+        targeted_searches = [
+            f"{query} funding investment 2024 2025",
+            f"{query} latest news recent developments",
+            f"Indian AI healthcare market statistics"
+        ]
+        
+        return [
+            self._with_since({
+                "query": targeted_query,
+                "search_depth": "basic",
+                "max_results": 5,
+                "include_answer": True
+            }, since)
+            for targeted_query in targeted_searches
+        ]
+    
+    def _search(self, search_request: dict, metrics=NULL_JOB_METRICS, stage: str = 'search') -> dict:
+        with metrics.timed(stage):
+            return self._corpus_search(search_request)
+    
+    def _corpus_search(self, search_request: dict) -> dict:
+        """Answer from the local corpus where it covers the query; only the gap goes to the web"""
+        hits = self._corpus_hits(search_request)
+        if not hits:
+            return self._cached_search(search_request)
+        
+        if len(hits) >= search_request["max_results"]:
+            return self._corpus_response(search_request, hits)
+        
+        gap_request = dict(search_request, max_results=search_request["max_results"] - len(hits))
+        return self._merge_corpus_hits(hits, self._cached_search(gap_request))
+    
+    async def _asearch(self, search_request: dict, metrics=NULL_JOB_METRICS, stage: str = 'search') -> dict:
+        with metrics.timed(stage):
+            # Corpus lookups hit SQLite, so they leave the event loop too
+            hits = await asyncio.to_thread(self._corpus_hits, search_request) if self.corpus is not None else []
+            if not hits:
+                return await self._acached_search(search_request)
+            
+            if len(hits) >= search_request["max_results"]:
+                return self._corpus_response(search_request, hits)
+            
+            gap_request = dict(search_request, max_results=search_request["max_results"] - len(hits))
+            return self._merge_corpus_hits(hits, await self._acached_search(gap_request))
+    
+    def _corpus_hits(self, search_request: dict) -> list:
+        # The corpus holds what earlier jobs fetched, never content newer than a refresh asks for
+        if self.corpus is None or search_request.get("start_date"):
+            return []
+        
+        max_results = search_request["max_results"]
+        hits = [
+            result for _, result in self.corpus.search(
+                search_request["query"],
+                k=max_results,
+                domains=search_request.get("include_domains"),
+                min_score=Config.CORPUS_MIN_SCORE
+            )
+        ]
+        if not search_request.get("include_raw_content"):
+            hits = [{k: v for k, v in hit.items() if k != 'raw_content'} for hit in hits]
+        
+        if hits and len(hits) < max_results:
+            print(f"Corpus covered {len(hits)}/{max_results} sources for '{search_request['query']}'")
+        return hits
+    
+    def _corpus_response(self, search_request: dict, hits: list) -> dict:
+        print(f"Corpus answered '{search_request['query']}' with {len(hits)} sources")
+        return {'query': search_request["query"], 'answer': None, 'results': hits, 'corpus_results': len(hits)}
+    
+    def _merge_corpus_hits(self, hits: list, response: dict) -> dict:
+        seen = {normalize_url(hit['url']) for hit in hits}
+        web_results = [
+            result for result in response.get('results') or []
+            if normalize_url(result.get('url')) not in seen
+        ]
+        return dict(response, results=hits + web_results, corpus_results=len(hits))
+    
+    def _cached_search(self, search_request: dict) -> dict:
+        cache_key, response, future, owner = self._lookup(search_request)
+        if response is not None:
+            return response
+        if not owner:
+            try:
+                return future.result(timeout=Config.TAVILY_QUERY_TIMEOUT)
+            except FutureTimeoutError:
+                if future.done():
+                    raise
+                # The owner may still be retrying; rather than fail with it, send the search ourselves
+                self._report_slow_inflight(search_request)
+                return self._send(search_request)
+        
+        try:
+            response = self._send(search_request)
+        except Exception as e:
+            self._settle(cache_key, future, error=e)
+            raise
+        self._settle(cache_key, future, response, cache=self._cacheable(search_request))
+        return response
+    
+    async def _acached_search(self, search_request: dict) -> dict:
+        cache_key, response, future, owner = self._lookup(search_request)
+        if response is not None:
+            return response
+        if not owner:
+            try:
+                # Shielded, so a waiter that times out or is cancelled leaves the owner's future alone
+                return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), Config.TAVILY_QUERY_TIMEOUT)
+            except asyncio.TimeoutError:
+                if future.done():
+                    raise
+                self._report_slow_inflight(search_request)
+                return await self._asend(search_request)
+        
+        try:
+            response = await self._asend(search_request)
+        except Exception as e:
+            self._settle(cache_key, future, error=e)
+            raise
+        self._settle(cache_key, future, response, cache=self._cacheable(search_request))
+        return response
+    
+    def _send(self, search_request: dict) -> dict:
+        return self.limiter.call(self.tavily.search, timeout=Config.TAVILY_QUERY_TIMEOUT, **search_request)
+    
+    async def _asend(self, search_request: dict) -> dict:
+        if self.async_tavily is not None:
+            return await self.limiter.acall(
+                self.async_tavily.search, timeout=Config.TAVILY_QUERY_TIMEOUT, **search_request
+            )
+        return await asyncio.to_thread(self._send, search_request)
+    
+    def _report_slow_inflight(self, search_request: dict):
+        print(f"Identical search for '{search_request['query']}' still running after "
+              f"{Config.TAVILY_QUERY_TIMEOUT}s; sending it again")
+    
+    def _lookup(self, search_request: dict) -> tuple:
+        """``(cache_key, cached_response, future, owner)``; the owner sends the request and settles the future"""
+        params = {k: v for k, v in search_request.items() if k != "query"}
+        cache_key = make_cache_key("tavily", search_request["query"], **params)
+        
+        if self._cacheable(search_request):
+            response = self.cache.get(cache_key)
+            if response is not None:
+                return cache_key, response, None, False
+        
+        # Identical searches already in flight, e.g. the shared sub-queries
+        # of a batch, wait for that request instead of sending their own
+        with self._inflight_lock:
+            future = self._inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = self._inflight[cache_key] = Future()
+            else:
+                self.coalesced += 1
+        
+        return cache_key, None, future, owner
+    
+    def _cacheable(self, search_request: dict) -> bool:
+        # A refresh wants what was published since its start date, which an
+        # answer cached earlier the same day would miss
+        return self.cache is not None and not search_request.get("start_date")
+    
+    def _settle(self, cache_key: str, future: Future, response: dict = None, error: Exception = None,
+                cache: bool = True):
+        if error is None and cache:
+            self.cache.set(cache_key, response)
+        
+        with self._inflight_lock:
+            self._inflight.pop(cache_key, None)
+        
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+    
+    def _run_sequential(self, search_requests: list, metrics, stage_names: list) -> list:
+        responses = []
+        for search_request, stage in zip(search_requests, stage_names):
+            try:
+                responses.append(self._search(search_request, metrics, stage))
+            except Exception as e:
+                responses.append(e)
+        return responses
+    
+    def _run_concurrent(self, search_requests: list, metrics, stage_names: list) -> list:
+        """Fan out all searches at once; results keep the request order"""
+        max_workers = max(1, min(Config.TAVILY_SEARCH_WORKERS, len(search_requests)))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tavily-search")
+        
+        try:
+            futures = [
+                executor.submit(self._search, search_request, metrics, stage)
+                for search_request, stage in zip(search_requests, stage_names)
+            ]
+            
+            # Requests beyond the worker count start late, so give each wave its own timeout
+            waves = -(-len(search_requests) // max_workers)
+            deadline = time.monotonic() + Config.TAVILY_QUERY_TIMEOUT * waves
+            
+            responses = []
+            for search_request, future in zip(search_requests, futures):
+                try:
+                    responses.append(future.result(timeout=max(0, deadline - time.monotonic())))
+                except FutureTimeoutError:
+                    future.cancel()
+                    responses.append(TimeoutError(
+                        f"Search for '{search_request['query']}' timed out after {Config.TAVILY_QUERY_TIMEOUT}s"
+                    ))
+                except Exception as e:
+                    responses.append(e)
+            
+            return responses
+        finally:
+            # Never block the caller on a stuck request
+            executor.shutdown(wait=False, cancel_futures=True)
+    
     def _format_response(self, response: dict) -> str:
         formatted = []
         
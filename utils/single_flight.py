@@ -0,0 +1,141 @@
+import threading
+from contextlib import contextmanager
+
+class Flight:
+    """One research job and the research IDs waiting for its result"""
+    
+    def __init__(self, key: str, job_id: str):
+        self.key = key
+        self.job_id = job_id
+        self.members = [job_id]
+        self.joinable = True
+        self.lock = threading.Lock()
+
+class SingleFlight:
+    """Coalesces identical in-flight research requests onto one job.
+    
+    The first request for a key starts a flight and its research ID runs the
+    job; later requests for the same key join as members and receive the
+    job's updates. Members are reference counted: one can leave (e.g. cancel)
+    without stopping the job, and the job is only worth cancelling once the
+    last member left. A flight stops taking members when its job publishes
+    its final state, so later requests start a fresh job.
+    """
+    
+    def __init__(self):
+        self._joinable = {}  # key -> Flight still taking members
+        self._flights = {}  # job_id -> Flight, until the job finishes
+        self._by_member = {}  # research_id -> Flight it is attached to
+        self._left = {}  # research_id -> Flight it detached from, until that flight ends
+        self._lock = threading.Lock()
+        self.coalesced = 0
+    
+    def join(self, key: str, research_id: str, on_attach=None):
+        """Attach ``research_id`` to the flight for ``key``.
+        
+        Returns the running job's ID, or None when ``research_id`` started a
+        new flight and must run the job itself. ``on_attach(job_id)`` runs
+        under the flight's lock, so it can copy the job's current state
+        without racing the job's next update.
+        """
+        while True:
+            with self._lock:
+                flight = self._joinable.get(key)
+                if flight is None:
+                    flight = Flight(key, research_id)
+                    self._joinable[key] = self._flights[research_id] = self._by_member[research_id] = flight
+                    return None
+            
+            with flight.lock:
+                # It stopped taking members while we waited; start over
+                if not flight.joinable:
+                    continue
+                flight.members.append(research_id)
+                with self._lock:
+                    self._by_member[research_id] = flight
+                    self.coalesced += 1
+                if on_attach is not None:
+                    on_attach(flight.job_id)
+                return flight.job_id
+    
+    @contextmanager
+    def members(self, job_id: str, final: bool = False):
+        """Research IDs that receive ``job_id``'s updates, stable for the duration of the block.
+        
+        ``final`` marks the job's last update: the flight is dissolved, and
+        requests arriving after this start a new job. Jobs outside any
+        flight yield just their own ID.
+        """
+        with self._lock:
+            flight = self._flights.get(job_id)
+        
+        if flight is None:
+            yield [job_id]
+            return
+        
+        with flight.lock:
+            members = list(flight.members)
+            if final:
+                self._dissolve(flight)
+            yield members
+    
+    def finish(self, job_id: str):
+        """Dissolve a flight whose job will never publish a final update, e.g. cancelled while queued"""
+        with self.members(job_id, final=True):
+            pass
+    
+    def leave(self, research_id: str):
+        """Detach a member; returns ``(job_id, remaining_members)`` or None when it is in no flight"""
+        with self._lock:
+            flight = self._by_member.get(research_id)
+        if flight is None:
+            return None
+        
+        with flight.lock:
+            if research_id not in flight.members:
+                return None
+            flight.members.remove(research_id)
+            with self._lock:
+                self._by_member.pop(research_id, None)
+                self._left[research_id] = flight
+                if not flight.members:
+                    # Nobody waits for this job any more, so nobody new should attach to it
+                    flight.joinable = False
+                    if self._joinable.get(flight.key) is flight:
+                        del self._joinable[flight.key]
+            return flight.job_id, len(flight.members)
+    
+    def has_left(self, research_id: str) -> bool:
+        """Whether ``research_id`` detached from a flight whose job is still running"""
+        with self._lock:
+            return research_id in self._left
+    
+    def member_count(self, job_id: str) -> int:
+        """Requests still waiting for ``job_id``; 0 for jobs outside any flight"""
+        with self._lock:
+            flight = self._flights.get(job_id)
+        if flight is None:
+            return 0
+        with flight.lock:
+            return len(flight.members)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'flights': len(self._flights),
+                'attached': len(self._by_member),
+                'coalesced': self.coalesced
+            }
+    
+    def _dissolve(self, flight: Flight):
+        # Called with the flight's lock held
+        flight.joinable = False
+        with self._lock:
+            if self._joinable.get(flight.key) is flight:
+                del self._joinable[flight.key]
+            self._flights.pop(flight.job_id, None)
+            for member in flight.members:
+                if self._by_member.get(member) is flight:
+                    del self._by_member[member]
+            for research_id in [key for key, left in self._left.items() if left is flight]:
+                del self._left[research_id]
@@ -0,0 +1,93 @@
+import zlib
+import numpy as np
+from .context import tokenize
+
+class HashingEmbedder:
+    """Stateless feature-hashing embeddings of word unigrams and bigrams.
+    
+    Needs no vocabulary, model download or GPU, so an index can be built from a
+    single job's search results in a few milliseconds.
+    """
+    
+    def __init__(self, dimensions: int = 2048):
+        self.dimensions = dimensions
+    
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                # crc32 is stable across processes, unlike hash()
+                digest = zlib.crc32(feature.encode('utf-8'))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dimensions] += sign
+        
+        # Sublinear term frequency, then unit length so a dot product is the cosine
+        vectors = np.sign(vectors) * np.log1p(np.abs(vectors))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+class VectorIndex:
+    """In-memory cosine top-k search over text chunks with arbitrary payloads"""
+    
+    def __init__(self, embedder: HashingEmbedder = None):
+        self.embedder = embedder or HashingEmbedder()
+        self.matrix = np.zeros((0, self.embedder.dimensions), dtype=np.float32)
+        self.payloads = []
+    
+    def __len__(self):
+        return len(self.payloads)
+    
+    def add(self, texts: list, payloads: list = None):
+        if not texts:
+            return
+        payloads = payloads if payloads is not None else list(texts)
+        self.matrix = np.vstack([self.matrix, self.embedder.embed(texts)])
+        self.payloads.extend(payloads)
+    
+    def search(self, query: str, k: int = 5) -> list:
+        """Return up to ``k`` ``(score, payload)`` pairs, best first"""
+        if not self.payloads:
+            return []
+        
+        scores = self.matrix @ self.embedder.embed([query])[0]
+        k = min(k, len(self.payloads))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[i]), self.payloads[i]) for i in top]
+    
+    def search_sections(self, query: str, sections: list, k: int = 5) -> dict:
+        """Top-k payloads for each section, searching with the section title plus the query"""
+        return {
+            section: [payload for _, payload in self.search(f"{section} {query}", k)]
+            for section in sections
+        }
+
+def interleave(results_by_section: dict) -> list:
+    """Round-robin merge of per-section results (hashable payloads), dropping repeats"""
+    merged = []
+    seen = set()
+    columns = list(results_by_section.values())
+    
+    for i in range(max((len(column) for column in columns), default=0)):
+        for column in columns:
+            if i < len(column) and column[i] not in seen:
+                seen.add(column[i])
+                merged.append(column[i])
+    
+    return merged
+
+def index_passages(budgeter, sources: list) -> VectorIndex:
+    """Index every passage of ``sources`` with ``(source_index, passage_index, passage)`` payloads"""
+    texts, payloads = [], []
+    for source_index, source in enumerate(sources):
+        for passage_index, passage in enumerate(budgeter.passages(source)):
+            texts.append(passage)
+            payloads.append((source_index, passage_index, passage))
+    
+    index = VectorIndex()
+    index.add(texts, payloads)
+    return index